@@ -42,6 +42,7 @@ function App() {
   const [messages, setMessages] = useState<ChatMessage[]>([]);
   const [inputValue, setInputValue] = useState('');
   const [currentData, setCurrentData] = useState<StructuredData | null>(null);
+  const [pendingCampaign, setPendingCampaign] = useState<{ campaign: Record<string, any>; recipients: number; token: string } | null>(null);
   const [isProcessing, setIsProcessing] = useState(false);
   
   const [stepThinking, setStepThinking] = useState({
@@ -132,6 +133,20 @@ function App() {
         }
         
         // Don't create streaming messages for thinking content
+      } else if (lastMessage.type === 'campaign_confirmation') {
+        // Only a click here can queue the campaign - the agent never sees the token
+        if (lastMessage.campaign && lastMessage.confirmation_token) {
+          setPendingCampaign({
+            campaign: lastMessage.campaign,
+            recipients: lastMessage.recipients || 0,
+            token: lastMessage.confirmation_token
+          });
+        }
+      } else if (lastMessage.type === 'dataset') {
+        // Table rows follow as out-of-band data frames
+        if (lastMessage.structured_data) {
+          setCurrentData(lastMessage.structured_data);
+        }
       } else if (lastMessage.type === 'response') {
         setIsProcessing(false);
         setProcessingStartTime(null);
@@ -221,8 +236,33 @@ function App() {
     setInputValue(actionMessage);
   };
 
+  const handleRequestPage = useCallback((datasetId: string, offset: number, limit: number) => {
+    sendMessage({
+      input: `Fetch data page: ${JSON.stringify({ dataset_id: datasetId, offset, limit })}`
+    });
+  }, [sendMessage]);
+
+  const handleConfirmCampaign = () => {
+    if (!pendingCampaign) return;
+    setMessages(prev => [...prev, {
+      id: Date.now().toString(),
+      type: 'user',
+      content: `Confirmed campaign to ${pendingCampaign.recipients} recipients`,
+      timestamp: new Date()
+    }]);
+    sendMessage({
+      input: `Confirm campaign: ${JSON.stringify({ ...pendingCampaign.campaign, confirmation_token: pendingCampaign.token })}`,
+      intent: 'create'
+    });
+    setPendingCampaign(null);
+  };
+
   const handleFormSubmit = (formData: Record<string, any>) => {
-    const submitMessage = `Submit form: ${JSON.stringify(formData)}`;
+    // One key per submission - resends of this message don't create a second promotion
+    const idempotencyKey = typeof crypto !== 'undefined' && 'randomUUID' in crypto
+      ? crypto.randomUUID()
+      : `${Date.now()}-${Math.random().toString(36).slice(2)}`;
+    const submitMessage = `Submit form: ${JSON.stringify({ ...formData, idempotency_key: `form:${idempotencyKey}` })}`;
     
     const userMessage: ChatMessage = {
       id: Date.now().toString(),
@@ -293,7 +333,7 @@ function App() {
       case 'table':
         return (
           <div className="data-panel">
-            <TableComponent data={currentData} onAction={handleTableAction} />
+            <TableComponent data={currentData} onAction={handleTableAction} onRequestPage={handleRequestPage} />
           </div>
         );
       case 'form':
@@ -429,6 +469,27 @@ function App() {
               </div>
             ))}
             
+            {pendingCampaign && !isProcessing && (
+              <div className="flex justify-start">
+                <div className="message-agent flex items-center space-x-3">
+                  <div className="text-sm">Send this campaign to {pendingCampaign.recipients} recipients?</div>
+                  <button
+                    onClick={handleConfirmCampaign}
+                    className="text-sm px-3 py-1 rounded"
+                    style={{ backgroundColor: 'var(--trust-green)', color: 'white' }}
+                  >
+                    Confirm send
+                  </button>
+                  <button
+                    onClick={() => setPendingCampaign(null)}
+                    className="text-sm text-gray-500 hover:text-gray-700"
+                  >
+                    Cancel
+                  </button>
+                </div>
+              </div>
+            )}
+
             {isProcessing && (
               <div className="flex justify-start">
                 <div className="message-agent flex items-center space-x-2">
@@ -1,13 +1,35 @@
-import React from 'react';
+import React, { useState, useEffect } from 'react';
 import { StructuredData, TableColumn, ComponentAction } from '../types';
+import { useDataset, PageRequester } from '../hooks/useDataset';
+
+// Virtualized rendering for out-of-band datasets
+const ROW_HEIGHT = 48;
+const VIEWPORT_HEIGHT = 480;
+const OVERSCAN_ROWS = 10;
 
 interface TableComponentProps {
   data: StructuredData;
   onAction?: (action: string, item: any) => void;
+  onRequestPage?: PageRequester;
 }
 
-export const TableComponent: React.FC<TableComponentProps> = ({ data, onAction }) => {
-  if (data.type !== 'table' || !data.data || !data.columns) {
+export const TableComponent: React.FC<TableComponentProps> = ({ data, onAction, onRequestPage }) => {
+  const [scrollTop, setScrollTop] = useState(0);
+  const dataset = useDataset(data.dataset, onRequestPage);
+
+  const isVirtual = !!data.dataset;
+  const rowCount = isVirtual ? dataset.total : data.data?.length || 0;
+  const firstRow = isVirtual ? Math.max(0, Math.floor(scrollTop / ROW_HEIGHT) - OVERSCAN_ROWS) : 0;
+  const lastRow = isVirtual
+    ? Math.min(rowCount, Math.ceil((scrollTop + VIEWPORT_HEIGHT) / ROW_HEIGHT) + OVERSCAN_ROWS)
+    : rowCount;
+  const { ensureRange } = dataset;
+
+  useEffect(() => {
+    if (isVirtual) ensureRange(firstRow, lastRow);
+  }, [isVirtual, firstRow, lastRow, ensureRange]);
+
+  if (data.type !== 'table' || (!data.data && !data.dataset) || !data.columns) {
     return <div className="text-red-500">Invalid table data</div>;
   }
 
@@ -65,7 +87,11 @@ export const TableComponent: React.FC<TableComponentProps> = ({ data, onAction }
 
   return (
     <div className="bg-white rounded-lg shadow-sm border border-gray-200 p-6">
-      <div className="overflow-x-auto">
+      <div
+        className={isVirtual ? 'overflow-auto' : 'overflow-x-auto'}
+        style={isVirtual ? { height: VIEWPORT_HEIGHT } : undefined}
+        onScroll={isVirtual ? (e) => setScrollTop(e.currentTarget.scrollTop) : undefined}
+      >
         <table className="table-component">
           <thead>
             <tr>
@@ -80,41 +106,73 @@ export const TableComponent: React.FC<TableComponentProps> = ({ data, onAction }
             </tr>
           </thead>
           <tbody>
-            {data.data.map((item, index) => (
-              <tr key={item.id || index}>
-                {data.columns!.map((column) => (
-                  <td key={column.key} className="table-cell">
-                    {renderCell(item, column)}
-                  </td>
-                ))}
-                {actions.length > 0 && (
-                  <td className="table-cell">
-                    <div className="flex space-x-2">
-                      {actions.map((action) => (
-                        <button
-                          key={action.action}
-                          onClick={() => handleAction(action.action, item)}
-                          className={`action-btn ${
-                            action.variant === 'danger' ? 'action-btn-danger' : ''
-                          }`}
-                        >
-                          {action.action === 'edit' ? '✏️' : action.action === 'delete' ? '🗑️' : action.action === 'email' ? '📧' : action.label}
-                        </button>
-                      ))}
-                    </div>
-                  </td>
-                )}
-              </tr>
-            ))}
+            {isVirtual && firstRow > 0 && (
+              <tr style={{ height: firstRow * ROW_HEIGHT }} aria-hidden="true" />
+            )}
+            {Array.from({ length: lastRow - firstRow }, (_, i) => firstRow + i).map((index) => {
+              const item = isVirtual ? dataset.getRow(index) : data.data![index];
+              if (item === undefined) {
+                return (
+                  <tr key={`loading-${index}`} style={{ height: ROW_HEIGHT }}>
+                    <td className="table-cell text-gray-400" colSpan={data.columns!.length + (actions.length > 0 ? 1 : 0)}>
+                      Loading…
+                    </td>
+                  </tr>
+                );
+              }
+              return (
+                <tr key={item.id || index} style={isVirtual ? { height: ROW_HEIGHT } : undefined}>
+                  {data.columns!.map((column) => (
+                    <td key={column.key} className="table-cell">
+                      {renderCell(item, column)}
+                    </td>
+                  ))}
+                  {actions.length > 0 && (
+                    <td className="table-cell">
+                      <div className="flex space-x-2">
+                        {actions.map((action) => (
+                          <button
+                            key={action.action}
+                            onClick={() => handleAction(action.action, item)}
+                            className={`action-btn ${
+                              action.variant === 'danger' ? 'action-btn-danger' : ''
+                            }`}
+                          >
+                            {action.action === 'edit' ? '✏️' : action.action === 'delete' ? '🗑️' : action.action === 'email' ? '📧' : action.label}
+                          </button>
+                        ))}
+                      </div>
+                    </td>
+                  )}
+                </tr>
+              );
+            })}
+            {isVirtual && lastRow < rowCount && (
+              <tr style={{ height: (rowCount - lastRow) * ROW_HEIGHT }} aria-hidden="true" />
+            )}
           </tbody>
         </table>
       </div>
       
-      {data.config?.pagination?.enabled && (
+      {isVirtual && (
+        <div className="mt-4 text-sm text-secondary font-medium">
+          {dataset.error ? (
+            <span className="text-red-500">{dataset.error}</span>
+          ) : (
+            <>
+              Rows <span className="text-info">{rowCount ? firstRow + 1 : 0}</span>–
+              <span className="text-info">{lastRow}</span> of{' '}
+              <span className="text-info">{rowCount}</span>
+            </>
+          )}
+        </div>
+      )}
+
+      {!isVirtual && data.config?.pagination?.enabled && (
         <div className="mt-6 flex justify-between items-center text-sm text-secondary">
           <span className="font-medium">
-            Showing <span className="text-info">{data.data.length}</span> of{' '}
-            <span className="text-info">{data.config.pagination.total || data.data.length}</span> results
+            Showing <span className="text-info">{rowCount}</span> of{' '}
+            <span className="text-info">{data.config.pagination.total || rowCount}</span> results
           </span>
           <div className="flex space-x-2">
             <button className="btn-secondary text-sm">Previous</button>
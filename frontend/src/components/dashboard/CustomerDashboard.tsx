@@ -397,6 +397,9 @@ export const CustomerDashboard: React.FC = () => {
       case 'create_promotion':
         alert(`Creating ${action.params?.promotion_type || 'promotion'} for ${action.params?.target_segment || 'customers'}`);
         break;
+      case 'simulate_promotion':
+        sendMessage({ input: `Simulate promotion: ${JSON.stringify(action.params || {})}` });
+        break;
       case 'show_customer_segments':
         alert('Showing detailed customer analytics');
         break;
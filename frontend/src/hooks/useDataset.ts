@@ -0,0 +1,55 @@
+import { useEffect, useReducer, useRef, useCallback } from 'react';
+import { DatasetRef } from '../types';
+import { getDatasetRow, getDatasetError, storeDatasetRows, subscribeDataset } from '../utils/datasetStore';
+
+export type PageRequester = (datasetId: string, offset: number, limit: number) => void;
+
+/**
+ * Rows of an out-of-band dataset, fetched page by page as they scroll into view.
+ * Datasets published with a presigned URL are downloaded once instead.
+ */
+export const useDataset = (dataset: DatasetRef | undefined, requestPage?: PageRequester) => {
+  const [, forceRender] = useReducer((count: number) => count + 1, 0);
+  const requestedPages = useRef<Set<number>>(new Set());
+
+  useEffect(() => {
+    if (!dataset) return;
+    requestedPages.current = new Set();
+    const unsubscribe = subscribeDataset(dataset.id, forceRender);
+
+    if (dataset.url) {
+      fetch(dataset.url)
+        .then(response => response.json())
+        .then(body => storeDatasetRows(dataset.id, body.rows || []))
+        .catch(err => console.error('Failed to download dataset:', err));
+    }
+
+    return unsubscribe;
+  }, [dataset]);
+
+  const ensureRange = useCallback((start: number, end: number) => {
+    if (!dataset || dataset.url || !requestPage) return;
+    const pageSize = dataset.page_size;
+    const lastPage = Math.floor((Math.min(end, dataset.total) - 1) / pageSize);
+
+    for (let page = Math.floor(start / pageSize); page <= lastPage; page++) {
+      const offset = page * pageSize;
+      if (getDatasetRow(dataset.id, offset) === undefined && !requestedPages.current.has(page)) {
+        requestedPages.current.add(page);
+        requestPage(dataset.id, offset, pageSize);
+      }
+    }
+  }, [dataset, requestPage]);
+
+  const getRow = useCallback(
+    (index: number) => (dataset ? getDatasetRow(dataset.id, index) : undefined),
+    [dataset]
+  );
+
+  return {
+    total: dataset?.total || 0,
+    error: dataset ? getDatasetError(dataset.id) : undefined,
+    getRow,
+    ensureRange
+  };
+};
@@ -1,5 +1,6 @@
 import { useState, useEffect, useCallback, useRef } from 'react';
-import { AgentResponse, WebSocketMessage } from '../types';
+import { AgentResponse, DataFrameMessage, WebSocketMessage } from '../types';
+import { storeDataFrame } from '../utils/datasetStore';
 
 const WEBSOCKET_URL = process.env.REACT_APP_WEBSOCKET_URL || 'wss://your-api-gateway-url';
 
@@ -32,8 +33,13 @@ export const useWebSocket = () => {
       
       ws.current.onmessage = (event) => {
         try {
-          const message: AgentResponse = JSON.parse(event.data);
-          setLastMessage(message);
+          const message = JSON.parse(event.data);
+          // Dataset pages bypass chat state - frames can arrive faster than renders
+          if (message.type === 'data_frame') {
+            storeDataFrame(message as DataFrameMessage);
+            return;
+          }
+          setLastMessage(message as AgentResponse);
         } catch (err) {
           console.error('Failed to parse WebSocket message:', err);
           setError('Failed to parse server response');
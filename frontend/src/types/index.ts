@@ -1,6 +1,6 @@
 // Agent Response Types
 export interface AgentResponse {
-  type: 'acknowledgment' | 'response' | 'error' | 'thinking' | 'stream_start' | 'stream_chunk' | 'stream_end' | 'data_update' | 'text_chunk' | 'tool_progress' | 'message_complete' | 'phase_update' | 'progress';
+  type: 'acknowledgment' | 'response' | 'error' | 'thinking' | 'stream_start' | 'stream_chunk' | 'stream_end' | 'data_update' | 'text_chunk' | 'tool_progress' | 'message_complete' | 'phase_update' | 'progress' | 'dataset' | 'data_frame' | 'campaign_confirmation';
   chat_response?: string;
   structured_data?: StructuredData;
   message?: string;
@@ -24,6 +24,21 @@ export interface AgentResponse {
   details?: string[];
   progress?: number;
   estimated_time?: number;
+
+  // Campaign confirmation fields (token is only ever shown to the user, never the agent)
+  campaign?: Record<string, any>;
+  recipients?: number;
+  confirmation_token?: string;
+}
+
+// Out-of-band dataset page (never routed through chat messages)
+export interface DataFrameMessage {
+  type: 'data_frame';
+  dataset_id: string;
+  offset: number;
+  rows: any[];
+  total?: number;
+  error?: string;
 }
 
 // Progress Phase Types
@@ -44,6 +59,14 @@ export interface StructuredData {
   fields?: FormField[];
   config?: ComponentConfig;
   content?: string; // For HTML type
+  dataset?: DatasetRef; // Rows served out-of-band instead of in data
+}
+
+export interface DatasetRef {
+  id: string;
+  total: number;
+  page_size: number;
+  url?: string; // Presigned S3 object for large datasets
 }
 
 export interface TableColumn {
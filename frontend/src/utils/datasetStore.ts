@@ -0,0 +1,65 @@
+import { DataFrameMessage } from '../types';
+
+/**
+ * Client-side row cache for out-of-band datasets.
+ *
+ * Data frames arrive on the WebSocket independently of chat messages and are
+ * written here by index, so tables can mount before or after their pages land.
+ */
+type Listener = () => void;
+
+interface DatasetEntry {
+  rows: any[]; // Sparse - only fetched pages are filled in
+  total: number;
+  error?: string;
+}
+
+const datasets = new Map<string, DatasetEntry>();
+const listeners = new Map<string, Set<Listener>>();
+
+const getEntry = (datasetId: string): DatasetEntry => {
+  let entry = datasets.get(datasetId);
+  if (!entry) {
+    entry = { rows: [], total: 0 };
+    datasets.set(datasetId, entry);
+  }
+  return entry;
+};
+
+const notify = (datasetId: string) => {
+  listeners.get(datasetId)?.forEach(listener => listener());
+};
+
+export const storeDataFrame = (frame: DataFrameMessage) => {
+  const entry = getEntry(frame.dataset_id);
+  if (frame.error) {
+    entry.error = frame.error;
+  } else {
+    frame.rows.forEach((row, i) => {
+      entry.rows[frame.offset + i] = row;
+    });
+    if (frame.total !== undefined) entry.total = frame.total;
+  }
+  notify(frame.dataset_id);
+};
+
+export const storeDatasetRows = (datasetId: string, rows: any[]) => {
+  const entry = getEntry(datasetId);
+  entry.rows = rows;
+  entry.total = rows.length;
+  notify(datasetId);
+};
+
+export const getDatasetRow = (datasetId: string, index: number): any | undefined =>
+  datasets.get(datasetId)?.rows[index];
+
+export const getDatasetError = (datasetId: string): string | undefined =>
+  datasets.get(datasetId)?.error;
+
+export const subscribeDataset = (datasetId: string, listener: Listener) => {
+  if (!listeners.has(datasetId)) listeners.set(datasetId, new Set());
+  listeners.get(datasetId)!.add(listener);
+  return () => {
+    listeners.get(datasetId)?.delete(listener);
+  };
+};
@@ -1,19 +1,17 @@
 import json
-import boto3
 import os
 from datetime import datetime, timedelta
+from utils.aws_clients import get_client
 
 def lambda_handler(event, context):
     """
     Scudo KPI Lambda - Fast aggregated metrics from Aurora
     """
     try:
-        # RDS Data API client
-        rds_client = boto3.client('rds-data')
-        
         cluster_arn = os.environ['AURORA_CLUSTER_ARN']
         secret_arn = os.environ['AURORA_SECRET_ARN']
         database = os.environ['AURORA_DATABASE_NAME']
+        rds_client = get_client('rds-data')  # Shared client, reused across warm invocations
         
         # Execute KPI queries
         kpis = get_dashboard_kpis(rds_client, cluster_arn, secret_arn, database)
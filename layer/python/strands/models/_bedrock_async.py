@@ -0,0 +1,296 @@
+"""Async-native transport for the Bedrock ConverseStream API.
+
+Requests are serialized and SigV4-signed with botocore, sent with httpx on the running event loop, and the
+AWS event-stream response is decoded incrementally as bytes arrive. No worker thread or cross-thread queue is
+involved: a chunk is only read from the socket once the caller has consumed the events decoded from the
+previous one, so buffering is bounded by one read chunk plus one partial frame.
+
+Each event loop gets its own httpx client, reused by every request made on that loop. The client is closed
+when the loop shuts down its async generators (`asyncio.run` does this before closing the loop), so clients
+and their connections never outlive the loop that owns them.
+
+Failed requests are retried like botocore's retry handler: 5xx responses, throttling and transient error
+codes and connection errors, up to the client's configured max attempts, with full-jitter exponential backoff.
+Nothing is retried once events have been yielded.
+"""
+
+import asyncio
+import binascii
+import logging
+import random
+import struct
+import weakref
+from typing import Any, AsyncGenerator
+
+import boto3
+import botocore
+import httpx
+from botocore.auth import SigV4Auth
+from botocore.awsrequest import create_request_object, prepare_request_dict
+from botocore.eventstream import EventStreamHeaderParser
+from botocore.exceptions import ClientError, EventStreamError, NoCredentialsError
+from botocore.parsers import EventStreamJSONParser, create_parser
+from botocore.serialize import create_serializer
+
+logger = logging.getLogger(__name__)
+
+OPERATION_NAME = "ConverseStream"
+
+READ_CHUNK_SIZE = 16 * 1024
+MAX_FRAME_BYTES = 8 * 1024 * 1024
+_PRELUDE_LENGTH = 12
+_MESSAGE_CRC_LENGTH = 4
+
+# Retried like botocore's standard retry checkers
+RETRYABLE_STATUS_CODES = (500, 502, 503, 504)
+RETRYABLE_ERROR_CODES = frozenset(
+    [
+        "RequestTimeout",
+        "RequestTimeoutException",
+        "PriorRequestNotComplete",
+        "Throttling",
+        "ThrottlingException",
+        "ThrottledException",
+        "RequestThrottledException",
+        "TooManyRequestsException",
+        "RequestLimitExceeded",
+        "LimitExceededException",
+        "RequestThrottled",
+    ]
+)
+LEGACY_MAX_ATTEMPTS = 5
+STANDARD_MAX_ATTEMPTS = 3
+MAX_BACKOFF_SECONDS = 20
+
+# httpx clients of each event loop, keyed by timeouts and pool size; connections cannot be shared across loops
+_http_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[tuple[Any, ...], httpx.AsyncClient]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+class EventStreamDecodeError(Exception):
+    """Raised when the response is not a well-formed AWS event stream."""
+
+
+class EventStreamDecoder:
+    """Incremental decoder for the AWS event-stream framing.
+
+    Each frame is a 12 byte prelude (total length, headers length, prelude CRC32), headers, payload and a
+    trailing CRC32 of the whole frame. Bytes are fed as they arrive; complete frames are returned and the
+    remainder is kept for the next feed.
+    """
+
+    def __init__(self, max_frame_bytes: int = MAX_FRAME_BYTES) -> None:
+        """Initialize the decoder.
+
+        Args:
+            max_frame_bytes: Largest frame accepted; bounds the decoder's buffer.
+        """
+        self.max_frame_bytes = max_frame_bytes
+        self._buffer = bytearray()
+        self._header_parser = EventStreamHeaderParser()
+
+    @property
+    def buffered_bytes(self) -> int:
+        """Bytes held for a frame that has not fully arrived."""
+        return len(self._buffer)
+
+    def feed(self, data: bytes) -> list[tuple[dict[str, Any], bytes]]:
+        """Add received bytes and return the frames they complete.
+
+        Args:
+            data: Bytes read from the response body.
+
+        Returns:
+            (headers, payload) for each complete frame, in order.
+
+        Raises:
+            EventStreamDecodeError: If a frame is oversized or fails its checksum.
+        """
+        self._buffer += data
+        frames = []
+        offset = 0
+        view = memoryview(self._buffer)
+        try:
+            while len(self._buffer) - offset >= _PRELUDE_LENGTH:
+                total_length, headers_length, prelude_crc = struct.unpack_from("!III", view, offset)
+                if binascii.crc32(view[offset : offset + 8]) != prelude_crc:
+                    raise EventStreamDecodeError("event stream prelude checksum mismatch")
+                if total_length > self.max_frame_bytes:
+                    raise EventStreamDecodeError(f"event stream frame of {total_length} bytes exceeds the maximum")
+                if len(self._buffer) - offset < total_length:
+                    break
+
+                crc_offset = offset + total_length - _MESSAGE_CRC_LENGTH
+                (message_crc,) = struct.unpack_from("!I", view, crc_offset)
+                if binascii.crc32(view[offset:crc_offset]) != message_crc:
+                    raise EventStreamDecodeError("event stream message checksum mismatch")
+
+                headers_start = offset + _PRELUDE_LENGTH
+                payload_start = headers_start + headers_length
+                headers = self._header_parser.parse(bytes(view[headers_start:payload_start]))
+                frames.append((headers, bytes(view[payload_start:crc_offset])))
+                offset += total_length
+        finally:
+            view.release()
+
+        del self._buffer[:offset]
+        return frames
+
+
+async def _close_with_loop(loop: asyncio.AbstractEventLoop, key: tuple[Any, ...], client: httpx.AsyncClient) -> Any:
+    """Async generator that stays suspended for the loop's lifetime and closes the client when finalized.
+
+    The loop's async generator hooks track it once started, so `loop.shutdown_asyncgens()` (run by `asyncio.run`)
+    closes it on the loop itself, before the loop is closed.
+    """
+    try:
+        yield
+    finally:
+        clients = _http_clients.get(loop)
+        if clients is not None and clients.get(key) is client:
+            del clients[key]
+            if not clients:
+                _http_clients.pop(loop, None)
+        await client.aclose()
+
+
+def _create_http_client(config: Any, max_connections: int) -> httpx.AsyncClient:
+    """Build an httpx client with the botocore client's timeouts and the given pool size."""
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(config.read_timeout, connect=config.connect_timeout),
+        limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+    )
+
+
+async def _get_http_client(config: Any, max_connections: int) -> httpx.AsyncClient:
+    """Return the running loop's httpx client for these timeouts and pool size, creating it on first use."""
+    loop = asyncio.get_running_loop()
+    key = (config.read_timeout, config.connect_timeout, max_connections)
+    clients = _http_clients.setdefault(loop, {})
+    client = clients.get(key)
+    if client is None:
+        client = _create_http_client(config, max_connections)
+        clients[key] = client
+        closer = _close_with_loop(loop, key, client)
+        await closer.__anext__()
+        # Kept on the client so the generator lives exactly as long as the client does
+        client._strands_closer = closer  # type: ignore[attr-defined]
+    return client
+
+
+def _max_attempts(config: Any) -> int:
+    """Total attempts allowed by a botocore client config, matching its retry handler."""
+    retries = config.retries or {}
+    if "total_max_attempts" in retries:
+        return int(retries["total_max_attempts"])
+    if "max_attempts" in retries:
+        return int(retries["max_attempts"]) + 1
+    return LEGACY_MAX_ATTEMPTS if retries.get("mode", "legacy") == "legacy" else STANDARD_MAX_ATTEMPTS
+
+
+def _retry_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff, as botocore's standard retry mode."""
+    return random.uniform(0, min(2**attempt, MAX_BACKOFF_SECONDS))
+
+
+def _sign_request(client: Any, session: boto3.Session, request: dict[str, Any]) -> Any:
+    """Serialize and SigV4-sign a ConverseStream request the way the boto3 client would."""
+    service_model = client.meta.service_model
+    operation_model = service_model.operation_model(OPERATION_NAME)
+    request_dict = create_serializer(service_model.protocol).serialize_to_request(request, operation_model)
+    user_agent = f"Botocore/{botocore.__version__} {client.meta.config.user_agent_extra or ''}".strip()
+    prepare_request_dict(request_dict, endpoint_url=client.meta.endpoint_url, user_agent=user_agent)
+
+    credentials = session.get_credentials()
+    if credentials is None:
+        raise NoCredentialsError()
+
+    aws_request = create_request_object(request_dict)
+    SigV4Auth(credentials.get_frozen_credentials(), service_model.signing_name, client.meta.region_name).add_auth(
+        aws_request
+    )
+    return aws_request.prepare()
+
+
+async def converse_stream(
+    client: Any, session: boto3.Session, request: dict[str, Any], max_connections: int
+) -> AsyncGenerator[dict[str, Any], None]:
+    """Call ConverseStream on the running event loop and yield parsed stream events.
+
+    Events have the same shape as the items of boto3's `converse_stream(...)["stream"]`.
+
+    Args:
+        client: bedrock-runtime client supplying the endpoint, region, service model and timeouts.
+        session: Boto session supplying credentials.
+        request: ConverseStream request parameters.
+        max_connections: Connection pool size of the per-loop httpx client.
+
+    Yields:
+        Parsed stream events.
+
+    Raises:
+        ClientError: If the request is rejected (after retries for retryable errors).
+        httpx.TransportError: If the connection keeps failing after retries.
+        EventStreamError: If the service reports an error mid-stream.
+        EventStreamDecodeError: If the response framing is corrupt.
+    """
+    operation_model = client.meta.service_model.operation_model(OPERATION_NAME)
+    stream_shape = operation_model.output_shape.members["stream"]
+    http_client = await _get_http_client(client.meta.config, max_connections)
+    max_attempts = _max_attempts(client.meta.config)
+
+    attempt = 0
+    streamed = False
+    while True:
+        attempt += 1
+        # Signed per attempt: the signature carries a timestamp and credentials may have refreshed
+        prepared = _sign_request(client, session, request)
+        try:
+            async with http_client.stream(
+                prepared.method, prepared.url, content=prepared.body, headers=dict(prepared.headers.items())
+            ) as response:
+                if response.status_code != 200:
+                    body = await response.aread()
+                    parsed = create_parser(client.meta.service_model.protocol).parse(
+                        {"status_code": response.status_code, "headers": dict(response.headers), "body": body},
+                        operation_model.output_shape,
+                    )
+                    error_code = parsed.get("Error", {}).get("Code")
+                    retryable = response.status_code in RETRYABLE_STATUS_CODES or error_code in RETRYABLE_ERROR_CODES
+                    if not retryable or attempt >= max_attempts:
+                        raise ClientError(parsed, OPERATION_NAME)
+                    logger.debug(
+                        "attempt=<%d>, status=<%d>, code=<%s> | retrying bedrock request",
+                        attempt,
+                        response.status_code,
+                        error_code,
+                    )
+                else:
+                    decoder = EventStreamDecoder()
+                    parser = EventStreamJSONParser()
+                    async for chunk in response.aiter_raw(READ_CHUNK_SIZE):
+                        for headers, payload in decoder.feed(chunk):
+                            message_type = headers.get(":message-type")
+                            status_code = 200 if message_type == "event" else 400
+                            parsed = parser.parse(
+                                {"status_code": status_code, "headers": headers, "body": payload}, stream_shape
+                            )
+                            if status_code != 200:
+                                raise EventStreamError(parsed, OPERATION_NAME)
+                            if parsed:
+                                streamed = True
+                                yield parsed
+
+                    if decoder.buffered_bytes:
+                        raise EventStreamDecodeError(
+                            f"event stream ended inside a frame ({decoder.buffered_bytes} bytes pending)"
+                        )
+                    return
+        except httpx.TransportError as e:
+            # Events already yielded cannot be taken back, so only failures before the first one are retried
+            if streamed or attempt >= max_attempts:
+                raise
+            logger.debug("attempt=<%d>, error=<%s> | retrying bedrock request", attempt, e)
+
+        await asyncio.sleep(_retry_delay(attempt))
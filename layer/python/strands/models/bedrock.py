@@ -7,8 +7,10 @@ import asyncio
 import json
 import logging
 import os
+import threading
 import warnings
-from typing import Any, AsyncGenerator, Callable, Iterable, Literal, Optional, Type, TypeVar, Union, cast
+from collections import OrderedDict
+from typing import Any, AsyncGenerator, Callable, Iterable, Literal, NoReturn, Optional, Type, TypeVar, Union, cast
 
 import boto3
 from botocore.config import Config as BotocoreConfig
@@ -18,7 +20,7 @@ from typing_extensions import TypedDict, Unpack, override
 
 from ..event_loop import streaming
 from ..tools import convert_pydantic_to_tool_spec
-from ..types.content import ContentBlock, Messages
+from ..types.content import ContentBlock, Message, Messages
 from ..types.exceptions import (
     ContextWindowOverflowException,
     ModelThrottledException,
@@ -26,6 +28,7 @@ from ..types.exceptions import (
 from ..types.streaming import CitationsDelta, StreamEvent
 from ..types.tools import ToolChoice, ToolSpec
 from ._validation import validate_config_keys
+from ._bedrock_async import converse_stream
 from .model import Model
 
 logger = logging.getLogger(__name__)
@@ -50,6 +53,131 @@ T = TypeVar("T", bound=BaseModel)
 
 DEFAULT_READ_TIMEOUT = 120
 
+# Formatted messages kept per model instance, so repeated calls only format newly appended messages
+MAX_FORMATTED_MESSAGES = 512
+
+# Shared bedrock-runtime clients; tunable through the environment for high-concurrency hosts
+DEFAULT_MAX_POOL_CONNECTIONS = int(os.environ.get("STRANDS_BEDROCK_MAX_POOL_CONNECTIONS", "50"))
+DEFAULT_TCP_KEEPALIVE = os.environ.get("STRANDS_BEDROCK_TCP_KEEPALIVE", "true").lower() == "true"
+DEFAULT_ASYNC_STREAMING = os.environ.get("STRANDS_BEDROCK_ASYNC_STREAMING", "false").lower() == "true"
+MAX_POOLED_CLIENTS = int(os.environ.get("STRANDS_BEDROCK_MAX_POOLED_CLIENTS", "16"))
+
+_client_pool: "OrderedDict[tuple[Any, ...], Any]" = OrderedDict()
+_client_pool_lock = threading.Lock()
+_default_session: Optional[boto3.Session] = None
+
+
+def _get_default_session() -> boto3.Session:
+    """Return the process-wide boto3 session used when no session is provided."""
+    global _default_session
+    with _client_pool_lock:
+        if _default_session is None:
+            _default_session = boto3.Session()
+        return _default_session
+
+
+def _client_config_key(config: BotocoreConfig) -> tuple[Any, ...]:
+    """Hashable identity of a botocore client config."""
+    options = getattr(config, "_user_provided_options", {})
+    return tuple(sorted((name, repr(value)) for name, value in options.items()))
+
+
+def get_bedrock_client(
+    session: boto3.Session,
+    region_name: str,
+    client_config: BotocoreConfig,
+    endpoint_url: Optional[str] = None,
+    shared_session: bool = True,
+) -> Any:
+    """Get a pooled bedrock-runtime client, creating it on first use.
+
+    Clients are keyed by region, endpoint and client config so every BedrockModel with the same settings
+    shares one client and its HTTP connection pool. The pool keeps the MAX_POOLED_CLIENTS most recently used
+    clients. Clients for a caller-provided session are never pooled: the session may carry different
+    credentials, and its identity cannot safely outlive it.
+
+    Args:
+        session: Boto session to create the client from.
+        region_name: AWS region of the client.
+        client_config: Botocore client configuration.
+        endpoint_url: Optional custom endpoint URL.
+        shared_session: Whether the session is the process-wide default session.
+
+    Returns:
+        A bedrock-runtime client.
+    """
+    if not shared_session:
+        return session.client(
+            service_name="bedrock-runtime",
+            config=client_config,
+            endpoint_url=endpoint_url,
+            region_name=region_name,
+        )
+
+    key = (region_name, endpoint_url, _client_config_key(client_config))
+    with _client_pool_lock:
+        client = _client_pool.get(key)
+        if client is None:
+            client = session.client(
+                service_name="bedrock-runtime",
+                config=client_config,
+                endpoint_url=endpoint_url,
+                region_name=region_name,
+            )
+            _client_pool[key] = client
+            while len(_client_pool) > MAX_POOLED_CLIENTS:
+                _client_pool.popitem(last=False)
+            logger.debug("region=<%s>, pool_size=<%d> | bedrock client created", region_name, len(_client_pool))
+        else:
+            _client_pool.move_to_end(key)
+        return client
+
+
+def clear_bedrock_client_pool() -> None:
+    """Drop all pooled bedrock-runtime clients (e.g. after credentials rotate)."""
+    with _client_pool_lock:
+        _client_pool.clear()
+
+
+def _approximate_size(value: Any) -> int:
+    """Approximate serialized size of a formatted request value, without serializing it.
+
+    Args:
+        value: Formatted message or part of one.
+
+    Returns:
+        Approximate size in bytes (string and bytes lengths plus a small per-value overhead).
+    """
+    if isinstance(value, (str, bytes, bytearray)):
+        return len(value) + 2
+    if isinstance(value, dict):
+        return sum(len(key) + 4 + _approximate_size(item) for key, item in value.items()) + 2
+    if isinstance(value, (list, tuple)):
+        return sum(_approximate_size(item) + 1 for item in value) + 2
+    return 8
+
+
+def _freeze(value: Any) -> Any:
+    """Comparable snapshot of message content.
+
+    Strings and bytes are shared rather than copied, and tuple equality checks identity first, so comparing two
+    snapshots of unchanged content costs one step per node regardless of text size. Editing a block in place (a new
+    `text` string, a replaced tool result) changes the snapshot.
+
+    Args:
+        value: Message content or part of it.
+
+    Returns:
+        Nested tuples mirroring dicts and lists, with scalar leaves as-is.
+    """
+    if isinstance(value, dict):
+        return tuple((key, _freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, bytearray):
+        return bytes(value)
+    return value
+
 
 class BedrockModel(Model):
     """AWS Bedrock model provider implementation.
@@ -59,7 +187,7 @@ class BedrockModel(Model):
     - Tool configuration for function calling
     - Guardrails integration
     - Caching points for system prompts and tools
-    - Streaming responses
+    - Streaming responses, optionally over an async-native transport (see `async_streaming`)
     - Context window overflow detection
     """
 
@@ -70,6 +198,8 @@ class BedrockModel(Model):
             additional_args: Any additional arguments to include in the request
             additional_request_fields: Additional fields to include in the Bedrock request
             additional_response_field_paths: Additional response field paths to extract
+            async_streaming: Stream with httpx on the caller's event loop and an incremental event-stream decoder
+                instead of running boto3's converse_stream in a worker thread. Defaults to DEFAULT_ASYNC_STREAMING.
             cache_prompt: Cache point type for the system prompt
             cache_tools: Cache point type for tools
             guardrail_id: ID of the guardrail to apply
@@ -93,6 +223,7 @@ class BedrockModel(Model):
         additional_args: Optional[dict[str, Any]]
         additional_request_fields: Optional[dict[str, Any]]
         additional_response_field_paths: Optional[list[str]]
+        async_streaming: Optional[bool]
         cache_prompt: Optional[str]
         cache_tools: Optional[str]
         guardrail_id: Optional[str]
@@ -125,6 +256,8 @@ class BedrockModel(Model):
         Args:
             boto_session: Boto Session to use when calling the Bedrock Model.
             boto_client_config: Configuration to use when creating the Bedrock-Runtime Boto Client.
+                Clients are pooled per region, endpoint and config; max_pool_connections and tcp_keepalive
+                default to DEFAULT_MAX_POOL_CONNECTIONS and DEFAULT_TCP_KEEPALIVE.
             region_name: AWS region to use for the Bedrock service.
                 Defaults to the AWS_REGION environment variable if set, or "us-west-2" if not set.
             endpoint_url: Custom endpoint URL for VPC endpoints (PrivateLink)
@@ -133,7 +266,7 @@ class BedrockModel(Model):
         if region_name and boto_session:
             raise ValueError("Cannot specify both `region_name` and `boto_session`.")
 
-        session = boto_session or boto3.Session()
+        session = boto_session or _get_default_session()
         resolved_region = region_name or session.region_name or os.environ.get("AWS_REGION") or DEFAULT_BEDROCK_REGION
         self.config = BedrockModel.BedrockConfig(
             model_id=BedrockModel._get_default_model_with_warning(resolved_region, model_config),
@@ -157,14 +290,28 @@ class BedrockModel(Model):
         else:
             client_config = BotocoreConfig(user_agent_extra="strands-agents", read_timeout=DEFAULT_READ_TIMEOUT)
 
-        self.client = session.client(
-            service_name="bedrock-runtime",
-            config=client_config,
+        # Pool defaults apply unless the caller's config sets them
+        client_config = BotocoreConfig(
+            max_pool_connections=DEFAULT_MAX_POOL_CONNECTIONS,
+            tcp_keepalive=DEFAULT_TCP_KEEPALIVE,
+        ).merge(client_config)
+
+        self.session = session
+        self._formatted_tools: Optional[tuple[list[ToolSpec], Optional[str], int, list[dict[str, Any]]]] = None
+        self._formatted_messages: OrderedDict[
+            int, tuple[Message, tuple[Any, ...], Optional[dict[str, Any]], int, int]
+        ] = OrderedDict()
+        self._formatted_messages_key: Optional[tuple[Any, ...]] = None
+        self._formatted_messages_lock = threading.Lock()
+        self.client = get_bedrock_client(
+            session,
+            resolved_region,
+            client_config,
             endpoint_url=endpoint_url,
-            region_name=resolved_region,
+            shared_session=boto_session is None,
         )
 
-        logger.debug("region=<%s> | bedrock client created", self.client.meta.region_name)
+        logger.debug("region=<%s> | bedrock client ready", self.client.meta.region_name)
 
     @override
     def update_config(self, **model_config: Unpack[BedrockConfig]) -> None:  # type: ignore
@@ -213,14 +360,7 @@ class BedrockModel(Model):
             **(
                 {
                     "toolConfig": {
-                        "tools": [
-                            *[{"toolSpec": tool_spec} for tool_spec in tool_specs],
-                            *(
-                                [{"cachePoint": {"type": self.config["cache_tools"]}}]
-                                if self.config.get("cache_tools")
-                                else []
-                            ),
-                        ],
+                        "tools": self._format_tools(tool_specs),
                         **({"toolChoice": tool_choice if tool_choice else {"auto": {}}}),
                     }
                 }
@@ -270,6 +410,30 @@ class BedrockModel(Model):
             ),
         }
 
+    def _format_tools(self, tool_specs: list[ToolSpec]) -> list[dict[str, Any]]:
+        """Format the toolConfig tools, reusing the previous result for the same tool spec list.
+
+        Tool registries return the same list object until their tools change, so the entries are built once per
+        registry version rather than on every model call.
+
+        Args:
+            tool_specs: List of tool specifications to make available to the model.
+
+        Returns:
+            Bedrock toolConfig tools, with a cache point when cache_tools is set.
+        """
+        cache_tools = self.config.get("cache_tools")
+        cached = self._formatted_tools
+        if cached is not None and cached[0] is tool_specs and cached[1] == cache_tools and cached[2] == len(tool_specs):
+            return cached[3]
+
+        tools: list[dict[str, Any]] = [
+            *[{"toolSpec": tool_spec} for tool_spec in tool_specs],
+            *([{"cachePoint": {"type": cache_tools}}] if cache_tools else []),
+        ]
+        self._formatted_tools = (tool_specs, cache_tools, len(tool_specs), tools)
+        return tools
+
     def _format_bedrock_messages(self, messages: Messages) -> list[dict[str, Any]]:
         """Format messages for Bedrock API compatibility.
 
@@ -278,6 +442,11 @@ class BedrockModel(Model):
         - Eagerly filtering content blocks to only include Bedrock-supported fields
         - Ensuring all message content blocks are properly formatted for the Bedrock API
 
+        Each message is formatted once and memoized against a snapshot of its content (see `_message_fingerprint`),
+        so a conversation only pays for the messages appended or edited since the previous call. Only messages in the
+        current `messages` list stay memoized, so messages dropped from the conversation (e.g. a reset
+        `agent.messages`) are released. The returned messages are shared between calls and must not be mutated.
+
         Args:
             messages: List of messages to format
 
@@ -292,44 +461,108 @@ class BedrockModel(Model):
             https://docs.aws.amazon.com/bedrock/latest/APIReference/API_runtime_ContentBlock.html
         """
         cleaned_messages: list[dict[str, Any]] = []
+        reused = 0
+        approximate_bytes = 0
+        unknown_members = 0
 
-        filtered_unknown_members = False
-        dropped_deepseek_reasoning_content = False
-
-        for message in messages:
-            cleaned_content: list[dict[str, Any]] = []
+        # Formatting depends on the model id (DeepSeek filtering) and tool result status handling
+        format_key = (self.config["model_id"], self._should_include_tool_result_status())
 
-            for content_block in message["content"]:
-                # Filter out SDK_UNKNOWN_MEMBER content blocks
-                if "SDK_UNKNOWN_MEMBER" in content_block:
-                    filtered_unknown_members = True
-                    continue
+        with self._formatted_messages_lock:
+            if self._formatted_messages_key != format_key:
+                self._formatted_messages.clear()
+                self._formatted_messages_key = format_key
 
-                # DeepSeek models have issues with reasoningContent
-                # TODO: Replace with systematic model configuration registry (https://github.com/strands-agents/sdk-python/issues/780)
-                if "deepseek" in self.config["model_id"].lower() and "reasoningContent" in content_block:
-                    dropped_deepseek_reasoning_content = True
-                    continue
-
-                # Format content blocks for Bedrock API compatibility
-                formatted_content = self._format_request_message_content(content_block)
-                cleaned_content.append(formatted_content)
-
-            # Create new message with cleaned content (skip if empty)
-            if cleaned_content:
-                cleaned_messages.append({"content": cleaned_content, "role": message["role"]})
-
-        if filtered_unknown_members:
+            current: OrderedDict[int, tuple[Message, tuple[Any, ...], Optional[dict[str, Any]], int, int]] = (
+                OrderedDict()
+            )
+            for message in messages:
+                fingerprint = self._message_fingerprint(message)
+                cached = self._formatted_messages.get(id(message))
+                if cached is not None and cached[0] is message and cached[1] == fingerprint:
+                    formatted, size, unknown = cached[2], cached[3], cached[4]
+                    reused += 1
+                else:
+                    formatted, unknown = self._format_bedrock_message(message)
+                    size = _approximate_size(formatted) if formatted else 0
+                current[id(message)] = (message, fingerprint, formatted, size, unknown)
+                unknown_members += unknown
+                if len(current) > MAX_FORMATTED_MESSAGES:
+                    current.popitem(last=False)
+
+                # Skip messages left empty by filtering
+                if formatted:
+                    cleaned_messages.append(formatted)
+                    approximate_bytes += size
+
+            # Entries for messages no longer in the conversation are dropped with the old cache
+            self._formatted_messages = current
+
+        if unknown_members:
             logger.warning(
                 "Filtered out SDK_UNKNOWN_MEMBER content blocks from messages, consider upgrading boto3 version"
             )
-        if dropped_deepseek_reasoning_content:
-            logger.debug(
-                "Filtered DeepSeek reasoningContent content blocks from messages - https://api-docs.deepseek.com/guides/reasoning_model#multi-round-conversation"
-            )
 
+        logger.debug(
+            "message_count=<%d>, reused=<%d>, approximate_bytes=<%d> | formatted messages",
+            len(messages),
+            reused,
+            approximate_bytes,
+        )
         return cleaned_messages
 
+    @staticmethod
+    def _message_fingerprint(message: Message) -> tuple[Any, ...]:
+        """Snapshot of everything a message's formatted form depends on.
+
+        Messages are not rebuilt once appended, but conversation managers, guardrail redaction and hooks can edit
+        them in place (swap the content list, rewrite a block's text, replace tool result content or status). The
+        snapshot compares by value, so any such edit invalidates the memoized formatting.
+
+        Args:
+            message: Message to fingerprint.
+
+        Returns:
+            A tuple equal to an earlier one only if the message's role and content are unchanged.
+        """
+        return (message["role"], _freeze(message["content"]))
+
+    def _format_bedrock_message(self, message: Message) -> tuple[Optional[dict[str, Any]], int]:
+        """Format a single message for Bedrock API compatibility.
+
+        Args:
+            message: Message to format.
+
+        Returns:
+            The formatted message (None if filtering left it without content) and the number of SDK_UNKNOWN_MEMBER
+            blocks filtered out, which the caller reports once per request.
+        """
+        cleaned_content: list[dict[str, Any]] = []
+        unknown_members = 0
+
+        for content_block in message["content"]:
+            # Filter out SDK_UNKNOWN_MEMBER content blocks
+            if "SDK_UNKNOWN_MEMBER" in content_block:
+                unknown_members += 1
+                continue
+
+            # DeepSeek models have issues with reasoningContent
+            # TODO: Replace with systematic model configuration registry (https://github.com/strands-agents/sdk-python/issues/780)
+            if "deepseek" in self.config["model_id"].lower() and "reasoningContent" in content_block:
+                logger.debug(
+                    "Filtered DeepSeek reasoningContent content blocks from messages - https://api-docs.deepseek.com/guides/reasoning_model#multi-round-conversation"
+                )
+                continue
+
+            # Format content blocks for Bedrock API compatibility
+            formatted_content = self._format_request_message_content(content_block)
+            cleaned_content.append(formatted_content)
+
+        # Create new message with cleaned content (skip if empty)
+        if not cleaned_content:
+            return None, unknown_members
+        return {"content": cleaned_content, "role": message["role"]}, unknown_members
+
     def _should_include_tool_result_status(self) -> bool:
         """Determine whether to include tool result status based on current config."""
         include_status = self.config.get("include_tool_result_status", "auto")
@@ -578,7 +811,8 @@ class BedrockModel(Model):
         """Stream conversation with the Bedrock model.
 
         This method calls either the Bedrock converse_stream API or the converse API
-        based on the streaming parameter in the configuration.
+        based on the streaming parameter in the configuration. With async_streaming enabled, converse_stream is
+        awaited natively on the running event loop with that loop's httpx client; otherwise the boto3 call runs in a worker thread.
 
         Args:
             messages: List of message objects to be processed by the model.
@@ -594,6 +828,10 @@ class BedrockModel(Model):
             ContextWindowOverflowException: If the input exceeds the model's context window.
             ModelThrottledException: If the model service is throttling requests.
         """
+        if self.config.get("streaming", True) and self.config.get("async_streaming", DEFAULT_ASYNC_STREAMING):
+            async for event in self._stream_async(messages, tool_specs, system_prompt, tool_choice):
+                yield event
+            return
 
         def callback(event: Optional[StreamEvent] = None) -> None:
             loop.call_soon_threadsafe(queue.put_nowait, event)
@@ -615,6 +853,49 @@ class BedrockModel(Model):
 
         await task
 
+    async def _stream_async(
+        self,
+        messages: Messages,
+        tool_specs: Optional[list[ToolSpec]] = None,
+        system_prompt: Optional[str] = None,
+        tool_choice: ToolChoice | None = None,
+    ) -> AsyncGenerator[StreamEvent, None]:
+        """Stream conversation with the Bedrock model over the async httpx transport.
+
+        Events are decoded from the response as bytes arrive and yielded directly, so the next chunk is only read
+        once the caller has consumed the previous events.
+
+        Args:
+            messages: List of message objects to be processed by the model.
+            tool_specs: List of tool specifications to make available to the model.
+            system_prompt: System prompt to provide context to the model.
+            tool_choice: Selection strategy for tool invocation.
+
+        Yields:
+            Model events.
+
+        Raises:
+            ContextWindowOverflowException: If the input exceeds the model's context window.
+            ModelThrottledException: If the model service is throttling requests.
+        """
+        try:
+            logger.debug("formatting request")
+            request = self.format_request(messages, tool_specs, system_prompt, tool_choice)
+            logger.debug("request=<%s>", request)
+
+            logger.debug("invoking model")
+            state = {"has_tool_use": False}
+            max_connections = self.client.meta.config.max_pool_connections or DEFAULT_MAX_POOL_CONNECTIONS
+            async for chunk in converse_stream(self.client, self.session, request, max_connections):
+                for event in self._process_stream_chunk(chunk, state):
+                    yield event
+
+        except ClientError as e:
+            self._handle_client_error(e)
+
+        finally:
+            logger.debug("finished streaming response from model")
+
     def _stream(
         self,
         callback: Callable[..., None],
@@ -650,37 +931,10 @@ class BedrockModel(Model):
             logger.debug("got response from model")
             if streaming:
                 response = self.client.converse_stream(**request)
-                # Track tool use events to fix stopReason for streaming responses
-                has_tool_use = False
+                state = {"has_tool_use": False}
                 for chunk in response["stream"]:
-                    if (
-                        "metadata" in chunk
-                        and "trace" in chunk["metadata"]
-                        and "guardrail" in chunk["metadata"]["trace"]
-                    ):
-                        guardrail_data = chunk["metadata"]["trace"]["guardrail"]
-                        if self._has_blocked_guardrail(guardrail_data):
-                            for event in self._generate_redaction_events():
-                                callback(event)
-
-                    # Track if we see tool use events
-                    if "contentBlockStart" in chunk and chunk["contentBlockStart"].get("start", {}).get("toolUse"):
-                        has_tool_use = True
-
-                    # Fix stopReason for streaming responses that contain tool use
-                    if (
-                        has_tool_use
-                        and "messageStop" in chunk
-                        and (message_stop := chunk["messageStop"]).get("stopReason") == "end_turn"
-                    ):
-                        # Create corrected chunk with tool_use stopReason
-                        modified_chunk = chunk.copy()
-                        modified_chunk["messageStop"] = message_stop.copy()
-                        modified_chunk["messageStop"]["stopReason"] = "tool_use"
-                        logger.warning("Override stop reason from end_turn to tool_use")
-                        callback(modified_chunk)
-                    else:
-                        callback(chunk)
+                    for event in self._process_stream_chunk(chunk, state):
+                        callback(event)
 
             else:
                 response = self.client.converse(**request)
@@ -696,46 +950,94 @@ class BedrockModel(Model):
                         callback(event)
 
         except ClientError as e:
-            error_message = str(e)
-
-            if e.response["Error"]["Code"] == "ThrottlingException":
-                raise ModelThrottledException(error_message) from e
+            self._handle_client_error(e)
 
-            if any(overflow_message in error_message for overflow_message in BEDROCK_CONTEXT_WINDOW_OVERFLOW_MESSAGES):
-                logger.warning("bedrock threw context window overflow error")
-                raise ContextWindowOverflowException(e) from e
+        finally:
+            callback()
+            logger.debug("finished streaming response from model")
 
-            region = self.client.meta.region_name
+    def _process_stream_chunk(self, chunk: StreamEvent, state: dict[str, bool]) -> list[StreamEvent]:
+        """Apply guardrail redaction and the tool use stopReason fix to a converse_stream chunk.
 
-            # add_note added in Python 3.11
-            if hasattr(e, "add_note"):
-                # Aid in debugging by adding more information
-                e.add_note(f"└ Bedrock region: {region}")
-                e.add_note(f"└ Model id: {self.config.get('model_id')}")
+        Args:
+            chunk: Event from the converse_stream response.
+            state: Per-response state carried across chunks (whether a tool use block has started).
 
-                if (
-                    e.response["Error"]["Code"] == "AccessDeniedException"
-                    and "You don't have access to the model" in error_message
-                ):
-                    e.add_note(
-                        "└ For more information see "
-                        "https://strandsagents.com/latest/user-guide/concepts/model-providers/amazon-bedrock/#model-access-issue"
-                    )
+        Returns:
+            The events to emit for this chunk.
+        """
+        events: list[StreamEvent] = []
+        if "metadata" in chunk and "trace" in chunk["metadata"] and "guardrail" in chunk["metadata"]["trace"]:
+            guardrail_data = chunk["metadata"]["trace"]["guardrail"]
+            if self._has_blocked_guardrail(guardrail_data):
+                events.extend(self._generate_redaction_events())
+
+        # Track if we see tool use events
+        if "contentBlockStart" in chunk and chunk["contentBlockStart"].get("start", {}).get("toolUse"):
+            state["has_tool_use"] = True
+
+        # Fix stopReason for streaming responses that contain tool use
+        if (
+            state["has_tool_use"]
+            and "messageStop" in chunk
+            and (message_stop := chunk["messageStop"]).get("stopReason") == "end_turn"
+        ):
+            # Create corrected chunk with tool_use stopReason
+            modified_chunk = chunk.copy()
+            modified_chunk["messageStop"] = message_stop.copy()
+            modified_chunk["messageStop"]["stopReason"] = "tool_use"
+            logger.warning("Override stop reason from end_turn to tool_use")
+            events.append(modified_chunk)
+        else:
+            events.append(chunk)
+        return events
 
-                if (
-                    e.response["Error"]["Code"] == "ValidationException"
-                    and "with on-demand throughput isn’t supported" in error_message
-                ):
-                    e.add_note(
-                        "└ For more information see "
-                        "https://strandsagents.com/latest/user-guide/concepts/model-providers/amazon-bedrock/#on-demand-throughput-isnt-supported"
-                    )
+    def _handle_client_error(self, e: ClientError) -> NoReturn:
+        """Raise the strands exception for a Bedrock client error, or the error itself with debugging notes.
 
-            raise e
+        Args:
+            e: The error raised by the Bedrock call.
 
-        finally:
-            callback()
-            logger.debug("finished streaming response from model")
+        Raises:
+            ContextWindowOverflowException: If the input exceeds the model's context window.
+            ModelThrottledException: If the model service is throttling requests.
+        """
+        error_message = str(e)
+
+        if e.response["Error"]["Code"] == "ThrottlingException":
+            raise ModelThrottledException(error_message) from e
+
+        if any(overflow_message in error_message for overflow_message in BEDROCK_CONTEXT_WINDOW_OVERFLOW_MESSAGES):
+            logger.warning("bedrock threw context window overflow error")
+            raise ContextWindowOverflowException(e) from e
+
+        region = self.client.meta.region_name
+
+        # add_note added in Python 3.11
+        if hasattr(e, "add_note"):
+            # Aid in debugging by adding more information
+            e.add_note(f"└ Bedrock region: {region}")
+            e.add_note(f"└ Model id: {self.config.get('model_id')}")
+
+            if (
+                e.response["Error"]["Code"] == "AccessDeniedException"
+                and "You don't have access to the model" in error_message
+            ):
+                e.add_note(
+                    "└ For more information see "
+                    "https://strandsagents.com/latest/user-guide/concepts/model-providers/amazon-bedrock/#model-access-issue"
+                )
+
+            if (
+                e.response["Error"]["Code"] == "ValidationException"
+                and "with on-demand throughput isn’t supported" in error_message
+            ):
+                e.add_note(
+                    "└ For more information see "
+                    "https://strandsagents.com/latest/user-guide/concepts/model-providers/amazon-bedrock/#on-demand-throughput-isnt-supported"
+                )
+
+        raise e
 
     def _convert_non_streaming_to_streaming(self, response: dict[str, Any]) -> Iterable[StreamEvent]:
         """Convert a non-streaming response to the streaming format.
@@ -0,0 +1,360 @@
+"""Record/replay cache for model providers.
+
+`CachingModel` wraps any `Model` and keys each call by a hash of the request the wrapped model would send
+(messages, system prompt, tool specs, tool choice and model config). Recorded stream events keep their offsets from
+the start of the call, so a replay can reproduce the original inter-chunk timing or return instantly.
+
+- ``record``: serve cached responses and record misses (read-through; useful for repeated deterministic prompts)
+- ``replay``: serve cached responses only; a miss raises `ModelCacheMissException` (offline benchmarks)
+- ``passthrough``: call the wrapped model without reading or writing the cache
+
+Only calls that stream to completion are stored. Responses are replayed verbatim, so caching only makes sense for
+deterministic requests (e.g. temperature 0) or when replaying a recorded session on purpose.
+"""
+
+import abc
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import zlib
+from typing import Any, AsyncGenerator, AsyncIterable, Literal, Optional, Type, TypeVar, Union
+
+import boto3
+from pydantic import BaseModel
+from typing_extensions import override
+
+from ..types.content import Messages
+from ..types.streaming import StreamEvent
+from ..types.tools import ToolChoice, ToolSpec
+from .model import Model
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T", bound=BaseModel)
+
+CacheMode = Literal["record", "replay", "passthrough"]
+
+CACHE_FORMAT_VERSION = 1
+DYNAMODB_MAX_ITEM_BYTES = 400 * 1024
+
+
+class ModelCacheMissException(Exception):
+    """Raised in replay mode when no recorded response exists for a request."""
+
+    pass
+
+
+def _encode(value: Any) -> Any:
+    """JSON fallback for bytes (documents, images, redacted reasoning) in requests and events."""
+    if isinstance(value, (bytes, bytearray)):
+        return {"__bytes__": base64.b64encode(value).decode("ascii")}
+    return repr(value)
+
+
+def _decode(value: dict[str, Any]) -> Any:
+    if len(value) == 1 and "__bytes__" in value:
+        return base64.b64decode(value["__bytes__"])
+    return value
+
+
+def dumps(value: Any) -> str:
+    """Serialize a cache entry (bytes are base64 encoded)."""
+    return json.dumps(value, default=_encode, separators=(",", ":"))
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Deserialize a cache entry written by `dumps`."""
+    return json.loads(data, object_hook=_decode)
+
+
+class ModelCacheStore(abc.ABC):
+    """Storage backend for recorded model responses."""
+
+    @abc.abstractmethod
+    def get(self, key: str) -> Optional[dict[str, Any]]:
+        """Return the entry recorded for a request key, if any.
+
+        Args:
+            key: Request hash.
+
+        Returns:
+            The recorded entry, or None.
+        """
+        pass
+
+    @abc.abstractmethod
+    def put(self, key: str, entry: dict[str, Any]) -> None:
+        """Store the entry for a request key.
+
+        Args:
+            key: Request hash.
+            entry: Recorded entry with "events" as [offset seconds, event] pairs.
+        """
+        pass
+
+
+class FileModelCacheStore(ModelCacheStore):
+    """One JSON file per request key in a local directory (checked-in fixtures, dev benchmarks)."""
+
+    def __init__(self, directory: str) -> None:
+        """Initialize the store.
+
+        Args:
+            directory: Directory holding <key>.json files; created if missing.
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Optional[dict[str, Any]]:
+        """Return the entry recorded for a request key, if any."""
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                return loads(f.read())
+        except FileNotFoundError:
+            return None
+
+    def put(self, key: str, entry: dict[str, Any]) -> None:
+        """Store the entry for a request key; written atomically so concurrent readers never see partial files."""
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(dumps(entry))
+        os.replace(temp_path, self._path(key))
+
+
+class DynamoDBModelCacheStore(ModelCacheStore):
+    """Entries in a DynamoDB table keyed by a string partition key, compressed, with optional TTL.
+
+    The table needs a string partition key (``cache_key`` by default). When ``ttl_seconds`` is set, items carry an
+    ``expires_at`` epoch attribute for DynamoDB TTL. Entries over the 400KB item limit are not stored.
+    """
+
+    def __init__(
+        self,
+        table_name: str,
+        *,
+        boto_session: Optional[boto3.Session] = None,
+        key_attribute: str = "cache_key",
+        ttl_seconds: Optional[int] = None,
+    ) -> None:
+        """Initialize the store.
+
+        Args:
+            table_name: DynamoDB table name.
+            boto_session: Boto session to use; a default session if not provided.
+            key_attribute: Name of the table's partition key.
+            ttl_seconds: Lifetime of stored entries, written to the expires_at attribute.
+        """
+        self.table = (boto_session or boto3.Session()).resource("dynamodb").Table(table_name)
+        self.key_attribute = key_attribute
+        self.ttl_seconds = ttl_seconds
+
+    def get(self, key: str) -> Optional[dict[str, Any]]:
+        """Return the entry recorded for a request key, if any."""
+        item = self.table.get_item(Key={self.key_attribute: key}).get("Item")
+        if not item or (item.get("expires_at") and int(item["expires_at"]) < time.time()):
+            return None
+        return loads(zlib.decompress(bytes(item["entry"])))
+
+    def put(self, key: str, entry: dict[str, Any]) -> None:
+        """Store the entry for a request key."""
+        data = zlib.compress(dumps(entry).encode("utf-8"))
+        if len(data) > DYNAMODB_MAX_ITEM_BYTES - 1024:
+            logger.warning("key=<%s>, size=<%d> | model cache entry exceeds the item size limit", key, len(data))
+            return
+        item: dict[str, Any] = {self.key_attribute: key, "entry": data}
+        if self.ttl_seconds:
+            item["expires_at"] = int(time.time()) + self.ttl_seconds
+        self.table.put_item(Item=item)
+
+
+class CachingModel(Model):
+    """Model wrapper that records and replays streamed responses.
+
+    Example:
+        ```python
+        model = CachingModel(BedrockModel(temperature=0), FileModelCacheStore(".model-cache"), mode="replay")
+        agent = Agent(model=model)
+        ```
+    """
+
+    def __init__(
+        self,
+        model: Model,
+        store: ModelCacheStore,
+        *,
+        mode: CacheMode = "record",
+        realtime: bool = False,
+    ) -> None:
+        """Initialize the wrapper.
+
+        Args:
+            model: The model provider to wrap.
+            store: Where responses are recorded.
+            mode: "record", "replay" or "passthrough".
+            realtime: Replay with the recorded inter-chunk timing instead of instantly.
+        """
+        if mode not in ("record", "replay", "passthrough"):
+            raise ValueError(f"Unknown model cache mode: {mode}")
+        self.model = model
+        self.store = store
+        self.mode = mode
+        self.realtime = realtime
+        self.stats = {"hits": 0, "misses": 0, "recorded": 0}
+        self._stats_lock = threading.Lock()
+
+    @property
+    def config(self) -> Any:
+        """Configuration of the wrapped model (read by telemetry)."""
+        return self.model.get_config()
+
+    @override
+    def update_config(self, **model_config: Any) -> None:
+        """Update the wrapped model's configuration.
+
+        Args:
+            **model_config: Configuration overrides.
+        """
+        self.model.update_config(**model_config)
+
+    @override
+    def get_config(self) -> Any:
+        """Return the wrapped model's configuration.
+
+        Returns:
+            The model's configuration.
+        """
+        return self.model.get_config()
+
+    @override
+    def structured_output(
+        self, output_model: Type[T], prompt: Messages, system_prompt: Optional[str] = None, **kwargs: Any
+    ) -> AsyncGenerator[dict[str, Union[T, Any]], None]:
+        """Get structured output from the wrapped model (not cached).
+
+        Args:
+            output_model: The output model to use for the agent.
+            prompt: The prompt messages to use for the agent.
+            system_prompt: System prompt to provide context to the model.
+            **kwargs: Additional keyword arguments for future extensibility.
+
+        Returns:
+            The wrapped model's structured output events.
+        """
+        return self.model.structured_output(output_model, prompt, system_prompt=system_prompt, **kwargs)
+
+    def request_key(
+        self,
+        messages: Messages,
+        tool_specs: Optional[list[ToolSpec]] = None,
+        system_prompt: Optional[str] = None,
+        tool_choice: ToolChoice | None = None,
+    ) -> str:
+        """Hash of the request the wrapped model would send.
+
+        Models with a `format_request` method (e.g. BedrockModel) are keyed by the formatted request, which covers
+        model id and inference config; others by the raw inputs plus their config.
+
+        Args:
+            messages: List of message objects to be processed by the model.
+            tool_specs: List of tool specifications to make available to the model.
+            system_prompt: System prompt to provide context to the model.
+            tool_choice: Selection strategy for tool invocation.
+
+        Returns:
+            Hex sha256 of the canonical JSON request.
+        """
+        format_request = getattr(self.model, "format_request", None)
+        if callable(format_request):
+            request: Any = format_request(messages, tool_specs, system_prompt, tool_choice)
+        else:
+            request = {
+                "config": self.model.get_config(),
+                "messages": messages,
+                "system_prompt": system_prompt,
+                "tool_specs": tool_specs,
+                "tool_choice": tool_choice,
+            }
+        canonical = json.dumps(
+            {"version": CACHE_FORMAT_VERSION, "request": request},
+            default=_encode,
+            sort_keys=True,
+            separators=(",", ":"),
+        )
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    async def _replay(self, entry: dict[str, Any]) -> AsyncGenerator[StreamEvent, None]:
+        started = time.monotonic()
+        for offset, event in entry["events"]:
+            if self.realtime:
+                delay = offset - (time.monotonic() - started)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            yield event
+
+    @override
+    async def stream(
+        self,
+        messages: Messages,
+        tool_specs: Optional[list[ToolSpec]] = None,
+        system_prompt: Optional[str] = None,
+        *,
+        tool_choice: ToolChoice | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterable[StreamEvent]:
+        """Stream a recorded response, or the wrapped model's response while recording it.
+
+        Args:
+            messages: List of message objects to be processed by the model.
+            tool_specs: List of tool specifications to make available to the model.
+            system_prompt: System prompt to provide context to the model.
+            tool_choice: Selection strategy for tool invocation.
+            **kwargs: Additional keyword arguments for future extensibility.
+
+        Yields:
+            Model events.
+
+        Raises:
+            ModelCacheMissException: In replay mode, when the request was never recorded.
+        """
+        if self.mode == "passthrough":
+            stream = self.model.stream(messages, tool_specs, system_prompt, tool_choice=tool_choice, **kwargs)
+            async for event in stream:
+                yield event
+            return
+
+        key = self.request_key(messages, tool_specs, system_prompt, tool_choice)
+        entry = await asyncio.to_thread(self.store.get, key)
+        if entry is not None:
+            self._count("hits")
+            logger.debug("key=<%s>, events=<%d> | model cache hit", key, len(entry["events"]))
+            async for event in self._replay(entry):
+                yield event
+            return
+
+        self._count("misses")
+        if self.mode == "replay":
+            raise ModelCacheMissException(f"No recorded model response for request {key}")
+
+        started = time.monotonic()
+        events: list[list[Any]] = []
+        async for event in self.model.stream(messages, tool_specs, system_prompt, tool_choice=tool_choice, **kwargs):
+            events.append([round(time.monotonic() - started, 4), event])
+            yield event
+
+        entry = {"version": CACHE_FORMAT_VERSION, "recorded_at": time.time(), "events": events}
+        await asyncio.to_thread(self.store.put, key, entry)
+        self._count("recorded")
+        logger.debug("key=<%s>, events=<%d> | model response recorded", key, len(events))
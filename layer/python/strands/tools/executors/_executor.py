@@ -66,7 +66,7 @@ class ToolExecutor(abc.ABC):
                 "messages": agent.messages,
                 "system_prompt": agent.system_prompt,
                 "tool_config": ToolConfig(  # for backwards compatibility
-                    tools=[{"toolSpec": tool_spec} for tool_spec in agent.tool_registry.get_all_tool_specs()],
+                    tools=agent.tool_registry.get_tool_config_entries(),
                     toolChoice=cast(ToolChoice, {"auto": ToolChoiceAuto()}),
                 ),
             }
@@ -27,6 +27,9 @@ class ToolRegistry:
     """Central registry for all tools available to the agent.
 
     This class manages tool registration, validation, discovery, and invocation.
+
+    Normalized tool specs are computed once per registry version and reused by every event loop cycle; the version
+    changes when tools are registered, reloaded or re-initialized (or on `invalidate_tool_specs`).
     """
 
     def __init__(self) -> None:
@@ -34,6 +37,23 @@ class ToolRegistry:
         self.registry: Dict[str, AgentTool] = {}
         self.dynamic_tools: Dict[str, AgentTool] = {}
         self.tool_config: Optional[Dict[str, Any]] = None
+        self._version = 0
+        self._tools_config_cache: Optional[Dict[str, Any]] = None
+        self._tool_specs_cache: Optional[List[ToolSpec]] = None
+        self._tool_config_entries_cache: Optional[List[Dict[str, Any]]] = None
+
+    @property
+    def version(self) -> int:
+        """Counter that changes whenever the set of registered tools changes."""
+        return self._version
+
+    def invalidate_tool_specs(self) -> None:
+        """Drop the cached tool specs, e.g. after changing a registered tool's spec in place."""
+        self._version += 1
+        self._tools_config_cache = None
+        self._tool_specs_cache = None
+        self._tool_config_entries_cache = None
+        logger.debug("version=<%d> | tool specs invalidated", self._version)
 
     def process_tools(self, tools: List[Any]) -> List[str]:
         """Process tools list that can contain tool names, paths, imported modules, or functions.
@@ -138,7 +158,19 @@ class ToolRegistry:
             raise ValueError(f"Failed to load tool {tool_name}: {exception_str}") from e
 
     def get_all_tools_config(self) -> Dict[str, Any]:
-        """Dynamically generate tool configuration by combining built-in and dynamic tools.
+        """Get the tool configuration combining built-in and dynamic tools.
+
+        Specs are normalized and validated once per registry version.
+
+        Returns:
+            Dictionary containing all tool configurations.
+        """
+        if self._tools_config_cache is None:
+            self._tools_config_cache = self._build_tools_config()
+        return dict(self._tools_config_cache)
+
+    def _build_tools_config(self) -> Dict[str, Any]:
+        """Normalize and validate the specs of all registered tools.
 
         Returns:
             Dictionary containing all tool configurations.
@@ -214,6 +246,7 @@ class ToolRegistry:
 
         # Register in main registry
         self.registry[tool.tool_name] = tool
+        self.invalidate_tool_specs()
 
         # Register in dynamic tools if applicable
         if tool.is_dynamic:
@@ -382,6 +415,7 @@ class ToolRegistry:
             load_tools_from_directory: Whether to reload tools if changes are made at runtime.
         """
         self.tool_config = None
+        self.invalidate_tool_specs()
 
         # Then discover and load other tools
         tool_modules = self.discover_tool_modules()
@@ -487,14 +521,31 @@ class ToolRegistry:
                 logger.debug("tool_name=<%s> | import error | %s", tool_name, error)
 
     def get_all_tool_specs(self) -> list[ToolSpec]:
-        """Get all the tool specs for all tools in this registry..
+        """Get all the tool specs for all tools in this registry.
+
+        The same list is returned until the registry changes, so model providers can reuse anything they derive
+        from it. Treat it as read-only.
 
         Returns:
             A list of ToolSpecs.
         """
-        all_tools = self.get_all_tools_config()
-        tools: List[ToolSpec] = [tool_spec for tool_spec in all_tools.values()]
-        return tools
+        if self._tool_specs_cache is None:
+            if self._tools_config_cache is None:
+                self._tools_config_cache = self._build_tools_config()
+            self._tool_specs_cache = list(self._tools_config_cache.values())
+        return self._tool_specs_cache
+
+    def get_tool_config_entries(self) -> List[Dict[str, Any]]:
+        """Get the `{"toolSpec": ...}` entries of a tool config for all tools in this registry.
+
+        Cached like `get_all_tool_specs`. Treat it as read-only.
+
+        Returns:
+            A list of tool config entries.
+        """
+        if self._tool_config_entries_cache is None:
+            self._tool_config_entries_cache = [{"toolSpec": tool_spec} for tool_spec in self.get_all_tool_specs()]
+        return self._tool_config_entries_cache
 
     def validate_tool_spec(self, tool_spec: ToolSpec) -> None:
         """Validate tool specification against required schema.
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""Benchmark BedrockModel streaming transports against a local ConverseStream stub.
+
+Compares the thread-bridged boto3 path with the async-native path (async_streaming=True)
+under concurrent streams. The stub speaks HTTP/1.1 with chunked AWS event-stream frames
+and paces tokens with a fixed delay, so results reflect transport overhead only.
+
+Usage:
+    PYTHONPATH=layer/python python scripts/benchmark_bedrock_stream.py --streams 64 --concurrency 32
+"""
+
+import os
+import json
+import time
+import struct
+import asyncio
+import argparse
+import binascii
+import threading
+
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "benchmark")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "benchmark")
+
+from strands.models.bedrock import BedrockModel
+
+MODEL_ID = "us.anthropic.claude-sonnet-4-20250514-v1:0"
+
+def encode_frame(event_type, body):
+    """AWS event-stream frame for one ConverseStream event"""
+    headers = b""
+    for name, value in ((":event-type", event_type), (":content-type", "application/json"), (":message-type", "event")):
+        headers += bytes([len(name)]) + name.encode() + b"\x07" + struct.pack("!H", len(value)) + value.encode()
+    payload = json.dumps({**body, "p": "abcdefghijklmnop"}).encode()
+    total_length = 12 + len(headers) + len(payload) + 4
+    prelude = struct.pack("!II", total_length, len(headers))
+    prelude += struct.pack("!I", binascii.crc32(prelude))
+    message = prelude + headers + payload
+    return message + struct.pack("!I", binascii.crc32(message))
+
+def stub_events(tokens):
+    yield encode_frame("messageStart", {"role": "assistant"})
+    for i in range(tokens):
+        yield encode_frame("contentBlockDelta", {"contentBlockIndex": 0, "delta": {"text": f"token{i} "}})
+    yield encode_frame("contentBlockStop", {"contentBlockIndex": 0})
+    yield encode_frame("messageStop", {"stopReason": "end_turn"})
+    yield encode_frame("metadata", {"usage": {"inputTokens": 10, "outputTokens": tokens, "totalTokens": 10 + tokens},
+                                    "metrics": {"latencyMs": 1}})
+
+class StubServer:
+    """ConverseStream stub on its own thread and event loop"""
+
+    def __init__(self, tokens, delay_ms):
+        self.tokens = tokens
+        self.delay = delay_ms / 1000
+        self.loop = asyncio.new_event_loop()
+        self.port = None
+        self._ready = threading.Event()
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.decode().split("\r\n"):
+                    if line.lower().startswith("content-length:"):
+                        length = int(line.split(":", 1)[1])
+                await reader.readexactly(length)
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/vnd.amazon.eventstream\r\n"
+                             b"Transfer-Encoding: chunked\r\n\r\n")
+                for frame in stub_events(self.tokens):
+                    writer.write(f"{len(frame):x}\r\n".encode() + frame + b"\r\n")
+                    await writer.drain()
+                    if self.delay:
+                        await asyncio.sleep(self.delay)
+                writer.write(b"0\r\n\r\n")
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        server = self.loop.run_until_complete(asyncio.start_server(self._handle, "127.0.0.1", 0))
+        self.port = server.sockets[0].getsockname()[1]
+        self._ready.set()
+        self.loop.run_forever()
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True).start()
+        self._ready.wait()
+        return f"http://127.0.0.1:{self.port}"
+
+async def run_stream(model, timings):
+    started = time.perf_counter()
+    ttft = None
+    events = 0
+    async for event in model.stream([{"role": "user", "content": [{"text": "benchmark"}]}]):
+        if ttft is None and "contentBlockDelta" in event:
+            ttft = time.perf_counter() - started
+        events += 1
+    timings.append((ttft, time.perf_counter() - started, events))
+
+async def run_mode(endpoint_url, async_streaming, streams, concurrency):
+    model = BedrockModel(model_id=MODEL_ID, region_name="us-east-1", endpoint_url=endpoint_url,
+                         async_streaming=async_streaming)
+    semaphore = asyncio.Semaphore(concurrency)
+    timings = []
+    peak_threads = threading.active_count()
+
+    async def bounded():
+        nonlocal peak_threads
+        async with semaphore:
+            await run_stream(model, timings)
+            peak_threads = max(peak_threads, threading.active_count())
+
+    await run_stream(model, [])  # Warm the connection pool
+    started = time.perf_counter()
+    await asyncio.gather(*(bounded() for _ in range(streams)))
+    elapsed = time.perf_counter() - started
+
+    ttfts = sorted(t[0] for t in timings if t[0] is not None)
+    events = sum(t[2] for t in timings)
+    return {
+        "mode": "async" if async_streaming else "thread",
+        "wall_s": round(elapsed, 3),
+        "streams_per_s": round(streams / elapsed, 1),
+        "events_per_s": round(events / elapsed, 1),
+        "ttft_p50_ms": round(ttfts[len(ttfts) // 2] * 1000, 2),
+        "ttft_p95_ms": round(ttfts[int(len(ttfts) * 0.95) - 1] * 1000, 2),
+        "peak_threads": peak_threads
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--streams", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--tokens", type=int, default=200, help="contentBlockDelta events per stream")
+    parser.add_argument("--delay-ms", type=float, default=1.0, help="stub pause between frames")
+    args = parser.parse_args()
+
+    endpoint_url = StubServer(args.tokens, args.delay_ms).start()
+    print(f"Stub ConverseStream at {endpoint_url}: {args.streams} streams, concurrency {args.concurrency}, "
+          f"{args.tokens} tokens, {args.delay_ms}ms/frame")
+    for async_streaming in (False, True):
+        print(json.dumps(asyncio.run(run_mode(endpoint_url, async_streaming, args.streams, args.concurrency))))
+
+if __name__ == "__main__":
+    main()
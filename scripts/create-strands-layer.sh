@@ -16,7 +16,7 @@ mkdir -p packaging/python
 
 # Install dependencies with correct architecture for Lambda x86_64
 echo "🔧 Installing Strands Agents SDK for x86_64..."
-pip3 install strands-agents boto3 \
+pip3 install strands-agents boto3 numpy \
     --python-version 3.11 \
     --platform manylinux2014_x86_64 \
     --target ./packaging/python \
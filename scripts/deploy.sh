@@ -2,17 +2,20 @@
 
 # Agentic Promotion Engine - Deployment Script
 # Usage: ./deploy.sh [stack-name] [profile] [region]
+#        FRONTEND_ORIGIN=https://app.example.com ./deploy.sh ...   (origin allowed to download datasets)
 
 set -e
 
 STACK_NAME=${1:-agentic-promo}
 PROFILE=${2:-infinitra-noone}
 REGION=${3:-us-east-1}
+FRONTEND_ORIGIN=${FRONTEND_ORIGIN:-http://localhost:3000}
 
 echo "🚀 Deploying Agentic Promotion Engine with Aurora"
 echo "Stack Name: $STACK_NAME"
 echo "Profile: $PROFILE"
 echo "Region: $REGION"
+echo "Frontend Origin: $FRONTEND_ORIGIN"
 
 # Validate CloudFormation template
 echo "📋 Validating CloudFormation template..."
@@ -26,7 +29,7 @@ echo "🏗️  Deploying CloudFormation stack..."
 aws cloudformation deploy \
     --template-file infrastructure/cloudformation/main.yaml \
     --stack-name $STACK_NAME \
-    --parameter-overrides Environment=prod \
+    --parameter-overrides Environment=prod FrontendOrigin=$FRONTEND_ORIGIN \
     --capabilities CAPABILITY_IAM \
     --profile $PROFILE \
     --region $REGION
@@ -39,6 +42,17 @@ aws lambda update-function-code \
     --profile $PROFILE \
     --region $REGION
 
+aws lambda update-function-code \
+    --function-name $STACK_NAME-email-outbox-worker \
+    --zip-file fileb://agentic-promo-lambda.zip \
+    --profile $PROFILE \
+    --region $REGION
+aws lambda update-function-code \
+    --function-name $STACK_NAME-snapshot-export \
+    --zip-file fileb://agentic-promo-lambda.zip \
+    --profile $PROFILE \
+    --region $REGION
+
 # aws lambda update-function-code \
 #     --function-name agentic-promo-orchestrator \
 #     --zip-file fileb://agentic-promo-lambda.zip \
@@ -1,5 +1,14 @@
 import os
 import json
+import hashlib
+from functools import lru_cache
+
+CONTEXT_TOKEN_BUDGET = int(os.environ.get('DATA_CONTEXT_TOKEN_BUDGET', '1200'))  # Compact context target
+_context_stats = {}
+COMPACT_TRIM_STEPS = (            # Applied in order while the compact context is over budget
+    {"include_routing_details": False},
+    {"include_routing_details": False, "include_descriptions": False},
+)
 
 # Hybrid Data Source Configuration - DynamoDB (Operational) + Aurora (Analytical)
 DATA_SOURCES = {
@@ -356,8 +365,26 @@ def get_relationships(data_source: str) -> dict:
     source_config = DATA_SOURCES.get(data_source, {})
     return source_config.get("relationships", {})
 
-def get_data_source_context():
-    """Generate comprehensive LLM context about available data sources"""
+@lru_cache(maxsize=1)
+def get_config_version() -> str:
+    """Fingerprint of the data source configuration - context is regenerated only when it changes
+
+    Computed once per container: the configuration is module-level and only changes with a deploy.
+    """
+    config = json.dumps([DATA_SOURCES, QUERY_ROUTING, CROSS_DATABASE_RELATIONSHIPS], sort_keys=True, default=str)
+    return hashlib.sha256(config.encode()).hexdigest()[:12]
+
+def _estimate_tokens(text: str) -> int:
+    from utils.tabular_encoder import estimate_tokens
+    return estimate_tokens(text)
+
+def _attribute_line(attributes: dict, compact: bool) -> str:
+    if compact:
+        # "name: String - Customer full name" -> "name:String"
+        return ", ".join(f"{attr}:{desc.split(' - ')[0].split(' ')[0]}" for attr, desc in attributes.items()) + "\n"
+    return "".join(f"  - {attr}: {desc}\n" for attr, desc in attributes.items())
+
+def _build_context(compact: bool = False, include_routing_details: bool = True, include_descriptions: bool = True) -> str:
     context = "# HYBRID DATA ARCHITECTURE METADATA\n\n"
     
     context += "## OPERATIONAL DATA (DynamoDB - Fast Lookups)\n"
@@ -365,7 +392,8 @@ def get_data_source_context():
         if config["type"] == "dynamodb":
             context += f"\n### {name.upper()}\n"
             context += f"**Table**: {config.get('table', 'N/A')}\n"
-            context += f"**Description**: {config['description']}\n"
+            if include_descriptions:
+                context += f"**Description**: {config['description']}\n"
             
             schema = config.get("schema", {})
             if schema:
@@ -374,12 +402,11 @@ def get_data_source_context():
                     context += f"**Indexes**: {', '.join(schema['indexes'])}\n"
                 
                 if schema.get("attributes"):
-                    context += "**Attributes**:\n"
-                    for attr, desc in schema["attributes"].items():
-                        context += f"  - {attr}: {desc}\n"
+                    context += "**Attributes**:" + (" " if compact else "\n")
+                    context += _attribute_line(schema["attributes"], compact)
             
             sample = config.get("sample_data", {})
-            if sample:
+            if sample and not compact:
                 context += f"**Sample Data**: {json.dumps(sample, indent=2)}\n"
     
     context += "\n## ANALYTICAL DATA (Aurora PostgreSQL - Complex Queries)\n"
@@ -387,22 +414,24 @@ def get_data_source_context():
     if aurora_config:
         context += f"**Cluster**: {aurora_config.get('cluster_arn', 'N/A')}\n"
         context += f"**Database**: {aurora_config.get('database', 'N/A')}\n"
-        context += f"**Description**: {aurora_config['description']}\n\n"
+        if include_descriptions:
+            context += f"**Description**: {aurora_config['description']}\n"
+        context += "\n"
         
         for table_name, table_config in aurora_config.get("tables", {}).items():
             context += f"### {table_name.upper()}\n"
-            context += f"**Description**: {table_config['description']}\n"
+            if include_descriptions:
+                context += f"**Description**: {table_config['description']}\n"
             
             schema = table_config.get("schema", {})
             if schema:
                 context += f"**Primary Key**: {schema.get('primary_key', 'N/A')}\n"
                 if schema.get("columns"):
-                    context += "**Columns**:\n"
-                    for col, desc in schema["columns"].items():
-                        context += f"  - {col}: {desc}\n"
+                    context += "**Columns**:" + (" " if compact else "\n")
+                    context += _attribute_line(schema["columns"], compact)
                 
                 sample = table_config.get("sample_data", {})
-                if sample:
+                if sample and not compact:
                     context += f"**Sample Data**: {json.dumps(sample, indent=2)}\n"
             context += "\n"
     
@@ -410,13 +439,15 @@ def get_data_source_context():
     for route_type, route_config in QUERY_ROUTING.items():
         context += f"\n### {route_type.upper()} QUERIES ({route_config['database'].upper()})\n"
         context += f"**Patterns**: {', '.join(route_config['patterns'])}\n"
-        context += f"**Description**: {route_config['description']}\n"
-        context += f"**Use Cases**: {', '.join(route_config['use_cases'])}\n"
+        if include_routing_details:
+            context += f"**Description**: {route_config['description']}\n"
+            context += f"**Use Cases**: {', '.join(route_config['use_cases'])}\n"
     
     context += "\n## CROSS-DATABASE RELATIONSHIPS\n"
     for rel_name, rel_config in CROSS_DATABASE_RELATIONSHIPS.items():
         context += f"\n### {rel_name.upper()}\n"
-        context += f"**Description**: {rel_config['description']}\n"
+        if include_descriptions:
+            context += f"**Description**: {rel_config['description']}\n"
         context += f"**Primary Source**: {rel_config['primary_source']}\n"
         context += f"**Enrichment Sources**: {', '.join(rel_config['enrichment_sources'])}\n"
         if isinstance(rel_config.get('join_key'), str):
@@ -426,6 +457,48 @@ def get_data_source_context():
     
     return context
 
+@lru_cache(maxsize=8)
+def _cached_context(version: str, compact: bool, token_budget: int) -> str:
+    """Context for one config version; the version argument keys the cache"""
+    context = _build_context(compact)
+    tokens = _estimate_tokens(context)
+    if compact and token_budget:
+        for trim in COMPACT_TRIM_STEPS:
+            if tokens <= token_budget:
+                break
+            context = _build_context(compact, **trim)
+            tokens = _estimate_tokens(context)
+        if tokens > token_budget:
+            raise ValueError(f"Compact data source context is ~{tokens} tokens even fully trimmed, over the "
+                             f"{token_budget} token budget - raise DATA_CONTEXT_TOKEN_BUDGET or shrink the schema")
+    _context_stats[(version, compact, token_budget)] = {
+        "version": version,
+        "mode": "compact" if compact else "full",
+        "chars": len(context),
+        "tokens": tokens,
+        "token_budget": token_budget,
+        "within_budget": not token_budget or tokens <= token_budget
+    }
+    print(f"[CONTEXT] Data source context v{version}: {len(context)} chars, ~{tokens} tokens "
+          f"({'compact' if compact else 'full'}{f', budget {token_budget}' if token_budget else ''})")
+    return context
+
+def get_data_source_context(compact: bool = False, token_budget: int = None) -> str:
+    """Generate comprehensive LLM context about available data sources
+
+    Built once per config version. Compact mode drops sample data and
+    collapses attribute descriptions to types, then drops routing details
+    and table/relationship descriptions while it is over token_budget.
+    Raises ValueError if the most compact form still exceeds the budget.
+    """
+    if compact and token_budget is None:
+        token_budget = CONTEXT_TOKEN_BUDGET
+    return _cached_context(get_config_version(), compact, token_budget or 0)
+
+def get_data_source_context_stats() -> list:
+    """Size of each generated context variant (chars, estimated tokens, budget)"""
+    return list(_context_stats.values())
+
 def get_data_agent_metadata():
     """Get structured metadata specifically for data agent consumption"""
     return {
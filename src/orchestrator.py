@@ -10,14 +10,29 @@ from strands.session.s3_session_manager import S3SessionManager
 
 # Import Strands tools directly (these are DecoratedFunctionTool objects)
 from tools.data_agent_tool import process_data_request
-from tools.promotion_tool import create_promotion  
-from tools.email_tool import send_email
+from tools.promotion_tool import create_promotion, create_promotions_bulk
+from tools.email_tool import send_email, get_email_outbox_status
+from tools.bulk_email_tool import send_bulk_email, confirm_bulk_email
 from tools.ui_agent_tool import generate_ui_component
 from tools.daily_briefing_agent import analyze_daily_briefing
+from tools.simulation_tool import simulate_promotion
+from tools.eligibility_tool import resolve_promotion_audience
+from tools.offer_decisioning_tool import get_best_offers
 from streaming import send_stream_message
+from utils.model_factory import create_model, NOVA_PREMIER
 # from utils.progress_manager import ProgressManager
 from tools.data_agent_tool import set_global_callback as set_data_callback
 from tools.ui_agent_tool import set_global_callback as set_ui_callback
+from tools.email_outbox import set_stream_context as set_outbox_stream_context
+from tools.data_channel import set_stream_context as set_dataset_stream_context, send_dataset_page, PAGE_SIZE
+from tools.result_store import begin_request, end_request
+from utils.aws_clients import warm_clients, get_client_metrics
+
+AWS_METRICS_EVERY = 50            # Requests between client metrics log lines (plus the cold start)
+
+# Pooled AWS clients are built during Lambda init rather than on the first request
+warm_clients()
+_requests_handled = 0
 
 
 class DecimalEncoder(json.JSONEncoder):
@@ -101,11 +116,16 @@ def create_streaming_agent(connection_id, stream_context, user_input="", callbac
         - Action Agents: Business operations (promotions, emails)
 
         AVAILABLE TOOLS:
-        - process_data_request: For data retrieval ONLY (no analysis)
+        - process_data_request: For data retrieval ONLY (no analysis) - returns result handles, not rows
         - analyze_daily_briefing: For daily business intelligence analysis
         - generate_ui_component: For data visualization and UI generation
         - create_promotion: For creating promotions with business logic
+        - simulate_promotion: For what-if redemption, revenue and margin estimates before launching a promotion
+        - resolve_promotion_audience: For exactly how many (and which) customers a promotion or targeting rule reaches
+        - get_best_offers: For the best active offers for specific customers (pass all customer_ids in one call)
         - send_email: For sending personalized emails via AWS SES
+        - send_bulk_email: For campaign emails to a whole segment/audience in ONE call (never loop send_email) - previews only, the user confirms the send in the UI
+        - get_email_outbox_status: For delivery status of queued emails (send tools return an outbox_id immediately)
 
         IMMEDIATE RESPONSE EXAMPLES:
         - "What was the churn risk for Sarah Wilson?" → Answer from conversation history
@@ -119,6 +139,10 @@ def create_streaming_agent(connection_id, stream_context, user_input="", callbac
         - "analyze/insights/trends" → process_data_request → [analysis agent] → generate_ui_component
         - "create/update/delete" → process_data_request → action tool → generate_ui_component
         - "send email" → send_email tool
+        - "email campaign/email all/email segment" → send_bulk_email preview (explicit target_segment) → show recipient count and samples → the user confirms with the Confirm button (you cannot send it yourself)
+        - "what if/simulate/compare discounts" → simulate_promotion (sweep discount_levels in one call)
+        - "who/how many customers would this promotion reach" → resolve_promotion_audience (promotion_id or targeting fields)
+        - "which offer/best promotion for customer X" → get_best_offers
 
         DAILY BRIEFING REQUIREMENTS:
         - MUST use analyze_daily_briefing tool for briefing requests
@@ -133,7 +157,7 @@ def create_streaming_agent(connection_id, stream_context, user_input="", callbac
         3. If no: Parse intent and identify required agents
         4. For DAILY BRIEFING requests: Skip UI generation completely
         5. For other requests: Delegate data retrieval to Data Agent first
-        6. Pass raw data to Analysis Agents for insights
+        6. Pass result handles (e.g. "res-1a2b3c4d5e6f") from process_data_request as raw_data to Analysis and UI agents - never copy rows
         7. Coordinate results and delegate UI generation (except briefings)
         8. Present unified response with insights
 
@@ -171,9 +195,9 @@ def create_streaming_agent(connection_id, stream_context, user_input="", callbac
         """
     
     agent = Agent(
-        model="us.amazon.nova-premier-v1:0",
+        model=create_model(NOVA_PREMIER, "orchestrator"),
         system_prompt=system_prompt,
-        tools=[process_data_request, analyze_daily_briefing, generate_ui_component, send_email],
+        tools=[process_data_request, analyze_daily_briefing, generate_ui_component, send_email, send_bulk_email, get_email_outbox_status, simulate_promotion, resolve_promotion_audience, get_best_offers],
         callback_handler=callback_handler,
         session_manager=session_manager,
         conversation_manager=conversation_manager
@@ -276,6 +300,14 @@ def extract_structured_data_fast(response_text):
                 "type": "form",
                 "data": parsed_data['created']
             }
+        elif 'outbox_id' in parsed_data:
+            return {
+                "type": "notification",
+                "data": {
+                    "message": f"Email queued for {parsed_data.get('sent_to') or parsed_data.get('target_segment', 'recipients')}",
+                    "outbox_id": parsed_data['outbox_id']
+                }
+            }
         elif 'message_id' in parsed_data:
             return {
                 "type": "notification",
@@ -304,6 +336,44 @@ def classify_and_parse_input(user_input):
                 "original": user_input
             }
         
+        # Briefing context actions - what-if simulation
+        elif user_input.startswith("Simulate promotion:"):
+            json_str = user_input.replace("Simulate promotion:", "").strip()
+            return {
+                "type": "direct_tool_call",
+                "tool": "simulate_promotion",
+                "params": json.loads(json_str),
+                "original": user_input
+            }
+        
+        # Campaign confirmation - the token was pushed to this user's screen, never to the agent
+        elif user_input.startswith("Confirm campaign:"):
+            json_str = user_input.replace("Confirm campaign:", "").strip()
+            return {
+                "type": "direct_tool_call",
+                "tool": "confirm_bulk_email",
+                "params": json.loads(json_str),
+                "original": user_input
+            }
+        
+        # Outbox polling - delivery status of queued emails
+        elif user_input.startswith("Outbox status:"):
+            return {
+                "type": "direct_tool_call",
+                "tool": "get_email_outbox_status",
+                "params": {"outbox_id": user_input.replace("Outbox status:", "").strip()},
+                "original": user_input
+            }
+        
+        # Virtualized table scrolling - next page of a published dataset
+        elif user_input.startswith("Fetch data page:"):
+            json_str = user_input.replace("Fetch data page:", "").strip()
+            return {
+                "type": "data_page",
+                "params": json.loads(json_str),
+                "original": user_input
+            }
+        
         # Natural language - agent processing
         else:
             return {
@@ -321,14 +391,26 @@ def classify_and_parse_input(user_input):
 def execute_tool_directly(tool_name, params):
     """Execute tool directly with structured parameters"""
     tools_map = {
-        "create_promotion": create_promotion
+        "create_promotion": create_promotion,
+        "create_promotions_bulk": create_promotions_bulk,
+        "simulate_promotion": simulate_promotion,
+        "get_email_outbox_status": get_email_outbox_status,
+        "confirm_bulk_email": confirm_bulk_email
     }
     
     if tool_name in tools_map:
+        # Form submissions carry a per-submission idempotency_key from the frontend
         return tools_map[tool_name](**params)
     else:
         raise ValueError(f"Unknown tool: {tool_name}")
 
+def _log_client_metrics():
+    """Log AWS client latency on the container's first request and every AWS_METRICS_EVERY after"""
+    global _requests_handled
+    _requests_handled += 1
+    if _requests_handled == 1 or _requests_handled % AWS_METRICS_EVERY == 0:
+        print(f"[AWS] Client metrics after {_requests_handled} requests: {get_client_metrics()}")
+
 def lambda_handler(event, context):
     """Hybrid orchestrator with direct tool routing and agent processing"""
     try:
@@ -355,9 +437,24 @@ def lambda_handler(event, context):
         from streaming import create_streaming_callback
         callback_handler = create_streaming_callback(stream_context)
         
+        # Outbox drains push delivery updates to this connection
+        set_outbox_stream_context(stream_context)
+        
+        # Published datasets stream their pages to this connection
+        set_dataset_stream_context(stream_context)
+        
         # Classify and parse input
         parsed_request = classify_and_parse_input(user_input)
         
+        if parsed_request["type"] == "data_page":
+            # Data frames only - no acknowledgment or chat response
+            params = parsed_request["params"]
+            send_dataset_page(params["dataset_id"], params.get("offset", 0), params.get("limit", PAGE_SIZE))
+            return {"statusCode": 200}
+        
+        # Result handles belong to this connection's session and stay resolvable for follow-ups
+        begin_request(connection_id)
+        
         if parsed_request["type"] == "direct_tool_call":
             # ORCHESTRATOR HANDLES: Direct tool execution
             print(f"🎯 Direct tool call: {parsed_request['tool']}")
@@ -437,6 +534,7 @@ def lambda_handler(event, context):
                 "structured_data": structured_data
             })
         
+        _log_client_metrics()
         return {"statusCode": 200}
         
     except Exception as e:
@@ -453,3 +551,7 @@ def lambda_handler(event, context):
             pass
             
         return {"statusCode": 500, "body": json.dumps({"error": str(e)})}
+    
+    finally:
+        # Result handles must reach S3 before Lambda freezes the container
+        end_request()
@@ -1,10 +1,9 @@
 """Strands-native streaming infrastructure using callback handlers"""
 
 import json
-import boto3
 from datetime import datetime
-from functools import lru_cache
 from decimal import Decimal
+from utils.aws_clients import get_client
 
 class DecimalEncoder(json.JSONEncoder):
     def default(self, obj):
@@ -12,10 +11,9 @@ class DecimalEncoder(json.JSONEncoder):
             return float(obj)
         return super(DecimalEncoder, self).default(obj)
 
-@lru_cache(maxsize=1)
 def get_websocket_client(endpoint_url):
-    """Cached WebSocket client"""
-    return boto3.client('apigatewaymanagementapi', endpoint_url=endpoint_url)
+    """Shared WebSocket client"""
+    return get_client('apigatewaymanagementapi', endpoint_url=endpoint_url)
 
 def send_stream_message(stream_context, message):
     """Send streaming message via WebSocket"""
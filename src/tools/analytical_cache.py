@@ -0,0 +1,244 @@
+"""Optional SQLite analytical cache in /tmp - warm containers answer analytical SQL locally
+
+Enabled with ANALYTICAL_CACHE_ENABLED=true. Tables are loaded by parallel
+scan (DynamoDB segments, paged Aurora hash partitions) and indexed for the
+common filters. Only a table that was never loaded blocks the query; once
+older than ANALYTICAL_CACHE_TTL_SECONDS it is reloaded in a background
+thread while queries keep reading the stale copy.
+"""
+
+import os
+import re
+import time
+import sqlite3
+import threading
+from decimal import Decimal
+from concurrent.futures import ThreadPoolExecutor
+from config.data_sources import get_data_sources
+from tools.sql_guard import strip_sql
+
+CACHE_PATH = os.environ.get('ANALYTICAL_CACHE_PATH', '/tmp/analytics_cache.db')
+CACHE_TTL_SECONDS = int(os.environ.get('ANALYTICAL_CACHE_TTL_SECONDS', '300'))
+SCAN_SEGMENTS = 4                 # Parallel DynamoDB scan segments / Aurora hash partitions
+AURORA_PAGE_ROWS = 1000           # Rows per Data API call - keeps responses under the 1 MB limit
+CACHE_ROW_LIMIT = 1000            # LIMIT wrapped around every cached query
+
+CACHE_TABLES = {
+    "customers": {
+        "engine": "dynamodb",
+        "columns": {
+            "id": "TEXT PRIMARY KEY", "name": "TEXT", "email": "TEXT", "join_date": "TEXT",
+            "total_spent": "REAL", "lifecycle_stage": "TEXT", "segment": "TEXT", "segment_id": "TEXT",
+            "last_segment_update": "TEXT", "preferences_channel": "TEXT", "preferences_categories": "TEXT"
+        },
+        "indexes": [["segment_id"], ["lifecycle_stage"], ["segment"]]
+    },
+    "orders": {
+        "engine": "dynamodb",
+        "columns": {
+            "id": "TEXT PRIMARY KEY", "customer_id": "TEXT", "date": "TEXT", "amount": "REAL", "status": "TEXT",
+            "items": "TEXT", "behavioral_flags_channel": "TEXT", "behavioral_flags_seasonal": "TEXT"
+        },
+        "indexes": [["customer_id", "date"], ["date"], ["status"]]
+    },
+    "customer_metrics": {
+        "engine": "aurora",
+        "columns": {
+            "customer_id": "TEXT PRIMARY KEY", "total_orders": "INTEGER", "total_spent": "REAL",
+            "avg_order_value": "REAL", "days_since_last_order": "INTEGER", "recency_score": "INTEGER",
+            "frequency_score": "INTEGER", "monetary_score": "INTEGER", "rfm_segment": "TEXT",
+            "lifecycle_stage": "TEXT", "churn_probability": "REAL", "last_calculated": "TEXT"
+        },
+        "indexes": [["lifecycle_stage"], ["rfm_segment"], ["churn_probability"]]
+    }
+}
+
+def cache_enabled():
+    return os.environ.get('ANALYTICAL_CACHE_ENABLED', 'false').lower() == 'true'
+
+def referenced_tables(sql):
+    return [name for name in CACHE_TABLES if re.search(rf"\b{name}\b", sql, re.IGNORECASE)]
+
+def _flatten(item, prefix=""):
+    """DynamoDB item -> SQLite row (maps flattened with _, sets/lists joined with ;)"""
+    row = {}
+    for key, value in item.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            row.update(_flatten(value, f"{name}_"))
+        elif isinstance(value, (set, list, tuple)):
+            row[name] = ";".join(sorted(str(v) for v in value))
+        elif isinstance(value, Decimal):
+            row[name] = float(value)
+        else:
+            row[name] = value
+    return row
+
+class AnalyticalCache:
+    """SQLite copy of the analytical working set, with per-table freshness"""
+
+    def __init__(self, path=CACHE_PATH, ttl=CACHE_TTL_SECONDS):
+        self.path = path
+        self.ttl = ttl
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.RLock()
+        self._refreshing = set()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS cache_meta (table_name TEXT PRIMARY KEY, loaded_at REAL, row_count INTEGER, load_ms REAL)")
+            for name, table in CACHE_TABLES.items():
+                columns = ", ".join(f"{column} {kind}" for column, kind in table["columns"].items())
+                self._conn.execute(f"CREATE TABLE IF NOT EXISTS {name} ({columns})")
+                for index in table["indexes"]:
+                    self._conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{name}_{'_'.join(index)} ON {name} ({', '.join(index)})")
+            self._conn.commit()
+
+    def freshness(self, tables=None):
+        """Load time and age of cached tables"""
+        with self._lock:
+            rows = self._conn.execute("SELECT table_name, loaded_at, row_count FROM cache_meta").fetchall()
+        now = time.time()
+        return {
+            name: {"loaded_at": loaded_at, "age_seconds": round(now - loaded_at, 1), "row_count": count}
+            for name, loaded_at, count in rows if tables is None or name in tables
+        }
+
+    def is_fresh(self, name):
+        entry = self.freshness([name]).get(name)
+        return entry is not None and entry["age_seconds"] <= self.ttl
+
+    def _write(self, name, rows):
+        columns = list(CACHE_TABLES[name]["columns"])
+        placeholders = ", ".join("?" for _ in columns)
+        values = [tuple(row.get(column) for column in columns) for row in rows]
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {name}")
+            self._conn.executemany(f"INSERT OR REPLACE INTO {name} ({', '.join(columns)}) VALUES ({placeholders})", values)
+            self._conn.commit()
+
+    def load(self, name, dynamodb=None, rds_data=None, connection=None):
+        """Reload one table from its source by parallel scan"""
+        started = time.time()
+        if CACHE_TABLES[name]["engine"] == "dynamodb":
+            rows = [_flatten(item) for item in parallel_scan(dynamodb, get_data_sources()[name]["table"])]
+        else:
+            rows = parallel_aurora_fetch(rds_data, connection, name, list(CACHE_TABLES[name]["columns"]))
+        self._write(name, rows)
+        load_ms = (time.time() - started) * 1000
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO cache_meta VALUES (?, ?, ?, ?)", (name, time.time(), len(rows), load_ms))
+            self._conn.commit()
+        print(f"[ANALYTICAL CACHE] Loaded {name}: {len(rows)} rows in {load_ms:.0f}ms")
+
+    def ensure_fresh(self, tables, dynamodb=None, rds_data=None, connection=None):
+        """Load missing tables now; refresh stale ones in the background and serve the stale copy meanwhile"""
+        loaded = self.freshness(tables)
+        missing = [name for name in tables if name not in loaded]
+        stale = [name for name in tables if name in loaded and loaded[name]["age_seconds"] > self.ttl]
+        if missing:
+            with ThreadPoolExecutor(max_workers=len(missing)) as executor:
+                list(executor.map(lambda name: self.load(name, dynamodb, rds_data, connection), missing))
+        for name in stale:
+            self.refresh_in_background(name, dynamodb, rds_data, connection)
+
+    def refresh_in_background(self, name, dynamodb=None, rds_data=None, connection=None):
+        """Reload a table in a daemon thread; at most one refresh per table at a time"""
+        with self._lock:
+            if name in self._refreshing:
+                return
+            self._refreshing.add(name)
+
+        def run():
+            try:
+                self.load(name, dynamodb, rds_data, connection)
+            except Exception as e:
+                print(f"[ANALYTICAL CACHE] Background refresh of {name} failed: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(name)
+
+        threading.Thread(target=run, name=f"analytical-cache-{name}", daemon=True).start()
+
+    def query(self, sql, params=None, row_limit=CACHE_ROW_LIMIT):
+        """Run a read-only query capped at row_limit rows
+
+        Returns (rows as dicts, freshness of the tables it touched, whether rows were cut off).
+        """
+        tables = referenced_tables(sql)
+        statement = strip_sql(sql)
+        if ";" in statement:
+            raise ValueError("Only a single SQL statement is allowed")
+        started = time.time()
+        with self._lock:
+            self._conn.execute("PRAGMA query_only = ON")
+            try:
+                # One extra row tells a capped result from one that fits exactly
+                cursor = self._conn.execute(f"SELECT * FROM ({statement}) AS cached LIMIT {int(row_limit) + 1}", params or [])
+                columns = [d[0] for d in cursor.description or []]
+                rows = [dict(zip(columns, values)) for values in cursor.fetchall()]
+            finally:
+                self._conn.execute("PRAGMA query_only = OFF")
+        truncated = len(rows) > row_limit
+        rows = rows[:row_limit]
+        print(f"[ANALYTICAL CACHE] {len(rows)} rows in {(time.time() - started) * 1000:.1f}ms")
+        return rows, self.freshness(tables), truncated
+
+def parallel_scan(dynamodb, table_name, segments=SCAN_SEGMENTS):
+    """Full table scan split across DynamoDB parallel scan segments"""
+    def scan_segment(segment):
+        table = dynamodb.Table(table_name)
+        scan_args = {"Segment": segment, "TotalSegments": segments}
+        items = []
+        while True:
+            response = table.scan(**scan_args)
+            items.extend(response['Items'])
+            if 'LastEvaluatedKey' not in response:
+                return items
+            scan_args['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    with ThreadPoolExecutor(max_workers=segments) as executor:
+        return [item for items in executor.map(scan_segment, range(segments)) for item in items]
+
+def parallel_aurora_fetch(rds_data, connection, table_name, columns, partitions=SCAN_SEGMENTS, page_rows=AURORA_PAGE_ROWS):
+    """Full table read split into hash partitions of the first (key) column, fetched concurrently
+
+    Each partition is read in keyset pages of page_rows so no single Data API
+    response approaches the 1 MB limit.
+    """
+    key = columns[0]
+    sql = (f"SELECT {', '.join(columns)} FROM {table_name} "
+           f"WHERE (hashtext({key}) & 2147483647) % {partitions} = :part")  # abs() overflows on INT_MIN
+
+    def fetch(part):
+        rows, after = [], None
+        while True:
+            parameters = [{"name": "part", "value": {"longValue": part}}]
+            page_sql = sql
+            if after is not None:
+                page_sql += f" AND {key} > :after"
+                parameters.append({"name": "after", "value": {"stringValue": str(after)}})
+            response = rds_data.execute_statement(
+                resourceArn=connection["cluster_arn"],
+                secretArn=connection["secret_arn"],
+                database=connection["database"],
+                sql=f"{page_sql} ORDER BY {key} LIMIT {int(page_rows)}",
+                parameters=parameters
+            )
+            records = response.get("records", [])
+            rows.extend({columns[i]: None if field.get("isNull") else next(iter(field.values())) for i, field in enumerate(record)}
+                        for record in records)
+            if len(records) < page_rows:
+                return rows
+            after = rows[-1][key]
+
+    with ThreadPoolExecutor(max_workers=partitions) as executor:
+        return [row for rows in executor.map(fetch, range(partitions)) for row in rows]
+
+_analytical_cache = None
+
+def get_analytical_cache():
+    """Get or create the container's analytical cache"""
+    global _analytical_cache
+    if _analytical_cache is None:
+        _analytical_cache = AnalyticalCache()
+    return _analytical_cache
@@ -0,0 +1,446 @@
+"""Bulk campaign email sender - templated sends through a rate-limited worker pool
+
+Campaigns are confirmed out of band: the preview pushes a confirmation token
+to the requesting user's connection only, never to the agent, and the UI
+sends it back through the direct "Confirm campaign:" route.
+"""
+
+import os
+import json
+import time
+import hmac
+import hashlib
+import uuid
+import random
+import string
+import threading
+from decimal import Decimal
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from botocore.exceptions import ClientError
+from strands.tools import tool
+from tools.eligibility_tool import EligibilityRule, stream_audience
+from utils.aws_clients import get_client
+
+DEFAULT_WORKERS = 8
+DEFAULT_BATCH_SIZE = 100          # Progress is reported once per batch
+DEFAULT_SEND_RATE = 14.0          # SES default MaxSendRate (messages/second)
+MAX_THROTTLE_RETRIES = 5
+THROTTLE_ERROR_CODES = {"Throttling", "ThrottlingException", "TooManyRequestsException"}
+# Per-process fallback only works when preview and confirmation hit the same container (local runs)
+CONFIRMATION_SECRET = os.environ.get('CAMPAIGN_CONFIRMATION_SECRET') or os.urandom(32).hex()
+
+class DecimalEncoder(json.JSONEncoder):
+    def default(self, obj):
+        if isinstance(obj, Decimal):
+            return float(obj)
+        return super(DecimalEncoder, self).default(obj)
+
+def get_ses_client():
+    """Shared SES client"""
+    return get_client('ses')
+
+class ThrottledError(Exception):
+    """Transport-level throttle (retried with backoff)"""
+
+class SESTransport:
+    """Sends through AWS SES and exposes the account send rate"""
+
+    def __init__(self, client=None):
+        self.client = client or get_ses_client()
+
+    def max_send_rate(self):
+        try:
+            return float(self.client.get_send_quota()['MaxSendRate'])
+        except Exception as e:
+            print(f"[BULK EMAIL] Could not read SES send quota, using default: {e}")
+            return DEFAULT_SEND_RATE
+
+    def send(self, from_email, to_email, subject, body):
+        try:
+            response = self.client.send_email(
+                Source=from_email,
+                Destination={'ToAddresses': [to_email]},
+                Message={
+                    'Subject': {'Data': subject, 'Charset': 'UTF-8'},
+                    'Body': {
+                        'Text': {'Data': body, 'Charset': 'UTF-8'}
+                    }
+                }
+            )
+            return response['MessageId']
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in THROTTLE_ERROR_CODES:
+                raise ThrottledError(str(e))
+            raise
+
+class LocalTransport:
+    """In-process stand-in for SES - records messages, can inject latency and throttles"""
+
+    def __init__(self, send_rate=DEFAULT_SEND_RATE, latency=0.0, throttle_every=0, fail_addresses=()):
+        self.send_rate = send_rate
+        self.latency = latency
+        self.throttle_every = throttle_every
+        self.fail_addresses = set(fail_addresses)
+        self.sent = []
+        self._calls = 0
+        self._lock = threading.Lock()
+
+    def max_send_rate(self):
+        return self.send_rate
+
+    def send(self, from_email, to_email, subject, body):
+        with self._lock:
+            self._calls += 1
+            calls = self._calls
+        if self.latency:
+            time.sleep(self.latency)
+        if self.throttle_every and calls % self.throttle_every == 0:
+            raise ThrottledError("Maximum sending rate exceeded.")
+        if to_email in self.fail_addresses:
+            raise ValueError(f"Email address is not verified: {to_email}")
+        message_id = f"local-{uuid.uuid4()}"
+        with self._lock:
+            self.sent.append({"message_id": message_id, "from": from_email, "to": to_email, "subject": subject, "body": body})
+        return message_id
+
+class TokenBucket:
+    """Thread-safe token bucket - refills at `rate` tokens/second up to `capacity`"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(1.0, rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                wait_for = (1.0 - self._tokens) / self.rate
+            time.sleep(wait_for)
+
+class _Fields(dict):
+    """Template fields - missing personalization values render as empty strings"""
+
+    def __missing__(self, key):
+        return ""
+
+def validate_template(template):
+    """Reject templates that are not plain text with bare {field} placeholders
+
+    Positional ({0}), indexed ({x[1]}), attribute ({x.y}) and formatted
+    ({x:>10}) fields and stray braces all fail here, once, before anything
+    is rendered or queued.
+    """
+    try:
+        parsed = list(string.Formatter().parse(template))
+    except ValueError as e:
+        raise ValueError(f"Invalid template {template[:60]!r}: {e}")
+    for _, field_name, format_spec, conversion in parsed:
+        if field_name is None:
+            continue
+        if not field_name.isidentifier() or format_spec or conversion:
+            raise ValueError(f"Invalid template placeholder {{{field_name}}} - use bare names like {{first_name}}")
+    return template
+
+def render_template(template, recipient):
+    """Render {field} placeholders from a recipient record (template checked by validate_template)"""
+    fields = _Fields({k: (float(v) if isinstance(v, Decimal) else v) for k, v in recipient.items()})
+    name = str(recipient.get('name') or '')
+    fields.setdefault('first_name', name.split(' ')[0] if name else '')
+    return template.format_map(fields)
+
+class BulkEmailSender:
+    """Sends rendered messages through a worker pool under the transport's send rate
+
+    Messages are consumed lazily, so at most `workers * 2` are in flight
+    regardless of how many there are. One sender (and its token bucket) is
+    meant to live as long as the process sending through it.
+    """
+
+    def __init__(self, transport=None, workers=DEFAULT_WORKERS, send_rate=None, batch_size=DEFAULT_BATCH_SIZE,
+                 max_retries=MAX_THROTTLE_RETRIES, on_batch=None):
+        self.transport = transport or SESTransport()
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.on_batch = on_batch
+        self.bucket = TokenBucket(send_rate or self.transport.max_send_rate())
+
+    def _deliver(self, message):
+        """Send one message, retrying throttles in place; returns (result, exception or None)"""
+        to_email = message.get('to_email')
+        result = {"customer_id": message.get('customer_id'), "email": to_email, "retries": 0}
+        if not to_email:
+            return {**result, "error": "missing email"}, ValueError("missing email")
+
+        for attempt in range(self.max_retries + 1):
+            result["retries"] = attempt
+            self.bucket.acquire()
+            try:
+                result["message_id"] = self.transport.send(message['from_email'], to_email, message['subject'], message['body'])
+                return result, None
+            except ThrottledError as e:
+                if attempt == self.max_retries:
+                    return {**result, "error": f"throttled: {e}"}, e
+                # Full jitter backoff
+                time.sleep(random.uniform(0, min(5.0, 0.1 * (2 ** attempt))))
+            except Exception as e:
+                return {**result, "error": str(e)}, e
+
+    def _send_one(self, message, on_result):
+        result, error = self._deliver(message)
+        if on_result:
+            on_result(message, result, error)
+        return result
+
+    def send_messages(self, messages, on_result=None):
+        """Send rendered messages [{from_email, to_email, subject, body, customer_id}]
+
+        `on_result(message, result, error)` runs on the worker thread right
+        after each send, so callers can record delivery state as it happens.
+        Returns totals, failures and per-batch throughput stats.
+        """
+        batches = []
+        failures = []
+        totals = {"sent": 0, "failed": 0, "retries": 0}
+        batch = {"sent": 0, "failed": 0, "started": time.perf_counter()}
+        started = time.perf_counter()
+
+        def close_batch():
+            elapsed = time.perf_counter() - batch["started"]
+            stats = {
+                "batch": len(batches) + 1,
+                "sent": batch["sent"],
+                "failed": batch["failed"],
+                "seconds": round(elapsed, 3),
+                "throughput_per_sec": round(batch["sent"] / elapsed, 2) if elapsed > 0 else 0.0
+            }
+            batches.append(stats)
+            if self.on_batch:
+                self.on_batch(stats)
+            batch.update({"sent": 0, "failed": 0, "started": time.perf_counter()})
+
+        def record(result):
+            totals["retries"] += result.get("retries", 0)
+            if "error" in result:
+                totals["failed"] += 1
+                batch["failed"] += 1
+                failures.append(result)
+            else:
+                totals["sent"] += 1
+                batch["sent"] += 1
+            if batch["sent"] + batch["failed"] >= self.batch_size:
+                close_batch()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            pending = set()
+            for message in messages:
+                if len(pending) >= self.workers * 2:
+                    completed, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in completed:
+                        record(future.result())
+                pending.add(executor.submit(self._send_one, message, on_result))
+            for future in pending:
+                record(future.result())
+
+        if batch["sent"] + batch["failed"]:
+            close_batch()
+
+        elapsed = time.perf_counter() - started
+        return {
+            **totals,
+            "seconds": round(elapsed, 3),
+            "throughput_per_sec": round(totals["sent"] / elapsed, 2) if elapsed > 0 else 0.0,
+            "send_rate_limit": self.bucket.rate,
+            "batches": batches,
+            "failures": failures
+        }
+
+    def send(self, audience, subject_template, body_template, from_email, on_result=None):
+        """Render a template for every recipient in `audience` and send it"""
+        validate_template(subject_template)
+        validate_template(body_template)
+
+        def messages():
+            for recipient in audience:
+                to_email = recipient.get('email')
+                yield {
+                    "from_email": from_email,
+                    "to_email": to_email,
+                    "subject": render_template(subject_template, recipient) if to_email else "",
+                    "body": render_template(body_template, recipient) if to_email else "",
+                    "customer_id": recipient.get('id')
+                }
+
+        return self.send_messages(messages(), on_result=on_result)
+
+ENQUEUE_CHUNK_SIZE = 500
+PREVIEW_SAMPLE_SIZE = 3
+CAMPAIGN_ATTRIBUTES = ['id', 'name', 'email', 'segment', 'segment_id', 'total_spent']
+
+def _campaign_fingerprint(subject_template, body_template, rule, from_email):
+    """Stable hash of what a campaign would send and to whom"""
+    return hashlib.sha256(
+        json.dumps([subject_template, body_template, rule.to_dict(), from_email], sort_keys=True, cls=DecimalEncoder).encode('utf-8')
+    ).hexdigest()
+
+def preview_campaign(audience, subject_template, body_template, sample_size=PREVIEW_SAMPLE_SIZE):
+    """Count an audience and render a few sample messages without sending anything"""
+    preview = {"recipients": 0, "skipped_no_email": 0, "samples": []}
+    for recipient in audience:
+        if not recipient.get('email'):
+            preview["skipped_no_email"] += 1
+            continue
+        preview["recipients"] += 1
+        if len(preview["samples"]) < sample_size:
+            preview["samples"].append({
+                "to_email": recipient['email'],
+                "subject": render_template(subject_template, recipient),
+                "body": render_template(body_template, recipient)
+            })
+    return preview
+
+def _confirmation_token(fingerprint, connection_id):
+    """Token that confirms one campaign from one connection - unguessable without the secret"""
+    message = f"{connection_id}|{fingerprint}".encode('utf-8')
+    return hmac.new(CONFIRMATION_SECRET.encode('utf-8'), message, hashlib.sha256).hexdigest()[:32]
+
+def _campaign(subject_template, body_template, target_segment, lifecycle_stages, min_spend, channels, from_email):
+    """Validate templates and build the audience rule and fingerprint of a campaign"""
+    # Bad placeholders fail here, before any recipient is rendered or queued
+    validate_template(subject_template)
+    validate_template(body_template)
+    rule = EligibilityRule(target_segment, lifecycle_stages, min_spend, None, channels)
+    return rule, _campaign_fingerprint(subject_template, body_template, rule, from_email)
+
+@tool
+def send_bulk_email(subject_template: str, body_template: str, target_segment: str, lifecycle_stages: list = None,
+                    min_spend: float = None, channels: list = None, campaign_key: str = None,
+                    from_email: str = "noreply@infinitra.com") -> str:
+    """
+    Preview a personalized campaign email to every customer in an audience and ask the user to confirm it
+
+    Nothing is sent by this tool. The result has the recipient count and sample renders;
+    the user confirms the send with the button shown alongside the preview, and the
+    campaign is then queued in the durable outbox.
+
+    Args:
+        subject_template: Subject with {field} placeholders (e.g., "{first_name}, we miss you")
+        body_template: Body with {field} placeholders (name, first_name, email, segment, total_spent)
+        target_segment: Segment id or name to target (e.g., "AT_RISK", "VIP"); "all" only if the user asked for every customer
+        lifecycle_stages: Optional lifecycle stages (e.g., ["Dormant"])
+        min_spend: Optional minimum total_spent
+        channels: Optional preferred channels (e.g., ["email"])
+        campaign_key: Optional dedup scope; a recipient gets at most one email per campaign key
+        from_email: Sender email address (default: noreply@infinitra.com)
+
+    Returns:
+        JSON preview with recipient count and sample messages
+    """
+    try:
+        # Local import - the outbox builds on this module's transports
+        from tools.email_outbox import current_connection_id, push_to_requester
+
+        rule, fingerprint = _campaign(subject_template, body_template, target_segment, lifecycle_stages,
+                                      min_spend, channels, from_email)
+        preview = preview_campaign(stream_audience(rule, attributes=CAMPAIGN_ATTRIBUTES), subject_template, body_template)
+
+        connection_id = current_connection_id()
+        campaign = {
+            "subject_template": subject_template, "body_template": body_template, "target_segment": target_segment,
+            "lifecycle_stages": lifecycle_stages, "min_spend": min_spend, "channels": channels,
+            "campaign_key": campaign_key, "from_email": from_email
+        }
+        # The token goes to the user's screen only - the agent cannot confirm its own send
+        pushed = bool(connection_id) and preview["recipients"] > 0 and push_to_requester({
+            "type": "campaign_confirmation",
+            "campaign": campaign,
+            "recipients": preview["recipients"],
+            "confirmation_token": _confirmation_token(fingerprint, connection_id)
+        })
+
+        return json.dumps({
+            "success": True,
+            "queued": False,
+            "requires_confirmation": True,
+            "target_segment": target_segment,
+            **preview,
+            "note": ("Nothing was sent. Show this preview to the user; they confirm the send with the Confirm "
+                     "button shown next to it." if pushed else
+                     "Nothing was sent and this campaign cannot be confirmed from here (no recipients or no user session).")
+        }, cls=DecimalEncoder)
+
+    except Exception as e:
+        return json.dumps({
+            "success": False,
+            "error": str(e),
+            "note": "Bulk email preview failed - check the templates and audience"
+        })
+
+def confirm_bulk_email(subject_template, body_template, target_segment, confirmation_token, lifecycle_stages=None,
+                       min_spend=None, channels=None, campaign_key=None, from_email="noreply@infinitra.com"):
+    """Queue a previewed campaign in the durable outbox (UI confirmation route, not an agent tool)"""
+    from tools.email_outbox import current_connection_id, enqueue_emails, new_outbox_id, request_drain
+
+    rule, fingerprint = _campaign(subject_template, body_template, target_segment, lifecycle_stages,
+                                  min_spend, channels, from_email)
+    connection_id = current_connection_id()
+    if not connection_id or not hmac.compare_digest(str(confirmation_token), _confirmation_token(fingerprint, connection_id)):
+        return json.dumps({
+            "success": False,
+            "queued": False,
+            "error": "confirmation_token does not match this campaign - nothing was sent; preview it again."
+        })
+
+    audience = stream_audience(rule, attributes=CAMPAIGN_ATTRIBUTES)
+    scope = campaign_key or fingerprint
+
+    outbox_id = new_outbox_id()
+    totals = {"queued": 0, "duplicates": 0, "skipped_no_email": 0}
+    existing_outbox_ids = {}
+    chunk = []
+
+    def flush():
+        _, enqueued, duplicate_outbox_ids = enqueue_emails(chunk, from_email, outbox_id=outbox_id, dedup_scope=scope)
+        totals["queued"] += enqueued
+        totals["duplicates"] += len(duplicate_outbox_ids)
+        for existing_id in duplicate_outbox_ids:
+            existing_outbox_ids[existing_id] = existing_outbox_ids.get(existing_id, 0) + 1
+        chunk.clear()
+
+    for recipient in audience:
+        if not recipient.get('email'):
+            totals["skipped_no_email"] += 1
+            continue
+        chunk.append({
+            "to_email": recipient['email'],
+            "subject": render_template(subject_template, recipient),
+            "body": render_template(body_template, recipient),
+            "customer_id": recipient.get('id')
+        })
+        if len(chunk) >= ENQUEUE_CHUNK_SIZE:
+            flush()
+    if chunk:
+        flush()
+
+    result = {"success": True, "queued": True, "target_segment": target_segment, **totals}
+    if totals["queued"]:
+        request_drain()
+        result["outbox_id"] = outbox_id
+    elif len(existing_outbox_ids) == 1:
+        # Whole campaign was queued before - poll the original outbox
+        result["outbox_id"] = next(iter(existing_outbox_ids))
+    else:
+        result["already_queued"] = True
+    if existing_outbox_ids:
+        # Deduplicated recipients stay under the outbox they were first queued in
+        result["existing_outbox_ids"] = dict(list(existing_outbox_ids.items())[:20])
+
+    return json.dumps(result, cls=DecimalEncoder)
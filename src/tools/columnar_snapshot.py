@@ -0,0 +1,292 @@
+"""Columnar snapshots of DynamoDB tables - one .npy per column, memory-mapped by analytical tools
+
+Layout (in /tmp and under snapshots/ in the datasets bucket):
+
+    snapshots/customers/manifest.json            latest version pointer
+    snapshots/customers/<version>/manifest.json
+    snapshots/customers/<version>/total_spent.npy        float64, NaN when missing
+    snapshots/customers/<version>/segment_id.npy         int32 dictionary codes, -1 when missing
+    snapshots/customers/<version>/segment_id.dict.json   code -> string
+
+Maps are flattened to dotted column names; sets and lists are joined with ";".
+
+Exports run off the request path: on a schedule (lambda_handler) or in a
+background thread when a container finds its snapshot stale, while readers
+keep using the version they have.
+"""
+
+import os
+import json
+import time
+import shutil
+import threading
+import numpy as np
+from decimal import Decimal
+from botocore.exceptions import ClientError
+from config.data_sources import get_data_sources
+from utils.aws_clients import get_client, get_resource
+
+SNAPSHOT_FORMAT = 1
+SNAPSHOT_DIR = os.environ.get('SNAPSHOT_DIR', '/tmp/snapshots')
+SNAPSHOT_PREFIX = "snapshots"
+SNAPSHOT_MAX_AGE_SECONDS = 3600   # Older snapshots are re-exported from DynamoDB
+SNAPSHOT_CHECK_SECONDS = 60       # How often a warm container looks for a newer version
+SNAPSHOT_TABLES = ("customers", "orders")
+
+_snapshots = {}
+_snapshots_lock = threading.Lock()
+_exporting = set()
+_download_locks = {name: threading.Lock() for name in SNAPSHOT_TABLES}  # One S3 download per table at a time
+
+class SnapshotNotReady(Exception):
+    """No snapshot exists yet for a table; one is being exported in the background"""
+
+def get_dynamodb_resource():
+    """Shared DynamoDB resource"""
+    return get_resource('dynamodb')
+
+def get_s3_client():
+    """Shared S3 client"""
+    return get_client('s3')
+
+def _table_name(name):
+    """DynamoDB table behind a snapshot - CUSTOMERS_TABLE / ORDERS_TABLE from the stack, else the data source config"""
+    return os.environ.get(f"{name.upper()}_TABLE", get_data_sources()[name]["table"])
+
+def _flatten(item, prefix=""):
+    row = {}
+    for key, value in item.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            row.update(_flatten(value, f"{name}."))
+        elif isinstance(value, (set, list, tuple)):
+            row[name] = ";".join(sorted(str(v) for v in value))
+        else:
+            row[name] = value
+    return row
+
+def _is_number(value):
+    return isinstance(value, (Decimal, int, float)) and not isinstance(value, bool)
+
+def _numeric_columns(name):
+    """Attributes declared as Number in the data source schema"""
+    attributes = get_data_sources()[name]["schema"].get("attributes", {})
+    return {attr for attr, desc in attributes.items() if desc.startswith("Number")}
+
+def build_columns(name, items):
+    """Column arrays for a list of DynamoDB items
+
+    Returns {column: (array, vocabulary or None)}.
+    """
+    rows = [_flatten(item) for item in items]
+    keys = list(dict.fromkeys(k for row in rows for k in row))
+    numeric = _numeric_columns(name)
+    columns = {}
+    for key in keys:
+        values = [row.get(key) for row in rows]
+        present = [v for v in values if v is not None]
+        if key in numeric or (present and all(_is_number(v) for v in present)):
+            columns[key] = (np.array([float(v) if _is_number(v) else np.nan for v in values], dtype=np.float64), None)
+        else:
+            vocabulary = {}
+            codes = np.array([-1 if v is None else vocabulary.setdefault(str(v), len(vocabulary)) for v in values],
+                             dtype=np.int32)
+            columns[key] = (codes, list(vocabulary))
+    return columns, len(rows)
+
+class ColumnarSnapshot:
+    """Read-only, memory-mapped view of one snapshot version
+
+    Every column is mapped (and every vocabulary read) when the snapshot is
+    opened, so the object stays usable after _prune removes its directory.
+    """
+
+    def __init__(self, directory, manifest):
+        self.directory = directory
+        self.manifest = manifest
+        self.version = manifest["version"]
+        self.row_count = manifest["row_count"]
+        self._arrays = {}
+        self._vocabularies = {}
+        for name, entry in manifest["columns"].items():
+            self._arrays[name] = np.load(os.path.join(directory, entry["file"]), mmap_mode='r')
+            if "vocabulary" in entry:
+                with open(os.path.join(directory, entry["vocabulary"])) as f:
+                    self._vocabularies[name] = json.load(f)
+
+    @property
+    def columns(self):
+        return list(self.manifest["columns"])
+
+    def column(self, name):
+        """Raw column array (float64 values or int32 dictionary codes), memory-mapped"""
+        return self._arrays[name]
+
+    def vocabulary(self, name):
+        """Dictionary of a string column (code -> value)"""
+        return self._vocabularies[name]
+
+    def strings(self, name):
+        """Decoded string column as an object array (None when missing)"""
+        vocabulary = np.array(self.vocabulary(name) + [None], dtype=object)
+        return vocabulary[self.column(name)]  # -1 indexes the trailing None
+
+    def age_seconds(self):
+        return time.time() - self.manifest["created_at"]
+
+def _write_snapshot(name, columns, row_count):
+    # Unique per export so a new version never overwrites files an open snapshot has mapped
+    version = time.strftime("%Y%m%dT%H%M%S", time.gmtime()) + f"-{os.getpid()}-{os.urandom(3).hex()}"
+    directory = os.path.join(SNAPSHOT_DIR, name, version)
+    os.makedirs(directory, exist_ok=True)
+    manifest = {"format": SNAPSHOT_FORMAT, "table": name, "version": version, "created_at": time.time(),
+                "row_count": row_count, "columns": {}}
+    for column, (array, vocabulary) in columns.items():
+        entry = {"file": f"{column}.npy", "dtype": str(array.dtype), "kind": "dictionary" if vocabulary is not None else "numeric"}
+        np.save(os.path.join(directory, entry["file"]), array)
+        if vocabulary is not None:
+            entry["vocabulary"] = f"{column}.dict.json"
+            with open(os.path.join(directory, entry["vocabulary"]), "w") as f:
+                json.dump(vocabulary, f)
+        manifest["columns"][column] = entry
+    with open(os.path.join(directory, "manifest.json"), "w") as f:
+        json.dump(manifest, f)
+    return directory, manifest
+
+def _snapshot_files(manifest):
+    files = ["manifest.json"]
+    for entry in manifest["columns"].values():
+        files.append(entry["file"])
+        if "vocabulary" in entry:
+            files.append(entry["vocabulary"])
+    return files
+
+def export_snapshot(name):
+    """Scan a DynamoDB table into a new snapshot version in /tmp and, when configured, S3"""
+    started = time.time()
+    table = get_dynamodb_resource().Table(_table_name(name))
+    scan_args, items = {}, []
+    while True:
+        response = table.scan(**scan_args)
+        items.extend(response['Items'])
+        if 'LastEvaluatedKey' not in response:
+            break
+        scan_args['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    columns, row_count = build_columns(name, items)
+    directory, manifest = _write_snapshot(name, columns, row_count)
+
+    bucket = os.environ.get('DATASETS_BUCKET')
+    if bucket:
+        s3 = get_s3_client()
+        for file in _snapshot_files(manifest):
+            s3.upload_file(os.path.join(directory, file), bucket, f"{SNAPSHOT_PREFIX}/{name}/{manifest['version']}/{file}")
+        # Latest pointer goes last so readers never see a partial version
+        s3.put_object(Bucket=bucket, Key=f"{SNAPSHOT_PREFIX}/{name}/manifest.json", Body=json.dumps(manifest))
+
+    print(f"[SNAPSHOT] Exported {name} v{manifest['version']}: {row_count} rows, "
+          f"{len(columns)} columns in {(time.time() - started) * 1000:.0f}ms")
+    return ColumnarSnapshot(directory, manifest)
+
+def _latest_remote_manifest(name):
+    bucket = os.environ.get('DATASETS_BUCKET')
+    if not bucket:
+        return None
+    try:
+        body = get_s3_client().get_object(Bucket=bucket, Key=f"{SNAPSHOT_PREFIX}/{name}/manifest.json")["Body"].read()
+        return json.loads(body)
+    except ClientError:
+        return None
+
+def _download(name, manifest):
+    directory = os.path.join(SNAPSHOT_DIR, name, manifest["version"])
+    if not os.path.exists(os.path.join(directory, "manifest.json")):
+        os.makedirs(directory, exist_ok=True)
+        s3 = get_s3_client()
+        bucket = os.environ['DATASETS_BUCKET']
+        # Manifest last - its presence marks a complete local copy
+        for file in _snapshot_files(manifest)[1:] + ["manifest.json"]:
+            s3.download_file(bucket, f"{SNAPSHOT_PREFIX}/{name}/{manifest['version']}/{file}", os.path.join(directory, file))
+    return ColumnarSnapshot(directory, manifest)
+
+def _prune(name, keep_version):
+    """Remove superseded local versions (snapshots already opened hold their memory maps)"""
+    root = os.path.join(SNAPSHOT_DIR, name)
+    for version in os.listdir(root):
+        if version != keep_version:
+            shutil.rmtree(os.path.join(root, version), ignore_errors=True)
+
+def _install(name, snapshot):
+    """Make snapshot the container's current version (caller holds _snapshots_lock)"""
+    cached = _snapshots.get(name)
+    if not cached or cached[0].version != snapshot.version:
+        _prune(name, snapshot.version)
+    _snapshots[name] = (snapshot, time.time())
+
+def start_background_export(name):
+    """Export a table in a daemon thread; at most one export per table at a time"""
+    with _snapshots_lock:
+        if name in _exporting:
+            return
+        _exporting.add(name)
+
+    def run():
+        try:
+            snapshot = export_snapshot(name)
+            with _snapshots_lock:
+                _install(name, snapshot)
+        except Exception as e:
+            print(f"[SNAPSHOT] Background export of {name} failed: {e}")
+        finally:
+            with _snapshots_lock:
+                _exporting.discard(name)
+
+    threading.Thread(target=run, name=f"snapshot-export-{name}", daemon=True).start()
+
+def load_snapshot(name, max_age=SNAPSHOT_MAX_AGE_SECONDS):
+    """Current snapshot of a table - memory-mapped from /tmp or downloaded from S3
+
+    A stale snapshot is returned while a fresh one exports in the background.
+    Raises SnapshotNotReady when no version exists yet.
+    """
+    if name not in SNAPSHOT_TABLES:
+        raise ValueError(f"No snapshot for table: {name} (available: {', '.join(SNAPSHOT_TABLES)})")
+
+    with _snapshots_lock:
+        cached = _snapshots.get(name)
+    if cached and time.time() - cached[1] < SNAPSHOT_CHECK_SECONDS:
+        return cached[0]
+
+    # S3 round trips happen outside _snapshots_lock so other tables (and fresh readers) are never blocked
+    with _download_locks[name]:
+        with _snapshots_lock:
+            cached = _snapshots.get(name)
+        if cached and time.time() - cached[1] < SNAPSHOT_CHECK_SECONDS:
+            return cached[0]  # Another thread refreshed it while we waited
+
+        snapshot = cached[0] if cached else None
+        manifest = _latest_remote_manifest(name)
+        if manifest and manifest.get("format") == SNAPSHOT_FORMAT and (snapshot is None or manifest["version"] != snapshot.version):
+            snapshot = _download(name, manifest)
+        if snapshot is not None:
+            with _snapshots_lock:
+                current = _snapshots.get(name)
+                # A background export may have installed a newer version during the download
+                if current and current[0].manifest["created_at"] > snapshot.manifest["created_at"]:
+                    snapshot = current[0]
+                else:
+                    _install(name, snapshot)
+
+    if snapshot is None or snapshot.age_seconds() > max_age:
+        start_background_export(name)
+    if snapshot is None:
+        raise SnapshotNotReady(f"The {name} snapshot is being built - retry in a minute or pass the customer records as raw_data")
+    return snapshot
+
+def lambda_handler(event, context):
+    """Scheduled export of every snapshot table, so containers download instead of scanning"""
+    exported = {}
+    for name in SNAPSHOT_TABLES:
+        snapshot = export_snapshot(name)
+        exported[name] = {"version": snapshot.version, "row_count": snapshot.row_count}
+    return {"statusCode": 200, "body": json.dumps(exported)}
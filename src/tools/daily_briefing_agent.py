@@ -2,6 +2,8 @@ import json
 from datetime import datetime
 from strands.tools import tool
 from strands.agent import Agent
+from tools.result_store import resolve_handles
+from utils.model_factory import create_model, NOVA_PREMIER
 
 # STANDARDIZED CONSTANTS
 URGENT_CHURN_THRESHOLD = 0.7  # Fixed threshold for urgent customers
@@ -20,7 +22,7 @@ class DecimalEncoder(json.JSONEncoder):
 class DailyBriefingAgent:
     def __init__(self, callback_handler=None):
         self.agent = Agent(
-            model="us.amazon.nova-premier-v1:0",
+            model=create_model(NOVA_PREMIER, "briefing_agent"),
             system_prompt=self._get_system_prompt(),
             tools=[],  # Pure analysis agent - no data retrieval tools
             callback_handler=callback_handler
@@ -92,14 +94,17 @@ def analyze_daily_briefing(raw_data: str) -> str:
     Analyze real customer/business data for daily briefing insights
     
     Args:
-        raw_data: JSON string with customer, business, operational data from Data Agent
+        raw_data: Result handle from process_data_request (or JSON mapping keys such as
+                  operational_customers/analytical_data to handles); inline JSON also accepted
         
     Returns:
         JSON with briefing text, context actions, and summary statistics
     """
     try:
+        # Handles load the Data Agent's full result sets in-process
+        raw_data = resolve_handles(raw_data)
         print(f"[BRIEFING] Starting analysis with raw_data type: {type(raw_data)}")
-        print(f"[BRIEFING] Raw data preview: {str(raw_data)[:200]}...")
+        print(f"[BRIEFING] Raw data preview: {_preview(raw_data, 200)}...")
         
         # Handle string input that might already be JSON
         if isinstance(raw_data, str):
@@ -127,7 +132,10 @@ def analyze_daily_briefing(raw_data: str) -> str:
         
         # Validate we have structured data and extract customers
         customers_data = None
-        if isinstance(data, dict):
+        if isinstance(data, list):
+            customers_data = data
+            print(f"[BRIEFING] Using record list directly")
+        elif isinstance(data, dict):
             # Check if we have separate operational and analytical datasets
             if 'operational_customers' in data and 'analytical_data' in data:
                 print(f"[BRIEFING] Found separate datasets - merging operational and analytical data")
@@ -224,9 +232,17 @@ def analyze_daily_briefing(raw_data: str) -> str:
         return json.dumps({
             "success": False, 
             "error": f"Daily briefing analysis failed: {str(e)}",
-            "raw_data_preview": str(raw_data)[:100] if raw_data else "No data"
+            "raw_data_preview": _preview(raw_data, 100) if raw_data else "No data"
         })
 
+def _preview(raw_data, limit):
+    """Short description of tool input without stringifying resolved datasets"""
+    if isinstance(raw_data, str):
+        return raw_data[:limit]
+    if isinstance(raw_data, (list, dict)):
+        return f"{type(raw_data).__name__} with {len(raw_data)} entries"
+    return str(raw_data)[:limit]
+
 def _safe_float(value, default=0.0):
     """Safely convert value to float, handling strings and edge cases"""
     if value is None:
@@ -466,6 +482,18 @@ def _generate_real_actions(urgent_customers, opportunities):
             },
             "priority": "high"
         })
+        
+        # What-if simulation around the proposed discount before committing
+        proposed = 15 if opp['type'] == 'upsell' else 10
+        actions.append({
+            "label": f"Simulate {opp['segment']} Discounts",
+            "action": "simulate_promotion",
+            "params": {
+                "target_segment": opp['segment'],
+                "discount_levels": [proposed - 5, proposed, proposed + 5]
+            },
+            "priority": "medium"
+        })
     
     # General analysis action
     actions.append({
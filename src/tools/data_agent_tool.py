@@ -1,11 +1,21 @@
 import json
-import boto3
+import time
 import os
 from decimal import Decimal
-from functools import lru_cache
 from strands.tools import tool
 from strands.agent import Agent
-from config.data_sources import get_data_agent_metadata, get_data_source_context, route_query
+from strands.handlers.callback_handler import null_callback_handler
+from config.data_sources import get_data_agent_metadata, get_data_source_context, get_config_version, route_query
+from tools.result_store import get_result_store
+from utils.model_factory import create_model, CLAUDE_SONNET_4
+from tools.analytical_cache import cache_enabled, get_analytical_cache, referenced_tables, CACHE_TABLES, CACHE_ROW_LIMIT
+from tools.federated_query import FederatedQuery, resolve_spec, RELATIONSHIP_SPECS
+from tools.sql_guard import execute_guarded, QueryRejected
+from tools.sql_templates import run_template, describe_templates, get_template_stats
+from tools.plan_cache import get_plan_cache, record_tool_call, recording, replay_plan
+from utils.aws_clients import get_client, get_resource
+
+MAX_AGENT_SUMMARY_CHARS = 2000    # Data Agent narrative returned alongside result handles
 
 _stream_context = None
 _global_callback = None
@@ -23,29 +33,28 @@ class DecimalEncoder(json.JSONEncoder):
             return list(obj)
         return super(DecimalEncoder, self).default(obj)
 
-@lru_cache(maxsize=1)
 def get_dynamodb_resource():
-    """Cached DynamoDB resource"""
-    return boto3.resource('dynamodb')
+    """Shared DynamoDB resource"""
+    return get_resource('dynamodb')
 
-@lru_cache(maxsize=1) 
 def get_rds_data_client():
-    """Cached RDS Data API client"""
-    return boto3.client('rds-data')
+    """Shared RDS Data API client"""
+    return get_client('rds-data')
 
 # Data Agent - Intelligent multi-database orchestrator
 class DataAgent:
     def __init__(self, callback_handler=None):
         self.metadata = get_data_agent_metadata()
         self.agent = Agent(
-            model="us.anthropic.claude-sonnet-4-20250514-v1:0",
+            model=create_model(CLAUDE_SONNET_4, "data_agent"),
             system_prompt=self._get_system_prompt(),
-            tools=[execute_dynamodb_query, execute_aurora_query],
+            tools=[execute_dynamodb_query, execute_aurora_template, execute_federated_query, execute_aurora_query]
+                  + ([execute_cached_query] if cache_enabled() else []),
             callback_handler=callback_handler
         )
     
     def _get_system_prompt(self):
-        context = get_data_source_context()
+        context = get_data_source_context(compact=True)
         return f"""You are a specialized Data Agent - the pure data operations expert of the system.
 
         {context}
@@ -65,17 +74,41 @@ class DataAgent:
 
         AVAILABLE TOOLS:
         - execute_dynamodb_query: For operational data queries
-        - execute_aurora_query: For analytical data queries
+        - execute_aurora_template: For analytical queries covered by a named template (preferred)
+        - execute_federated_query: For cross-database joins (DynamoDB + Aurora) in one call
+        - execute_aurora_query: For analytical queries no template covers (free-form SQL)
+
+        AURORA QUERY TEMPLATES:
+        {describe_templates()}
+        Always use execute_aurora_template when a template answers the request - it is
+        parameterized, row-limited and faster. Fall back to execute_aurora_query only
+        when no template fits.
+        CROSS-DATABASE JOINS:
+        Never stitch DynamoDB and Aurora results together yourself. Call execute_federated_query
+        with a relationship ({", ".join(RELATIONSHIP_SPECS)}) and optionally a spec that overrides
+        the primary side, e.g. {{"primary": {{"filters": {{"segment_id": "VIP_HIGH_VALUE"}}}}, "limit": 100}},
+        or a full spec: {{"primary": {{"source": "dynamodb.customers", "filters": {{...}}, "columns": [...]}},
+        "joins": [{{"source": "aurora.customer_metrics", "on": ["id", "customer_id"], "columns": [...], "how": "left"}}]}}.
+
+        {self._get_cache_prompt()}
+        Free-form SQL must be a single SELECT. It is EXPLAINed first: queries without a
+        LIMIT get one, and queries estimated too expensive are rejected with the plan -
+        add selective filters or aggregate in SQL and retry.
 
         QUERY STRATEGY:
         - Use DynamoDB for real-time operational data (customers, promotions, orders)
         - Use Aurora for analytical queries (aggregations, joins, complex filtering)
         - Combine results when cross-database data consolidation is needed
 
+        RESULT HANDLES:
+        Query tools store the full result set and return a handle (e.g. "res-1a2b3c4d5e6f")
+        with row_count, columns and a tabular sample. Never copy rows into your answer -
+        downstream agents load the full data from the handle.
+
         OUTPUT FORMAT:
         Always return structured JSON with:
         - success: boolean
-        - data: array of raw results
+        - results: the handle of each result set and what it contains
         - source: data source information
         - count: number of records
         - metadata: query execution details
@@ -95,17 +128,59 @@ class DataAgent:
         FOCUS: Be the fastest, most reliable data provider. Let specialized analysis agents handle interpretation.
         """
 
+    def _get_cache_prompt(self):
+        if not cache_enabled():
+            return ""
+        tables = "; ".join(f"{name}({', '.join(t['columns'])})" for name, t in CACHE_TABLES.items())
+        return f"""LOCAL ANALYTICAL CACHE:
+        execute_cached_query runs SQLite SQL in milliseconds against local copies of: {tables}.
+        Prefer it for aggregations and filters over these tables; results report data age
+        and are capped at {CACHE_ROW_LIMIT} rows ("truncated": true means aggregate or filter further).
+        """
+
     def process_request(self, user_request: str, stream_context=None) -> dict:
         """Main entry point for data agent processing"""
         global _stream_context
         _stream_context = stream_context
         
+        # Recurring requests replay the tool calls the agent already validated
+        plan_cache = get_plan_cache()
+        plan = plan_cache.lookup(user_request)
+        if plan:
+            started = time.time()
+            existing = set(get_result_store().handles())
+            try:
+                results = replay_plan(plan, {"execute_dynamodb_query": execute_dynamodb_query,
+                                             "execute_aurora_template": execute_aurora_template,
+                                             "execute_federated_query": execute_federated_query,
+                                             "execute_cached_query": execute_cached_query,
+                                             "execute_aurora_query": execute_aurora_query})
+                replay_ms = (time.time() - started) * 1000
+                saved_ms = plan_cache.record_saving(user_request, replay_ms)
+                print(f"[PLAN CACHE] Replayed {len(plan)} calls in {replay_ms:.0f}ms (saved ~{saved_ms:.0f}ms)")
+                return {
+                    "success": True,
+                    "agent_response": f"Replayed cached plan: {len(results)} queries, "
+                                      f"{sum(r.get('count', 0) for r in results)} rows",
+                    "source": "plan_cache"
+                }
+            except Exception as e:
+                print(f"[PLAN CACHE] Replay failed, falling back to agent: {str(e)}")
+                plan_cache.invalidate(user_request)
+                get_result_store().discard([h for h in get_result_store().handles() if h not in existing])
+        
         try:
+            # The agent is reused across requests - start each one without the previous conversation
+            self.agent.messages = []
             # Real LLM streaming from data agent - use agent's built-in streaming
-            response = self.agent(
-                f"Analyze this data request and execute the necessary queries: {user_request}",
-                stream=True
-            )
+            started = time.time()
+            with recording() as calls:
+                response = self.agent(
+                    f"Analyze this data request and execute the necessary queries: {user_request}",
+                    stream=True
+                )
+            plan_cache.record(user_request, calls, (time.time() - started) * 1000)
+            print(f"[PLAN CACHE] {plan_cache.get_stats()}")
             
             return {
                 "success": True,
@@ -127,13 +202,22 @@ class DataAgent:
 # Global data agent instance
 _data_agent = None
 _current_callback = None
+_agent_config_version = None
 
 def get_data_agent(callback_handler=None):
-    """Get or create data agent instance"""
-    global _data_agent, _current_callback
-    if _data_agent is None or _current_callback != callback_handler:
+    """Get or create data agent instance
+
+    The agent (and its system prompt) is built once per config version;
+    a new callback handler is swapped in rather than rebuilding the agent.
+    """
+    global _data_agent, _current_callback, _agent_config_version
+    version = get_config_version()
+    if _data_agent is None or _agent_config_version != version:
         _data_agent = DataAgent(callback_handler)
-        _current_callback = callback_handler
+        _agent_config_version = version
+    elif _current_callback is not callback_handler:
+        _data_agent.agent.callback_handler = callback_handler if callback_handler is not None else null_callback_handler
+    _current_callback = callback_handler
     return _data_agent
 
 @tool
@@ -173,20 +257,97 @@ def execute_dynamodb_query(table_name: str, filters: dict = None, operation: str
                 response = table.scan(Limit=50)
             
             result_count = len(response['Items'])
+            summary = get_result_store().register(response['Items'], "dynamodb", table=table_name)
+            record_tool_call("execute_dynamodb_query", {"table_name": table_name, "filters": filters, "operation": operation})
             
             return json.dumps({
                 "success": True,
                 "source": "dynamodb",
                 "table": table_name,
                 "count": result_count,
-                "data": response['Items']
+                **summary
             }, cls=DecimalEncoder)
             
         except Exception as e:
             error_msg = f"DynamoDB query failed: {str(e)}"
+            record_tool_call("execute_dynamodb_query", {"table_name": table_name, "filters": filters, "operation": operation}, success=False)
             return json.dumps({"success": False, "error": error_msg, "source": "dynamodb"})
 
 
+@tool
+def execute_aurora_template(template: str, params: dict = None, limit: int = None) -> str:
+        """Execute a named, parameterized Aurora analytics query"""
+        try:
+            aurora = get_data_agent_metadata()["connection_info"]["aurora"]
+            records = run_template(template, params, limit, connection=aurora)
+            
+            summary = get_result_store().register(records, "aurora", template=template, params=params or {})
+            record_tool_call("execute_aurora_template", {"template": template, "params": params, "limit": limit})
+            
+            return json.dumps({
+                "success": True,
+                "source": "aurora",
+                "count": len(records),
+                "template_stats": get_template_stats().get(template),
+                **summary
+            }, cls=DecimalEncoder)
+            
+        except Exception as e:
+            error_msg = f"Aurora template query failed: {str(e)}"
+            record_tool_call("execute_aurora_template", {"template": template, "params": params, "limit": limit}, success=False)
+            return json.dumps({"success": False, "error": error_msg, "source": "aurora"})
+
+@tool
+def execute_federated_query(relationship: str = None, spec: dict = None) -> str:
+        """Join DynamoDB and Aurora data in one call (customer_360, segment_analysis, promotion_targeting or a custom spec)"""
+        try:
+            join_spec = resolve_spec(relationship, spec)
+            query = FederatedQuery(join_spec, get_dynamodb_resource(), get_rds_data_client(),
+                                   get_data_agent_metadata()["connection_info"]["aurora"])
+            rows = list(query)
+            
+            summary = get_result_store().register(rows, "federated", relationship=relationship or "custom")
+            record_tool_call("execute_federated_query", {"relationship": relationship, "spec": spec})
+            
+            return json.dumps({
+                "success": True,
+                "source": "federated",
+                "count": len(rows),
+                "join_stats": query.stats,
+                **summary
+            }, cls=DecimalEncoder)
+            
+        except Exception as e:
+            error_msg = f"Federated query failed: {str(e)}"
+            record_tool_call("execute_federated_query", {"relationship": relationship, "spec": spec}, success=False)
+            return json.dumps({"success": False, "error": error_msg, "source": "federated"})
+
+@tool
+def execute_cached_query(sql: str) -> str:
+        """Run SQLite SQL against the container's analytical cache (customers, orders, customer_metrics)"""
+        try:
+            cache = get_analytical_cache()
+            cache.ensure_fresh(referenced_tables(sql), get_dynamodb_resource(), get_rds_data_client(),
+                               get_data_agent_metadata()["connection_info"]["aurora"])
+            rows, freshness, truncated = cache.query(sql)
+            
+            summary = get_result_store().register(rows, "analytical_cache", sql=sql)
+            record_tool_call("execute_cached_query", {"sql": sql})
+            
+            return json.dumps({
+                "success": True,
+                "source": "analytical_cache",
+                "count": len(rows),
+                "truncated": truncated,
+                "freshness": freshness,
+                **summary
+            }, cls=DecimalEncoder)
+            
+        except Exception as e:
+            error_msg = f"Cached query failed: {str(e)}"
+            record_tool_call("execute_cached_query", {"sql": sql}, success=False)
+            return json.dumps({"success": False, "error": error_msg, "source": "analytical_cache"})
+
 @tool
 def execute_aurora_query(sql: str, description: str = "") -> str:
         """Execute Aurora SQL query with error handling"""
@@ -194,17 +355,9 @@ def execute_aurora_query(sql: str, description: str = "") -> str:
             # Connection phase
             metadata = get_data_agent_metadata()
             rds_data = get_rds_data_client()
-            cluster_arn = metadata["connection_info"]["aurora"]["cluster_arn"]
-            secret_arn = metadata["connection_info"]["aurora"]["secret_arn"]
-            database = metadata["connection_info"]["aurora"]["database"]
             
-            # Query execution phase
-            response = rds_data.execute_statement(
-                resourceArn=cluster_arn,
-                secretArn=secret_arn,
-                database=database,
-                sql=sql
-            )
+            # Query execution phase - EXPLAIN cost guard, injected LIMIT and statement timeout
+            response, plan = execute_guarded(rds_data, metadata["connection_info"]["aurora"], sql)
             
             # Processing phase
             record_count = len(response.get('records', []))
@@ -223,17 +376,24 @@ def execute_aurora_query(sql: str, description: str = "") -> str:
                 records.append(row)
             
             result_count = len(records)
+            summary = get_result_store().register(records, "aurora", sql=sql)
+            record_tool_call("execute_aurora_query", {"sql": sql, "description": description})
             
             return json.dumps({
                 "success": True,
                 "source": "aurora",
                 "count": result_count,
-                "data": records,
-                "sql": sql
-            })
+                "plan": plan,
+                **summary
+            }, cls=DecimalEncoder)
+            
+        except QueryRejected as e:
+            record_tool_call("execute_aurora_query", {"sql": sql, "description": description}, success=False)
+            return json.dumps({"success": False, "error": f"Aurora query rejected: {str(e)}", "plan": e.plan, "source": "aurora"})
             
         except Exception as e:
             error_msg = f"Aurora query failed: {str(e)}"
+            record_tool_call("execute_aurora_query", {"sql": sql, "description": description}, success=False)
             return json.dumps({"success": False, "error": error_msg, "source": "aurora"})
 
 @tool
@@ -245,16 +405,29 @@ def process_data_request(user_request: str, callback_handler=None) -> str:
         user_request: Natural language data request
         
     Returns:
-        JSON response with consolidated data and analysis
+        JSON with a handle and summary (row count, columns, tabular sample) per result set.
+        Pass handles as raw_data to analysis and UI tools instead of copying rows.
     """
     try:
         # Phase 1: Initialize and analyze request
         request_lower = user_request.lower()
+        store = get_result_store()
+        existing = set(store.handles())
         
         data_agent = get_data_agent(callback_handler=_global_callback)
         result = data_agent.process_request(user_request, _stream_context)
         
-        return json.dumps(str(result), cls=DecimalEncoder)
+        if not result["success"]:
+            return json.dumps(result, cls=DecimalEncoder)
+        
+        # Full datasets stay in-process; only handles and summaries go back to the orchestrator
+        results = [store.summary(handle) for handle in store.handles() if handle not in existing]
+        return json.dumps({
+            "success": True,
+            "source": result["source"],
+            "results": results,
+            "agent_summary": str(result["agent_response"])[:MAX_AGENT_SUMMARY_CHARS]
+        }, cls=DecimalEncoder)
         
     except Exception as e:
         error_msg = f"Data Agent Tool failed: {str(e)}"
@@ -0,0 +1,153 @@
+"""Out-of-band dataset channel - bulk rows reach the browser as paged data frames, never through the LLM or HTML
+
+Datasets belong to the connection that published them: pages are only
+served to that connection, and S3 copies live under
+datasets/<connection>/ so another container can serve it too.
+"""
+
+import json
+import os
+import uuid
+import threading
+from decimal import Decimal
+from collections import OrderedDict
+from botocore.exceptions import ClientError
+from utils.aws_clients import get_client
+
+PAGE_SIZE = 100                   # Rows requested per page by the virtualized table
+INLINE_ROW_LIMIT = 50             # Larger tables are published as datasets instead of rendered
+MAX_FRAME_BYTES = 96 * 1024       # API Gateway WebSocket frames are capped at 128KB
+S3_OFFLOAD_BYTES = 512 * 1024     # Larger datasets are downloaded from S3 via a presigned URL
+PRESIGNED_URL_SECONDS = 900
+MAX_CACHED_DATASETS = 32          # Datasets kept in memory for page requests
+DATASET_PREFIX = "datasets/"
+
+_stream_context = None
+_datasets = OrderedDict()
+_datasets_lock = threading.Lock()
+
+class DecimalEncoder(json.JSONEncoder):
+    def default(self, obj):
+        if isinstance(obj, Decimal):
+            return float(obj)
+        return super(DecimalEncoder, self).default(obj)
+
+def get_s3_client():
+    """Shared S3 client"""
+    return get_client('s3')
+
+def set_stream_context(context):
+    """Set the streaming context that dataset and data frames are pushed to"""
+    global _stream_context
+    _stream_context = context
+
+def _connection_id():
+    return _stream_context.get('connection_id') if _stream_context else None
+
+def _key(connection_id, dataset_id):
+    return f"{DATASET_PREFIX}{connection_id}/{dataset_id}.json"
+
+def _send(message):
+    if not _stream_context:
+        return False
+    from streaming import send_stream_message
+    return send_stream_message(_stream_context, message)
+
+def _cache_dataset(dataset_id, dataset):
+    with _datasets_lock:
+        _datasets[dataset_id] = dataset
+        _datasets.move_to_end(dataset_id)
+        while len(_datasets) > MAX_CACHED_DATASETS:
+            _datasets.popitem(last=False)
+
+def _load_dataset(dataset_id, connection_id):
+    """Dataset published by connection_id, from this container's cache or from S3 when another container published it"""
+    with _datasets_lock:
+        dataset = _datasets.get(dataset_id)
+        if dataset is not None and dataset["connection_id"] == connection_id:
+            _datasets.move_to_end(dataset_id)
+            return dataset
+
+    bucket = os.environ.get('DATASETS_BUCKET')
+    if not (bucket and connection_id):
+        raise ValueError(f"Dataset not found: {dataset_id}")
+    try:
+        body = get_s3_client().get_object(Bucket=bucket, Key=_key(connection_id, dataset_id))['Body'].read()
+    except ClientError as e:
+        raise ValueError(f"Dataset not found: {dataset_id}") from e
+    dataset = {**json.loads(body), "connection_id": connection_id}
+    _cache_dataset(dataset_id, dataset)
+    return dataset
+
+def publish_dataset(rows, columns, title=None):
+    """Register rows as a dataset and push its descriptor plus the first page to the client
+
+    Returns a table component that references the dataset by id; it
+    carries column metadata only, so it is safe to hand back to the LLM.
+    """
+    dataset_id = f"ds-{uuid.uuid4().hex}"
+    connection_id = _connection_id()
+    dataset = {"rows": rows, "columns": columns, "title": title}
+    _cache_dataset(dataset_id, {**dataset, "connection_id": connection_id})
+
+    ref = {"id": dataset_id, "total": len(rows), "page_size": PAGE_SIZE}
+    bucket = os.environ.get('DATASETS_BUCKET')
+    if bucket and connection_id:
+        body = json.dumps(dataset, cls=DecimalEncoder).encode('utf-8')
+        key = _key(connection_id, dataset_id)
+        try:
+            get_s3_client().put_object(Bucket=bucket, Key=key, Body=body, ContentType='application/json')
+            if len(body) > S3_OFFLOAD_BYTES:
+                ref["url"] = get_s3_client().generate_presigned_url(
+                    'get_object', Params={'Bucket': bucket, 'Key': key}, ExpiresIn=PRESIGNED_URL_SECONDS
+                )
+        except Exception as e:
+            print(f"[DATA CHANNEL] S3 upload failed, serving {dataset_id} from memory: {e}")
+
+    component = {
+        "type": "table",
+        "title": title,
+        "columns": columns,
+        "dataset": ref,
+        "config": {"pagination": {"enabled": False, "pageSize": PAGE_SIZE, "total": len(rows)}}
+    }
+    _send({"type": "dataset", "structured_data": component})
+    if "url" not in ref:
+        send_dataset_page(dataset_id, 0, PAGE_SIZE)
+    print(f"[DATA CHANNEL] Published {dataset_id}: {len(rows)} rows{' via S3' if 'url' in ref else ''}")
+    return component
+
+def page_frames(dataset_id, offset=0, limit=PAGE_SIZE, connection_id=None):
+    """Split a page of rows into data frames that each fit in one WebSocket message
+
+    Only datasets published by connection_id (default: the current connection) are served.
+    """
+    rows = _load_dataset(dataset_id, connection_id or _connection_id())["rows"]
+    total = len(rows)
+    offset = max(0, int(offset))
+    end = min(total, offset + max(1, int(limit)))
+
+    frames = []
+    frame_rows, frame_bytes, frame_offset = [], 0, offset
+    for index in range(offset, end):
+        row_bytes = len(json.dumps(rows[index], cls=DecimalEncoder)) + 1
+        if frame_rows and frame_bytes + row_bytes > MAX_FRAME_BYTES:
+            frames.append({"type": "data_frame", "dataset_id": dataset_id, "offset": frame_offset,
+                           "rows": frame_rows, "total": total})
+            frame_rows, frame_bytes, frame_offset = [], 0, index
+        frame_rows.append(rows[index])
+        frame_bytes += row_bytes
+    frames.append({"type": "data_frame", "dataset_id": dataset_id, "offset": frame_offset,
+                   "rows": frame_rows, "total": total})
+    return frames
+
+def send_dataset_page(dataset_id, offset=0, limit=PAGE_SIZE):
+    """Push one page of a dataset to the client; returns the number of frames sent"""
+    try:
+        frames = page_frames(dataset_id, offset, limit)
+    except Exception as e:
+        _send({"type": "data_frame", "dataset_id": dataset_id, "offset": offset, "rows": [], "error": str(e)})
+        return 0
+    for frame in frames:
+        _send(frame)
+    return len(frames)
@@ -0,0 +1,289 @@
+"""Promotion eligibility engine - compiles promotion targeting and resolves its audience"""
+
+import json
+import os
+import queue
+import threading
+from decimal import Decimal
+from concurrent.futures import ThreadPoolExecutor
+from boto3.dynamodb.conditions import Attr, Key, ConditionExpressionBuilder
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+from strands.tools import tool
+from config.data_sources import get_data_sources
+from utils.aws_clients import get_client, get_resource
+
+PARALLEL_SCAN_SEGMENTS = 8        # Scan workers for untargeted ("all") promotions
+MAX_RESOLVER_WORKERS = 8
+STREAM_BUFFER_PAGES = 16          # Pages buffered between workers and the id stream
+DEFAULT_MAX_IDS = 1000            # Ids returned inline by the tool
+ALL_SEGMENTS = "all"
+
+_serializer = TypeSerializer()
+_deserializer = TypeDeserializer()
+
+class DecimalEncoder(json.JSONEncoder):
+    def default(self, obj):
+        if isinstance(obj, Decimal):
+            return float(obj)
+        return super(DecimalEncoder, self).default(obj)
+
+def get_dynamodb_client():
+    """Shared DynamoDB client (thread-safe, shared by resolver workers)"""
+    return get_client('dynamodb')
+
+def get_dynamodb_resource():
+    """Shared DynamoDB resource"""
+    return get_resource('dynamodb')
+
+def _customers_table_name():
+    return os.environ.get('CUSTOMERS_TABLE', get_data_sources()["customers"]["table"])
+
+def _as_list(value):
+    if value is None or value == "":
+        return []
+    if isinstance(value, str):
+        return [v.strip() for v in value.split(',') if v.strip()]
+    return list(value)
+
+def _number(value):
+    return None if value is None or value == "" else Decimal(str(value))
+
+class EligibilityRule:
+    """Executable form of a promotion's targeting
+
+    Holds the DynamoDB FilterExpression and the GSI access paths used to
+    resolve the audience.
+    """
+
+    def __init__(self, target_segment=ALL_SEGMENTS, lifecycle_stages=None, min_spend=None, max_spend=None, channels=None):
+        self.target_segment = target_segment or ALL_SEGMENTS
+        # Each stage is one disjoint query path, so a repeated stage would be counted twice
+        self.lifecycle_stages = list(dict.fromkeys(_as_list(lifecycle_stages)))
+        self.min_spend = _number(min_spend)
+        self.max_spend = _number(max_spend)
+        self.channels = _as_list(channels)
+
+    def filter_condition(self, indexed_on=None):
+        """FilterExpression for the checks not already covered by the access path key"""
+        conditions = []
+        if self.lifecycle_stages and indexed_on != 'lifecycle_stage':
+            conditions.append(Attr('lifecycle_stage').is_in(self.lifecycle_stages))
+        if self.min_spend is not None:
+            conditions.append(Attr('total_spent').gte(self.min_spend))
+        if self.max_spend is not None:
+            conditions.append(Attr('total_spent').lte(self.max_spend))
+        if self.channels:
+            conditions.append(Attr('preferences.channel').is_in(self.channels))
+
+        combined = None
+        for condition in conditions:
+            combined = condition if combined is None else combined & condition
+        return combined
+
+    def access_paths(self):
+        """Pick GSI queries (or parallel scan segments) that cover the audience
+
+        Returns (paths, disjoint) - disjoint paths can be counted server-side
+        without de-duplicating ids.
+        """
+        if self.target_segment != ALL_SEGMENTS:
+            # Promotions target either a technical segment_id or a display segment
+            return [
+                {'IndexName': 'segment-id-index', 'key': ('segment_id', self.target_segment)},
+                {'IndexName': 'segment-index', 'key': ('segment', self.target_segment)}
+            ], False
+        if self.lifecycle_stages:
+            return [{'IndexName': 'lifecycle-stage-index', 'key': ('lifecycle_stage', stage)}
+                    for stage in self.lifecycle_stages], True
+        return [{'Segment': i, 'TotalSegments': PARALLEL_SCAN_SEGMENTS} for i in range(PARALLEL_SCAN_SEGMENTS)], True
+
+    def to_dict(self):
+        return {
+            "target_segment": self.target_segment,
+            "lifecycle_stages": self.lifecycle_stages,
+            "min_spend": self.min_spend,
+            "max_spend": self.max_spend,
+            "channels": self.channels
+        }
+
+def compile_targeting(promotion: dict) -> EligibilityRule:
+    """Compile a promotion item's targeting fields into an EligibilityRule"""
+    return EligibilityRule(
+        target_segment=promotion.get('target_segment', ALL_SEGMENTS),
+        lifecycle_stages=promotion.get('target_lifecycle') or promotion.get('lifecycle_stages'),
+        min_spend=promotion.get('min_spend'),
+        max_spend=promotion.get('max_spend'),
+        channels=promotion.get('target_channels') or promotion.get('channels')
+    )
+
+def _build_request(rule, path, table_name, projection, count_only):
+    """Translate an access path into low-level Query/Scan arguments"""
+    builder = ConditionExpressionBuilder()
+    request = {'TableName': table_name}
+    names, values = {}, {}
+
+    indexed_on = None
+    if 'key' in path:
+        attr, value = path['key']
+        indexed_on = attr
+        key_expr = builder.build_expression(Key(attr).eq(value), is_key_condition=True)
+        request['IndexName'] = path['IndexName']
+        request['KeyConditionExpression'] = key_expr.condition_expression
+        names.update(key_expr.attribute_name_placeholders)
+        values.update(key_expr.attribute_value_placeholders)
+    else:
+        request['Segment'] = path['Segment']
+        request['TotalSegments'] = path['TotalSegments']
+
+    condition = rule.filter_condition(indexed_on)
+    if condition is not None:
+        filter_expr = builder.build_expression(condition)
+        request['FilterExpression'] = filter_expr.condition_expression
+        names.update(filter_expr.attribute_name_placeholders)
+        values.update(filter_expr.attribute_value_placeholders)
+
+    if count_only:
+        request['Select'] = 'COUNT'
+    else:
+        placeholders = []
+        for i, attr in enumerate(projection):
+            names[f'#p{i}'] = attr
+            placeholders.append(f'#p{i}')
+        request['ProjectionExpression'] = ', '.join(placeholders)
+
+    if names:
+        request['ExpressionAttributeNames'] = names
+    if values:
+        request['ExpressionAttributeValues'] = {k: _serializer.serialize(v) for k, v in values.items()}
+    return request, 'key' in path
+
+def _paginate(request, is_query):
+    """Yield raw response pages for one access path"""
+    client = get_dynamodb_client()
+    call = client.query if is_query else client.scan
+    while True:
+        response = call(**request)
+        yield response
+        if 'LastEvaluatedKey' not in response:
+            return
+        request = {**request, 'ExclusiveStartKey': response['LastEvaluatedKey']}
+
+def count_audience(rule: EligibilityRule) -> int:
+    """Exact audience size; disjoint paths are counted server-side with Select=COUNT"""
+    paths, disjoint = rule.access_paths()
+    if not disjoint:
+        return sum(1 for _ in stream_audience(rule, attributes=['id']))
+
+    table_name = _customers_table_name()
+
+    def count_path(path):
+        request, is_query = _build_request(rule, path, table_name, [], count_only=True)
+        return sum(page['Count'] for page in _paginate(request, is_query))
+
+    with ThreadPoolExecutor(max_workers=min(MAX_RESOLVER_WORKERS, len(paths))) as executor:
+        return sum(executor.map(count_path, paths))
+
+def stream_audience(rule: EligibilityRule, attributes=None):
+    """Stream eligible customers (deserialized items) as pages arrive from parallel workers"""
+    paths, disjoint = rule.access_paths()
+    table_name = _customers_table_name()
+    projection = list(dict.fromkeys(['id'] + list(attributes or ['id'])))
+    pages = queue.Queue(maxsize=STREAM_BUFFER_PAGES)
+    done = object()
+    stop = threading.Event()
+
+    def fetch_path(path):
+        try:
+            request, is_query = _build_request(rule, path, table_name, projection, count_only=False)
+            for page in _paginate(request, is_query):
+                if stop.is_set():
+                    return
+                pages.put(page['Items'])
+        except Exception as e:
+            pages.put(e)
+        finally:
+            pages.put(done)
+
+    executor = ThreadPoolExecutor(max_workers=min(MAX_RESOLVER_WORKERS, len(paths)))
+    for path in paths:
+        executor.submit(fetch_path, path)
+
+    seen = set()
+    remaining = len(paths)
+    try:
+        while remaining:
+            page = pages.get()
+            if page is done:
+                remaining -= 1
+                continue
+            if isinstance(page, Exception):
+                raise page
+            for raw in page:
+                customer = {k: _deserializer.deserialize(v) for k, v in raw.items()}
+                if not disjoint:
+                    if customer['id'] in seen:
+                        continue
+                    seen.add(customer['id'])
+                yield customer
+    finally:
+        # Unblock workers if the consumer stops early
+        stop.set()
+        while remaining:
+            if pages.get() is done:
+                remaining -= 1
+        executor.shutdown(wait=False)
+
+def stream_audience_ids(rule: EligibilityRule):
+    """Stream eligible customer ids"""
+    for customer in stream_audience(rule, attributes=['id']):
+        yield customer['id']
+
+def _load_promotion(promotion_id: str) -> dict:
+    table_name = os.environ.get('PROMOTIONS_TABLE', get_data_sources()["promotions"]["table"])
+    item = get_dynamodb_resource().Table(table_name).get_item(Key={'id': promotion_id}).get('Item')
+    if not item:
+        raise ValueError(f"Promotion not found: {promotion_id}")
+    return item
+
+@tool
+def resolve_promotion_audience(promotion_id: str = None, target_segment: str = "all", lifecycle_stages: list = None,
+                               min_spend: float = None, max_spend: float = None, channels: list = None,
+                               include_ids: bool = False, max_ids: int = DEFAULT_MAX_IDS) -> str:
+    """
+    Compute which customers a promotion reaches (exact count and optional id list)
+
+    Args:
+        promotion_id: Existing promotion to resolve (its targeting fields are used)
+        target_segment: Segment id or name when no promotion_id is given (e.g., "VIP", "AT_RISK", "all")
+        lifecycle_stages: Optional lifecycle stages (e.g., ["Active", "Dormant"])
+        min_spend: Optional minimum total_spent
+        max_spend: Optional maximum total_spent
+        channels: Optional preferred channels (e.g., ["email"])
+        include_ids: Return customer ids as well as the count
+        max_ids: Maximum ids returned inline
+
+    Returns:
+        JSON with compiled targeting, audience count and (optionally) customer ids
+    """
+    try:
+        if promotion_id:
+            rule = compile_targeting(_load_promotion(promotion_id))
+        else:
+            rule = EligibilityRule(target_segment, lifecycle_stages, min_spend, max_spend, channels)
+
+        result = {"success": True, "promotion_id": promotion_id, "targeting": rule.to_dict()}
+        if include_ids:
+            ids = []
+            count = 0
+            for customer_id in stream_audience_ids(rule):
+                count += 1
+                if len(ids) < max_ids:
+                    ids.append(customer_id)
+            result.update({"audience_count": count, "customer_ids": ids, "truncated": count > len(ids)})
+        else:
+            result["audience_count"] = count_audience(rule)
+
+        return json.dumps(result, cls=DecimalEncoder)
+
+    except Exception as e:
+        return json.dumps({"success": False, "error": str(e)})
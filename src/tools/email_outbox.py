@@ -0,0 +1,423 @@
+"""Durable email outbox - tool calls enqueue, workers drain with dedup and retry state
+
+Messages are only ever sent by the EmailOutboxWorker Lambda (reserved
+concurrency 1, so one token bucket holds the whole account to the SES
+rate). Request Lambdas enqueue and ask the worker to drain now; they never
+send themselves, since a send left running when the handler returns is
+frozen before its row is marked sent and would be re-sent on lease expiry.
+"""
+
+import json
+import os
+import time
+import uuid
+import random
+import hashlib
+import sqlite3
+import threading
+from decimal import Decimal
+from concurrent.futures import ThreadPoolExecutor
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
+from tools.bulk_email_tool import BulkEmailSender, SESTransport, ThrottledError, DEFAULT_WORKERS
+from utils.aws_clients import get_client, get_resource
+
+CLAIM_BATCH_SIZE = 25
+LEASE_SECONDS = 120               # Claimed messages are re-driven if a worker dies mid-send
+MAX_ATTEMPTS = 6
+ENQUEUE_WORKERS = 8
+PERMANENT_ERROR_CODES = {"MessageRejected", "MailFromDomainNotVerifiedException", "InvalidParameterValue"}
+
+PENDING = "pending"
+SENDING = "sending"
+SENT = "sent"
+FAILED = "failed"
+
+_stream_context = None
+
+def set_stream_context(context):
+    """Set the current request's streaming context
+
+    Messages queued during the request record its connection_id, and drains
+    push progress only to the connection that queued each message (domain
+    and stage are shared by every connection of the API).
+    """
+    global _stream_context
+    _stream_context = context
+
+def current_connection_id():
+    """WebSocket connection of the request being processed, if any"""
+    return _stream_context.get('connection_id') if _stream_context else None
+
+def push_to_requester(message):
+    """Send a message to the current request's connection only; False when there is none"""
+    if not current_connection_id():
+        return False
+    from streaming import send_stream_message
+    send_stream_message(_stream_context, message)
+    return True
+
+class DecimalEncoder(json.JSONEncoder):
+    def default(self, obj):
+        if isinstance(obj, Decimal):
+            return float(obj)
+        return super(DecimalEncoder, self).default(obj)
+
+def get_dynamodb_resource():
+    """Shared DynamoDB resource"""
+    return get_resource('dynamodb')
+
+def new_outbox_id():
+    return f"outbox-{uuid.uuid4().hex}"
+
+def dedup_key(scope, to_email):
+    """Per-recipient dedup key - one message per recipient per campaign/request scope"""
+    return hashlib.sha256(f"{scope}|{to_email.strip().lower()}".encode('utf-8')).hexdigest()
+
+def _is_permanent(error):
+    """Rejected/invalid messages are failed immediately; throttles and transient errors are retried"""
+    if isinstance(error, ClientError):
+        return error.response.get('Error', {}).get('Code') in PERMANENT_ERROR_CODES
+    return isinstance(error, ValueError)
+
+def _retry_delay(attempts):
+    """Exponential backoff with full jitter between delivery attempts"""
+    return random.uniform(0, min(300.0, 2.0 * (2 ** attempts)))
+
+class SQLiteOutboxStore:
+    """Local stand-in for the DynamoDB outbox (dev, tests, single container)"""
+
+    def __init__(self, path=None):
+        self.path = path or os.environ.get('EMAIL_OUTBOX_DB', '/tmp/email_outbox.db')
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript("""
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS outbox (
+                dedup_key TEXT PRIMARY KEY,
+                outbox_id TEXT NOT NULL,
+                status TEXT NOT NULL,
+                to_email TEXT NOT NULL,
+                from_email TEXT NOT NULL,
+                subject TEXT NOT NULL,
+                body TEXT NOT NULL,
+                customer_id TEXT,
+                connection_id TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL,
+                last_error TEXT,
+                provider_message_id TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS outbox_status_idx ON outbox (status, next_attempt_at);
+            CREATE INDEX IF NOT EXISTS outbox_id_idx ON outbox (outbox_id);
+        """)
+        columns = {row['name'] for row in self._conn.execute("PRAGMA table_info(outbox)")}
+        if 'connection_id' not in columns:
+            self._conn.execute("ALTER TABLE outbox ADD COLUMN connection_id TEXT")
+
+    def enqueue(self, messages):
+        """Insert new messages; returns (enqueued count, outbox ids already holding the duplicates)"""
+        now = time.time()
+        enqueued = 0
+        duplicate_outbox_ids = []
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            for m in messages:
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO outbox (dedup_key, outbox_id, status, to_email, from_email, subject, body, "
+                    "customer_id, connection_id, next_attempt_at, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (m['dedup_key'], m['outbox_id'], PENDING, m['to_email'], m['from_email'], m['subject'], m['body'],
+                     m.get('customer_id'), m.get('connection_id'), now, now, now)
+                )
+                if cursor.rowcount:
+                    enqueued += 1
+                else:
+                    existing = self._conn.execute("SELECT outbox_id FROM outbox WHERE dedup_key = ?", (m['dedup_key'],)).fetchone()
+                    duplicate_outbox_ids.append(existing['outbox_id'])
+            self._conn.execute("COMMIT")
+        return enqueued, duplicate_outbox_ids
+
+    def claim(self, limit, lease_seconds=LEASE_SECONDS):
+        """Atomically move due pending (or lease-expired sending) messages to sending"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            rows = self._conn.execute(
+                "SELECT * FROM outbox WHERE status IN (?, ?) AND next_attempt_at <= ? ORDER BY next_attempt_at LIMIT ?",
+                (PENDING, SENDING, now, limit)
+            ).fetchall()
+            self._conn.executemany(
+                "UPDATE outbox SET status = ?, attempts = attempts + 1, next_attempt_at = ?, updated_at = ? WHERE dedup_key = ?",
+                [(SENDING, now + lease_seconds, now, row['dedup_key']) for row in rows]
+            )
+            self._conn.execute("COMMIT")
+        return [{**dict(row), 'attempts': row['attempts'] + 1} for row in rows]
+
+    def mark_sent(self, message, provider_message_id):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE outbox SET status = ?, provider_message_id = ?, next_attempt_at = NULL, last_error = NULL, updated_at = ? WHERE dedup_key = ?",
+                (SENT, provider_message_id, time.time(), message['dedup_key'])
+            )
+
+    def mark_failed(self, message, error, retry_at=None):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE outbox SET status = ?, last_error = ?, next_attempt_at = ?, updated_at = ? WHERE dedup_key = ?",
+                (PENDING if retry_at else FAILED, error, retry_at, time.time(), message['dedup_key'])
+            )
+
+    def status(self, outbox_id):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) AS n FROM outbox WHERE outbox_id = ? GROUP BY status", (outbox_id,)
+            ).fetchall()
+            errors = self._conn.execute(
+                "SELECT to_email, last_error FROM outbox WHERE outbox_id = ? AND status = ? LIMIT 20", (outbox_id, FAILED)
+            ).fetchall()
+        return {row['status']: row['n'] for row in rows}, [dict(e) for e in errors]
+
+class DynamoDBOutboxStore:
+    """Outbox table keyed by dedup_key with status-index (status, next_attempt_at) and outbox-index (outbox_id)
+
+    next_attempt_at is removed once a message is terminal, so the
+    status-index only ever holds work that still has to be done.
+    """
+
+    def __init__(self, table_name=None):
+        self.table = get_dynamodb_resource().Table(table_name or os.environ['EMAIL_OUTBOX_TABLE'])
+        self._conditional_failed = self.table.meta.client.exceptions.ConditionalCheckFailedException
+
+    def _put_if_new(self, message, now):
+        """Returns None when written, else the outbox_id of the row that already holds this dedup_key"""
+        item = {key: value for key, value in message.items() if value is not None}
+        try:
+            self.table.put_item(
+                Item={**item, 'status': PENDING, 'attempts': 0, 'next_attempt_at': Decimal(str(now)),
+                      'created_at': Decimal(str(now)), 'updated_at': Decimal(str(now))},
+                ConditionExpression='attribute_not_exists(dedup_key)',
+                ReturnValuesOnConditionCheckFailure='ALL_OLD'
+            )
+            return None
+        except self._conditional_failed as e:
+            return e.response.get('Item', {}).get('outbox_id', {}).get('S', message['outbox_id'])
+
+    def enqueue(self, messages):
+        """Conditionally put messages; returns (enqueued count, outbox ids already holding the duplicates)
+
+        Conditional puts keep dedup exact - BatchWriteItem would overwrite already-sent messages.
+        """
+        now = time.time()
+        with ThreadPoolExecutor(max_workers=ENQUEUE_WORKERS) as executor:
+            results = list(executor.map(lambda m: self._put_if_new(m, now), messages))
+        duplicate_outbox_ids = [outbox_id for outbox_id in results if outbox_id is not None]
+        return len(results) - len(duplicate_outbox_ids), duplicate_outbox_ids
+
+    def claim(self, limit, lease_seconds=LEASE_SECONDS):
+        now = Decimal(str(time.time()))
+        lease_until = now + lease_seconds
+        claimed = []
+        for status in (PENDING, SENDING):
+            if len(claimed) >= limit:
+                break
+            response = self.table.query(
+                IndexName='status-index',
+                KeyConditionExpression=Key('status').eq(status) & Key('next_attempt_at').lte(now),
+                Limit=limit - len(claimed)
+            )
+            for item in response['Items']:
+                try:
+                    # Optimistic claim - only one worker wins each message
+                    updated = self.table.update_item(
+                        Key={'dedup_key': item['dedup_key']},
+                        UpdateExpression='SET #status = :sending, next_attempt_at = :lease, attempts = attempts + :one, updated_at = :now',
+                        ConditionExpression='#status = :status AND next_attempt_at = :due',
+                        ExpressionAttributeNames={'#status': 'status'},
+                        ExpressionAttributeValues={':sending': SENDING, ':lease': lease_until, ':one': 1, ':now': now,
+                                                   ':status': status, ':due': item['next_attempt_at']},
+                        ReturnValues='ALL_NEW'
+                    )
+                    claimed.append(updated['Attributes'])
+                except self._conditional_failed:
+                    continue
+        return claimed
+
+    def mark_sent(self, message, provider_message_id):
+        self.table.update_item(
+            Key={'dedup_key': message['dedup_key']},
+            UpdateExpression='SET #status = :sent, provider_message_id = :pid, updated_at = :now REMOVE next_attempt_at, last_error',
+            ExpressionAttributeNames={'#status': 'status'},
+            ExpressionAttributeValues={':sent': SENT, ':pid': provider_message_id, ':now': Decimal(str(time.time()))}
+        )
+
+    def mark_failed(self, message, error, retry_at=None):
+        values = {':status': PENDING if retry_at else FAILED, ':error': error, ':now': Decimal(str(time.time()))}
+        if retry_at:
+            update = 'SET #status = :status, last_error = :error, updated_at = :now, next_attempt_at = :retry'
+            values[':retry'] = Decimal(str(retry_at))
+        else:
+            update = 'SET #status = :status, last_error = :error, updated_at = :now REMOVE next_attempt_at'
+        self.table.update_item(
+            Key={'dedup_key': message['dedup_key']},
+            UpdateExpression=update,
+            ExpressionAttributeNames={'#status': 'status'},
+            ExpressionAttributeValues=values
+        )
+
+    def status(self, outbox_id):
+        counts = {}
+        errors = []
+        query_args = {
+            'IndexName': 'outbox-index',
+            'KeyConditionExpression': Key('outbox_id').eq(outbox_id),
+            'ProjectionExpression': '#status, to_email, last_error',
+            'ExpressionAttributeNames': {'#status': 'status'}
+        }
+        while True:
+            response = self.table.query(**query_args)
+            for item in response['Items']:
+                counts[item['status']] = counts.get(item['status'], 0) + 1
+                if item['status'] == FAILED and len(errors) < 20:
+                    errors.append({'to_email': item.get('to_email'), 'last_error': item.get('last_error')})
+            if 'LastEvaluatedKey' not in response:
+                return counts, errors
+            query_args['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+_outbox_store = None
+
+def get_outbox_store():
+    """DynamoDB outbox when EMAIL_OUTBOX_TABLE is configured, local SQLite otherwise"""
+    global _outbox_store
+    if _outbox_store is None:
+        _outbox_store = DynamoDBOutboxStore() if os.environ.get('EMAIL_OUTBOX_TABLE') else SQLiteOutboxStore()
+    return _outbox_store
+
+def enqueue_emails(recipients, from_email, outbox_id=None, dedup_scope=None, connection_id=None):
+    """Queue rendered messages [{to_email, subject, body, customer_id}]
+
+    Returns (outbox_id, enqueued, duplicate_outbox_ids): deduplicated messages
+    keep the outbox id they were first queued under, so callers report those
+    ids for polling instead of the new one. Rows record the connection that
+    queued them (the current request's by default) for progress pushes.
+    """
+    outbox_id = outbox_id or new_outbox_id()
+    scope = dedup_scope or outbox_id
+    connection_id = connection_id or current_connection_id()
+    messages = [{
+        'dedup_key': dedup_key(scope, r['to_email']),
+        'outbox_id': outbox_id,
+        'to_email': r['to_email'],
+        'from_email': from_email,
+        'subject': r['subject'],
+        'body': r['body'],
+        'customer_id': r.get('customer_id') or 'n/a',
+        'connection_id': connection_id
+    } for r in recipients]
+    enqueued, duplicate_outbox_ids = get_outbox_store().enqueue(messages)
+    return outbox_id, enqueued, duplicate_outbox_ids
+
+class OutboxWorker:
+    """Drains the outbox in claimed batches through one BulkEmailSender (one token bucket at the SES rate)"""
+
+    def __init__(self, store=None, transport=None, workers=DEFAULT_WORKERS, batch_size=CLAIM_BATCH_SIZE, on_update=None):
+        self.store = store or get_outbox_store()
+        self.batch_size = batch_size
+        self.on_update = on_update
+        # Each claimed batch is one sender batch, so every claim gets its own throughput line
+        self.sender = BulkEmailSender(transport or SESTransport(), workers=workers, batch_size=batch_size)
+        self._totals_lock = threading.Lock()
+
+    def _record(self, totals):
+        """Sender callback - record each delivery in the store as soon as it completes"""
+        def record(message, result, error):
+            if error is None:
+                self.store.mark_sent(message, result['message_id'])
+                outcome = SENT
+            else:
+                retryable = isinstance(error, ThrottledError) or not _is_permanent(error)
+                attempts = int(message.get('attempts', 1))
+                retry_at = time.time() + _retry_delay(attempts) if retryable and attempts < MAX_ATTEMPTS else None
+                self.store.mark_failed(message, result['error'], retry_at)
+                outcome = PENDING if retry_at else FAILED
+            with self._totals_lock:
+                totals[outcome] += 1
+        return record
+
+    def drain(self, max_seconds=None):
+        """Claim and send batches until the outbox has no due work (or time runs out)"""
+        deadline = time.time() + max_seconds if max_seconds else None
+        totals = {SENT: 0, PENDING: 0, FAILED: 0, "batches": 0, "seconds": 0.0}
+        record = self._record(totals)
+        while deadline is None or time.time() < deadline:
+            batch = self.store.claim(self.batch_size)
+            if not batch:
+                break
+            report = self.sender.send_messages(batch, on_result=record)
+            totals["batches"] += 1
+            totals["seconds"] = round(totals["seconds"] + report["seconds"], 3)
+            print(f"[OUTBOX] Batch {totals['batches']}: sent={report['sent']} failed={report['failed']} "
+                  f"retries={report['retries']} {report['throughput_per_sec']}/s (limit {report['send_rate_limit']}/s)")
+            if self.on_update:
+                self.on_update({(m['outbox_id'], m.get('connection_id')) for m in batch}, dict(totals))
+        totals["throughput_per_sec"] = round(totals[SENT] / totals["seconds"], 2) if totals["seconds"] > 0 else 0.0
+        return totals
+
+def _push_updates(batch_outboxes, totals, stream_context=None):
+    """Push outbox progress to the connection that queued each outbox (never to another user's connection)"""
+    api = stream_context or _stream_context
+    if not api:
+        return
+    from streaming import send_stream_message
+    store = get_outbox_store()
+    for outbox_id, connection_id in batch_outboxes:
+        if not connection_id:
+            continue
+        counts, _ = store.status(outbox_id)
+        send_stream_message({**api, 'connection_id': connection_id},
+                            {"type": "outbox_update", "outbox_id": outbox_id, "counts": counts})
+
+def request_drain():
+    """Ask the outbox worker Lambda to drain now instead of waiting for its schedule
+
+    The invoke is asynchronous, so the tool call returns immediately. The
+    request's API domain/stage go along so the worker can push progress to the
+    connections that queued messages. Without EMAIL_OUTBOX_WORKER_FUNCTION
+    (local development on the SQLite store) the drain runs inline.
+    """
+    function_name = os.environ.get('EMAIL_OUTBOX_WORKER_FUNCTION')
+    if not function_name:
+        return OutboxWorker(on_update=_push_updates).drain(max_seconds=LEASE_SECONDS)
+    payload = {}
+    if _stream_context:
+        payload["stream_context"] = {key: _stream_context[key] for key in ('domain_name', 'stage') if key in _stream_context}
+    get_client('lambda').invoke(FunctionName=function_name, InvocationType='Event', Payload=json.dumps(payload))
+
+def get_outbox_status(outbox_id):
+    counts, errors = get_outbox_store().status(outbox_id)
+    total = sum(counts.values())
+    return {
+        "outbox_id": outbox_id,
+        "found": total > 0,
+        "total": total,
+        "counts": counts,
+        "complete": total > 0 and counts.get(PENDING, 0) + counts.get(SENDING, 0) == 0,
+        "errors": errors
+    }
+
+def lambda_handler(event, context):
+    """Outbox worker - drains due messages within the invocation time budget
+
+    Runs on its schedule and when a request calls request_drain. Invocations
+    from a request carry the API domain/stage and push progress to the
+    connection recorded on each message; scheduled runs push nothing, and
+    clients poll get_email_outbox_status.
+    """
+    api = event.get('stream_context') if isinstance(event, dict) else None
+    on_update = (lambda batch_outboxes, totals: _push_updates(batch_outboxes, totals, api)) if api else None
+    remaining_ms = context.get_remaining_time_in_millis() if context else 60000
+    totals = OutboxWorker(on_update=on_update).drain(max_seconds=max(1.0, remaining_ms / 1000.0 - 10.0))
+    print(f"[OUTBOX] Drain complete: {totals}")
+    return {"statusCode": 200, "body": json.dumps(totals)}
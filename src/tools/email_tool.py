@@ -1,44 +1,47 @@
 import json
-import boto3
-from functools import lru_cache
 from strands.tools import tool
+from tools.email_outbox import enqueue_emails, request_drain, get_outbox_status
+from utils.aws_clients import get_client
 
-@lru_cache(maxsize=1)
 def get_ses_client():
-    """Cached SES client"""
-    return boto3.client('ses')
+    """Shared SES client"""
+    return get_client('ses')
 
 @tool
-def send_email(to_email: str, subject: str, message: str, from_email: str = "noreply@infinitra.com") -> str:
+def send_email(to_email: str, subject: str, message: str, from_email: str = "noreply@infinitra.com",
+               idempotency_key: str = None) -> str:
     """
-    Send an email using AWS SES
+    Send an email using AWS SES (queued in the durable outbox, delivered asynchronously)
     
     Args:
         to_email: Recipient email address
         subject: Email subject line
         message: Email message body
         from_email: Sender email address (default: noreply@infinitra.com)
+        idempotency_key: Optional key for retries of the same send; repeating a call with the same key
+            sends once. Without a key every call sends.
         
     Returns:
-        JSON string with send result
+        JSON string with the outbox id to poll for delivery status
     """
     try:
-        ses = get_ses_client()
-        
-        response = ses.send_email(
-            Source=from_email,
-            Destination={'ToAddresses': [to_email]},
-            Message={
-                'Subject': {'Data': subject, 'Charset': 'UTF-8'},
-                'Body': {
-                    'Text': {'Data': message, 'Charset': 'UTF-8'}
-                }
-            }
+        # Only an explicit idempotency key dedupes - an intentional resend always goes out
+        outbox_id, enqueued, duplicate_outbox_ids = enqueue_emails(
+            [{"to_email": to_email, "subject": subject, "body": message}],
+            from_email,
+            dedup_scope=f"send_email|{idempotency_key}" if idempotency_key else None
         )
+        if enqueued:
+            request_drain()
+        else:
+            # Already queued under this idempotency key - poll the original outbox
+            outbox_id = duplicate_outbox_ids[0]
         
         return json.dumps({
             "success": True,
-            "message_id": response['MessageId'],
+            "queued": True,
+            "outbox_id": outbox_id,
+            "duplicate": not enqueued,
             "sent_to": to_email,
             "subject": subject
         })
@@ -49,3 +52,19 @@ def send_email(to_email: str, subject: str, message: str, from_email: str = "nor
             "error": str(e),
             "note": "Email sending failed - check SES configuration"
         })
+
+@tool
+def get_email_outbox_status(outbox_id: str) -> str:
+    """
+    Check delivery status of queued emails
+    
+    Args:
+        outbox_id: Outbox id returned by send_email or send_bulk_email
+        
+    Returns:
+        JSON string with message counts by status (pending, sending, sent, failed)
+    """
+    try:
+        return json.dumps({"success": True, **get_outbox_status(outbox_id)})
+    except Exception as e:
+        return json.dumps({"success": False, "error": str(e)})
@@ -0,0 +1,362 @@
+"""Federated DynamoDB + Aurora joins - filter/projection pushdown, key lookups per primary page, streaming join
+
+A join spec names a primary source and the sources joined onto it:
+
+    {
+        "primary": {"source": "dynamodb.customers", "filters": {"segment_id": "VIP_HIGH_VALUE"}},
+        "joins": [
+            {"source": "aurora.customer_metrics", "on": ["id", "customer_id"],
+             "columns": ["churn_probability", "rfm_segment"], "how": "left"}
+        ],
+        "limit": 200
+    }
+
+Filters are equality ({"col": value}) or membership ({"col": [v1, v2]}).
+Joined sides are never scanned whole: each primary page's join keys are pushed
+down as IN-list batches (Aurora), BatchGetItem (DynamoDB primary key) or GSI
+queries, and a side that matches more rows than MAX_SIDE_ROWS for one page
+raises JoinTooLargeError instead of dropping matches.
+Named specs for CROSS_DATABASE_RELATIONSHIPS live in RELATIONSHIP_SPECS.
+"""
+
+import re
+import time
+import random
+from concurrent.futures import ThreadPoolExecutor
+from boto3.dynamodb.conditions import Attr, Key
+from config.data_sources import get_data_sources
+
+MAX_SIDE_ROWS = 10000             # Matches one joined side may return for a single primary page
+KEY_BATCH_SIZE = 100              # Join keys per IN-list / BatchGetItem request (DynamoDB limit)
+AURORA_PAGE_ROWS = 1000           # Rows per Data API call - keeps responses under the 1 MB limit
+KEY_QUERY_WORKERS = 8             # Concurrent GSI queries for one key batch
+MAX_BATCH_RETRIES = 8
+DEFAULT_JOIN_LIMIT = 500
+IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+# Executable versions of CROSS_DATABASE_RELATIONSHIPS
+RELATIONSHIP_SPECS = {
+    "customer_360": {
+        "primary": {"source": "dynamodb.customers"},
+        "joins": [
+            {"source": "aurora.customer_metrics", "on": ["id", "customer_id"], "how": "left",
+             "columns": ["total_orders", "avg_order_value", "days_since_last_order", "rfm_segment", "churn_probability"]},
+            {"source": "aurora.behavioral_analytics", "on": ["id", "customer_id"], "how": "left",
+             "columns": ["email_open_rate", "website_sessions_30d", "engagement_score"]}
+        ]
+    },
+    "segment_analysis": {
+        "primary": {"source": "aurora.segment_assignments",
+                    "columns": ["customer_id", "segment_id", "assigned_date", "previous_segment", "migration_reason"]},
+        "joins": [
+            {"source": "aurora.segments", "on": ["segment_id", "id"], "how": "left",
+             "columns": ["name", "customer_count", "avg_clv"]},
+            {"source": "dynamodb.customers", "on": ["customer_id", "id"], "how": "left",
+             "columns": ["name", "email", "lifecycle_stage", "total_spent"]}
+        ]
+    },
+    "promotion_targeting": {
+        "primary": {"source": "dynamodb.promotions"},
+        "joins": [
+            {"source": "aurora.segments", "on": ["target_segment", "id"], "how": "left",
+             "columns": ["name", "customer_count", "avg_clv"]}
+        ]
+    }
+}
+
+class JoinTooLargeError(ValueError):
+    """A joined side matched more rows than MAX_SIDE_ROWS for one primary page"""
+
+def _key_columns(schema):
+    """Primary key columns from a schema's "primary_key" description (e.g. "customer_id, segment_id (varchar)")"""
+    return re.findall(r"\w+", schema["primary_key"].split("(")[0])
+
+def _dynamodb_config(name):
+    config = get_data_sources().get(name)
+    if not config or config["type"] != "dynamodb":
+        raise ValueError(f"Unknown DynamoDB source: {name}")
+    return config
+
+def _aurora_table(name):
+    tables = get_data_sources()["customer_analytics"]["tables"]
+    if name not in tables:
+        raise ValueError(f"Unknown Aurora table: {name}")
+    return tables[name]
+
+def _aurora_columns(name):
+    return set(_aurora_table(name)["schema"]["columns"])
+
+def _index_for(config, filters):
+    """GSI whose partition key has an equality filter, as (index name, key attribute)"""
+    for index in config["schema"].get("indexes", []):
+        match = re.match(r"([\w-]+) \((\w+)", index)
+        if match and match.group(2) in filters and not isinstance(filters[match.group(2)], list):
+            return match.group(1), match.group(2)
+    return None, None
+
+def _projection(columns):
+    names = {f"#p{i}": column for i, column in enumerate(columns)}
+    return {"ProjectionExpression": ", ".join(names), "ExpressionAttributeNames": names}
+
+def scan_dynamodb(dynamodb, name, filters=None, columns=None):
+    """Yield pages of items with filters and projection pushed into the request"""
+    config = _dynamodb_config(name)
+    filters = dict(filters or {})
+    table = dynamodb.Table(config["table"])
+    request = {}
+
+    index, key = _index_for(config, filters)
+    if index:
+        request.update(IndexName=index, KeyConditionExpression=Key(key).eq(filters.pop(key)))
+    condition = None
+    for column, value in filters.items():
+        clause = Attr(column).is_in(value) if isinstance(value, list) else Attr(column).eq(value)
+        condition = clause if condition is None else condition & clause
+    if condition is not None:
+        request["FilterExpression"] = condition
+    if columns:
+        request.update(_projection(columns))
+
+    operation = table.query if index else table.scan
+    while True:
+        response = operation(**request)
+        yield response["Items"]
+        if "LastEvaluatedKey" not in response:
+            break
+        request["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+def _backoff(attempt):
+    """Exponential backoff with full jitter for DynamoDB batch retries"""
+    time.sleep(random.uniform(0, min(2.0, 0.05 * (2 ** attempt))))
+
+def _matches(item, filters):
+    """Equality / membership filters evaluated locally (BatchGetItem has no FilterExpression)"""
+    for column, value in filters.items():
+        if item.get(column) not in (value if isinstance(value, list) else [value]):
+            return False
+    return True
+
+def batch_get_dynamodb(dynamodb, name, keys, filters=None, columns=None):
+    """Yield items for primary key values with BatchGetItem, 100 keys per request"""
+    config = _dynamodb_config(name)
+    table_name = config["table"]
+    key_column = _key_columns(config["schema"])[0]
+    filters = filters or {}
+    projection = _projection(list(dict.fromkeys(list(columns) + list(filters)))) if columns else {}
+
+    for start in range(0, len(keys), KEY_BATCH_SIZE):
+        request = {table_name: {"Keys": [{key_column: key} for key in keys[start:start + KEY_BATCH_SIZE]], **projection}}
+        attempt = 0
+        while request:
+            response = dynamodb.batch_get_item(RequestItems=request)
+            items = [item for item in response.get("Responses", {}).get(table_name, []) if _matches(item, filters)]
+            if columns:
+                items = [{column: item[column] for column in columns if column in item} for item in items]
+            yield items
+            request = response.get("UnprocessedKeys") or {}
+            if request:
+                attempt += 1
+                if attempt > MAX_BATCH_RETRIES:
+                    raise RuntimeError("BatchGetItem retries exhausted")
+                _backoff(attempt)
+
+def _aurora_value(value):
+    if isinstance(value, bool):
+        return {"booleanValue": value}
+    if isinstance(value, int):
+        return {"longValue": value}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+def build_aurora_select(name, filters=None, columns=None, limit=AURORA_PAGE_ROWS, offset=0):
+    """Parameterized SELECT with filters and projection pushed down; identifiers checked against the schema
+
+    Rows are ordered by the table's primary key so LIMIT/OFFSET pages are stable.
+    """
+    known = _aurora_columns(name)
+    for column in list(columns or []) + list(filters or {}):
+        if not IDENTIFIER.match(column) or column not in known:
+            raise ValueError(f"Unknown column for {name}: {column}")
+
+    clauses, parameters = [], []
+    for i, (column, value) in enumerate((filters or {}).items()):
+        values = value if isinstance(value, list) else [value]
+        names = [f"f{i}_{j}" for j in range(len(values))]
+        parameters.extend({"name": n, "value": _aurora_value(v)} for n, v in zip(names, values))
+        clauses.append(f"{column} IN ({', '.join(':' + n for n in names)})")
+
+    sql = f"SELECT {', '.join(columns) if columns else '*'} FROM {name}"
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += f" ORDER BY {', '.join(_key_columns(_aurora_table(name)['schema']))}"
+    return f"{sql} LIMIT {int(limit)} OFFSET {int(offset)}", parameters
+
+def fetch_aurora(rds_data, connection, name, filters=None, columns=None, page_rows=AURORA_PAGE_ROWS):
+    """Yield Aurora rows page by page, keyed by column name"""
+    offset = 0
+    while True:
+        sql, parameters = build_aurora_select(name, filters, columns, page_rows, offset)
+        response = rds_data.execute_statement(
+            resourceArn=connection["cluster_arn"],
+            secretArn=connection["secret_arn"],
+            database=connection["database"],
+            sql=sql,
+            parameters=parameters,
+            includeResultMetadata=True
+        )
+        labels = [c.get("label") or c.get("name") for c in response.get("columnMetadata", [])]
+        records = response.get("records", [])
+        yield [{labels[i]: None if field.get("isNull") else next(iter(field.values())) for i, field in enumerate(record)}
+               for record in records]
+        if len(records) < page_rows:
+            break
+        offset += page_rows
+
+def _with_key(columns, key):
+    """Projection that always includes the join key"""
+    return list(dict.fromkeys(list(columns) + [key])) if columns else None
+
+class FederatedQuery:
+    """Executes a join spec; iterate for joined rows as primary pages arrive"""
+
+    def __init__(self, spec, dynamodb, rds_data, connection):
+        self.spec = spec
+        self.dynamodb = dynamodb
+        self.rds_data = rds_data
+        self.connection = connection
+        self.stats = {"primary_rows": 0, "joined_rows": 0, "build_rows": {}, "key_lookups": {}}
+
+    def _pages(self, side):
+        engine, _, name = side["source"].partition(".")
+        if engine == "dynamodb":
+            return scan_dynamodb(self.dynamodb, name, side.get("filters"), side.get("columns"))
+        if engine == "aurora":
+            return fetch_aurora(self.rds_data, self.connection, name, side.get("filters"), side.get("columns"))
+        raise ValueError(f"Unknown source engine: {side['source']}")
+
+    def _key_pages(self, join, keys):
+        """Pages of joined-side rows whose join column is one of keys"""
+        engine, _, name = join["source"].partition(".")
+        right_key = join["on"][1]
+        columns = _with_key(join.get("columns"), right_key)
+        filters = dict(join.get("filters") or {})
+        allowed = filters.pop(right_key, None)
+        if allowed is not None:
+            allowed = allowed if isinstance(allowed, list) else [allowed]
+            keys = [key for key in keys if key in allowed]
+
+        if engine == "aurora":
+            for start in range(0, len(keys), KEY_BATCH_SIZE):
+                yield from fetch_aurora(self.rds_data, self.connection, name,
+                                        {**filters, right_key: keys[start:start + KEY_BATCH_SIZE]}, columns)
+        elif engine == "dynamodb":
+            config = _dynamodb_config(name)
+            if right_key == _key_columns(config["schema"])[0]:
+                yield from batch_get_dynamodb(self.dynamodb, name, keys, filters, columns)
+            elif _index_for(config, {right_key: None})[0]:
+                # One GSI query per key, run concurrently
+                def query(key):
+                    return [item for page in scan_dynamodb(self.dynamodb, name, {**filters, right_key: key}, columns)
+                            for item in page]
+                with ThreadPoolExecutor(max_workers=KEY_QUERY_WORKERS) as pool:
+                    yield from pool.map(query, keys)
+            else:
+                # No key or index on the join column - filtered scan per key batch
+                for start in range(0, len(keys), KEY_BATCH_SIZE):
+                    yield from scan_dynamodb(self.dynamodb, name, {**filters, right_key: keys[start:start + KEY_BATCH_SIZE]}, columns)
+        else:
+            raise ValueError(f"Unknown source engine: {join['source']}")
+
+    def _lookup(self, join, keys):
+        """Hash table of the joined side's rows matching keys, keyed by its join column"""
+        right_key = join["on"][1]
+        keys = [key for key in dict.fromkeys(keys) if key is not None]
+        table, rows = {}, 0
+        if keys:
+            for page in self._key_pages(join, keys):
+                rows += len(page)
+                if rows > MAX_SIDE_ROWS:
+                    raise JoinTooLargeError(
+                        f"{join['source']} matched more than {MAX_SIDE_ROWS} rows for {len(keys)} join keys; "
+                        "add filters to the joined side or lower the limit")
+                for row in page:
+                    table.setdefault(row.get(right_key), []).append(row)
+
+        source = join["source"]
+        self.stats["build_rows"][source] = self.stats["build_rows"].get(source, 0) + rows
+        self.stats["key_lookups"][source] = self.stats["key_lookups"].get(source, 0) + len(keys)
+        return table
+
+    def _expand(self, results, join, table):
+        """All combinations of rows with their matches (dropped for inner joins without one)"""
+        left_key, right_key = join["on"]
+        name = join["source"].partition(".")[2]
+        expanded = []
+        for result in results:
+            matches = table.get(result.get(left_key))
+            if not matches:
+                if join.get("how", "inner") == "left":
+                    expanded.append(result)
+                continue
+            for match in matches:
+                merged = dict(result)
+                for column, value in match.items():
+                    if column == right_key:
+                        continue
+                    # Columns already present keep their value; the joined one is qualified
+                    merged[f"{name}.{column}" if column in result else column] = value
+                expanded.append(merged)
+        return expanded
+
+    def _join_page(self, page, joins, executor):
+        """Join one primary page; lookups keyed on primary columns run concurrently"""
+        lookups = {i: executor.submit(self._lookup, join, [row.get(join["on"][0]) for row in page])
+                   for i, join in enumerate(joins) if any(join["on"][0] in row for row in page)}
+        results = [dict(row) for row in page]
+        for i, join in enumerate(joins):
+            # Joins keyed on a column from an earlier join look up after it has been applied
+            table = lookups[i].result() if i in lookups else self._lookup(join, [r.get(join["on"][0]) for r in results])
+            results = self._expand(results, join, table)
+        return results
+
+    def __iter__(self):
+        joins = self.spec.get("joins", [])
+        limit = self.spec.get("limit", DEFAULT_JOIN_LIMIT)
+        primary = self.spec["primary"]
+        if primary.get("columns"):
+            primary = {**primary, "columns": list(dict.fromkeys(primary["columns"] + [j["on"][0] for j in joins]))}
+
+        with ThreadPoolExecutor(max_workers=len(joins) + 1) as executor:
+            pages = self._pages(primary)
+            emitted = 0
+            page = next(pages, None)
+            while page is not None:
+                # The next primary page loads while this one is joined
+                upcoming = executor.submit(next, pages, None)
+                self.stats["primary_rows"] += len(page)
+                for joined in self._join_page(page, joins, executor):
+                    yield joined
+                    emitted += 1
+                    if emitted >= limit:
+                        self.stats["joined_rows"] = emitted
+                        upcoming.cancel()
+                        return
+                page = upcoming.result()
+            self.stats["joined_rows"] = emitted
+
+def resolve_spec(relationship=None, spec=None):
+    """Join spec from a named relationship, optionally overridden by an explicit spec"""
+    if relationship:
+        if relationship not in RELATIONSHIP_SPECS:
+            raise ValueError(f"Unknown relationship: {relationship} (available: {', '.join(RELATIONSHIP_SPECS)})")
+        base = RELATIONSHIP_SPECS[relationship]
+        spec = spec or {}
+        return {
+            "primary": {**base["primary"], **spec.get("primary", {})},
+            "joins": spec.get("joins", base["joins"]),
+            "limit": spec.get("limit", DEFAULT_JOIN_LIMIT)
+        }
+    if not spec or "primary" not in spec:
+        raise ValueError("A relationship name or a join spec with a primary source is required")
+    return spec
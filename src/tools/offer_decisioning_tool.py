@@ -0,0 +1,284 @@
+"""Offer decisioning - in-memory index of active promotions for per-customer offer selection"""
+
+import json
+import os
+import time
+import heapq
+import random
+import threading
+from collections import OrderedDict
+from decimal import Decimal
+from strands.tools import tool
+from config.data_sources import get_data_sources
+from utils.aws_clients import get_resource
+
+INDEX_REFRESH_SECONDS = 60        # Reload active promotions at most once a minute
+SEGMENT_CACHE_SECONDS = 300       # Customer segments change rarely (nightly segmentation)
+MISSING_SEGMENT_CACHE_SECONDS = 60  # Unknown customers are re-checked sooner
+MAX_CACHED_CUSTOMERS = int(os.environ.get('OFFER_SEGMENT_CACHE_SIZE', '50000'))  # LRU bound on the segment cache
+MAX_BATCH_RETRIES = 8
+DEFAULT_OFFER_LIMIT = 3
+ALL_SEGMENTS = "all"
+
+class DecimalEncoder(json.JSONEncoder):
+    def default(self, obj):
+        if isinstance(obj, Decimal):
+            return float(obj)
+        return super(DecimalEncoder, self).default(obj)
+
+def get_dynamodb_resource():
+    """Shared DynamoDB resource"""
+    return get_resource('dynamodb')
+
+def _promotions_table_name():
+    return os.environ.get('PROMOTIONS_TABLE', get_data_sources()["promotions"]["table"])
+
+def _customers_table_name():
+    return os.environ.get('CUSTOMERS_TABLE', get_data_sources()["customers"]["table"])
+
+def _offer_rank(promotion):
+    """Ranking key - higher discount wins, newer promotion breaks ties"""
+    return (float(promotion.get('discount_percent', 0) or 0), promotion.get('created_date', ''))
+
+class ActivePromotionIndex:
+    """Active promotions keyed by target_segment, refreshed on a TTL or on demand
+
+    Decisions are pure dictionary lookups against the loaded index, so the
+    only remote call on the hot path is a customer segment lookup on a
+    cache miss.
+    """
+
+    def __init__(self, refresh_seconds=INDEX_REFRESH_SECONDS, segment_cache_seconds=SEGMENT_CACHE_SECONDS, loader=None, segment_loader=None,
+                 max_cached_customers=MAX_CACHED_CUSTOMERS):
+        self.refresh_seconds = refresh_seconds
+        self.segment_cache_seconds = segment_cache_seconds
+        self.max_cached_customers = max_cached_customers
+        self._loader = loader or _load_active_promotions
+        self._segment_loader = segment_loader or _load_customer_segments
+        self._lock = threading.Lock()
+        self._by_segment = {}
+        self._combined = {}
+        self._segments = OrderedDict()
+        self.version = 0
+        self.loaded_at = 0.0
+        self.promotion_count = 0
+
+    def load(self, promotions):
+        """Build the index from a list of promotion items"""
+        by_segment = {}
+        for promotion in promotions:
+            by_segment.setdefault(promotion.get('target_segment') or ALL_SEGMENTS, []).append(promotion)
+        for offers in by_segment.values():
+            offers.sort(key=_offer_rank, reverse=True)
+
+        with self._lock:
+            self._by_segment = by_segment
+            self._combined = {}
+            self.promotion_count = len(promotions)
+            self.version += 1
+            self.loaded_at = time.time()
+
+    def refresh(self, force=False):
+        """Reload active promotions when the index is stale"""
+        if force or time.time() - self.loaded_at >= self.refresh_seconds:
+            self.load(self._loader())
+
+    def invalidate(self):
+        """Force a reload on the next decision (e.g. after a promotion is created)"""
+        self.loaded_at = 0.0
+
+    def prime_segments(self, segments, ttl=None):
+        """Seed the customer segment cache with {customer_id: (segment_id, segment)}"""
+        expires = time.time() + (self.segment_cache_seconds if ttl is None else ttl)
+        with self._lock:
+            for customer_id, keys in segments.items():
+                self._segments[customer_id] = (tuple(keys), expires)
+                self._segments.move_to_end(customer_id)
+            while len(self._segments) > self.max_cached_customers:
+                self._segments.popitem(last=False)
+
+    def _segment_keys(self, customer_ids):
+        """Resolve customers to their segment keys, loading cache misses in one batch"""
+        now = time.time()
+        resolved = {}
+        missing = []
+        with self._lock:
+            for customer_id in customer_ids:
+                cached = self._segments.get(customer_id)
+                if cached and cached[1] > now:
+                    self._segments.move_to_end(customer_id)
+                    resolved[customer_id] = cached[0]
+                else:
+                    missing.append(customer_id)
+
+        if missing:
+            loaded = self._segment_loader(missing)
+            self.prime_segments(loaded)
+            # Negative-cache customers without a record so repeat lookups stay local
+            self.prime_segments({cid: () for cid in missing if cid not in loaded}, ttl=MISSING_SEGMENT_CACHE_SECONDS)
+            for customer_id in missing:
+                resolved[customer_id] = tuple(loaded.get(customer_id, ()))
+        return resolved
+
+    def _offers_for(self, segment_keys, limit):
+        """Top offers for a segment key combination, memoized per index version
+
+        Held under the lock so a memo built from the old index can never be
+        stored after load() has swapped in a new one.
+        """
+        cache_key = (segment_keys, limit)
+        with self._lock:
+            offers = self._combined.get(cache_key)
+            if offers is None:
+                seen = set()
+                candidates = []
+                for key in segment_keys + (ALL_SEGMENTS,):
+                    for promotion in self._by_segment.get(key, ()):
+                        if promotion['id'] not in seen:
+                            seen.add(promotion['id'])
+                            candidates.append(promotion)
+                offers = heapq.nlargest(limit, candidates, key=_offer_rank)
+                self._combined[cache_key] = offers
+        return offers
+
+    def best_offers(self, customer_id, limit=DEFAULT_OFFER_LIMIT):
+        """Best active offers for one customer"""
+        return self.best_offers_batch([customer_id], limit)[customer_id]
+
+    def best_offers_batch(self, customer_ids, limit=DEFAULT_OFFER_LIMIT):
+        """Best active offers for many customers - one segment lookup round trip for all misses"""
+        self.refresh()
+        segment_keys = self._segment_keys(customer_ids)
+        return {cid: self._offers_for(segment_keys[cid], limit) for cid in customer_ids}
+
+def _load_active_promotions():
+    """Load active promotions through the status-index GSI"""
+    table = get_dynamodb_resource().Table(_promotions_table_name())
+    query_args = {
+        'IndexName': 'status-index',
+        'KeyConditionExpression': '#status = :active',
+        'ExpressionAttributeNames': {'#status': 'status'},
+        'ExpressionAttributeValues': {':active': 'active'}
+    }
+
+    promotions = []
+    while True:
+        response = table.query(**query_args)
+        promotions.extend(response['Items'])
+        if 'LastEvaluatedKey' not in response:
+            return promotions
+        query_args['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+def _backoff(attempt):
+    """Exponential backoff with full jitter for DynamoDB batch retries"""
+    time.sleep(random.uniform(0, min(2.0, 0.05 * (2 ** attempt))))
+
+def _load_customer_segments(customer_ids):
+    """Look up segment_id / segment for customers with BatchGetItem"""
+    dynamodb = get_dynamodb_resource()
+    table_name = _customers_table_name()
+    segments = {}
+
+    unique_ids = list(dict.fromkeys(customer_ids))
+    for start in range(0, len(unique_ids), 100):
+        request = {table_name: {
+            'Keys': [{'id': cid} for cid in unique_ids[start:start + 100]],
+            'ProjectionExpression': 'id, segment_id, #segment',
+            'ExpressionAttributeNames': {'#segment': 'segment'}
+        }}
+        attempt = 0
+        while request:
+            response = dynamodb.batch_get_item(RequestItems=request)
+            for item in response.get('Responses', {}).get(table_name, []):
+                segments[item['id']] = tuple(key for key in (item.get('segment_id'), item.get('segment')) if key)
+            request = response.get('UnprocessedKeys') or {}
+            if request:
+                attempt += 1
+                if attempt > MAX_BATCH_RETRIES:
+                    raise RuntimeError("BatchGetItem retries exhausted")
+                _backoff(attempt)
+    return segments
+
+# Global index instance shared across warm invocations
+_offer_index = None
+
+def get_offer_index():
+    """Get or create the shared active-promotion index"""
+    global _offer_index
+    if _offer_index is None:
+        _offer_index = ActivePromotionIndex()
+    return _offer_index
+
+def invalidate_offer_index():
+    """Reload active promotions on this container's next decision (called after promotion writes)
+
+    Other warm containers pick up the change on their next TTL refresh.
+    """
+    if _offer_index is not None:
+        _offer_index.invalidate()
+
+@tool
+def get_best_offers(customer_ids: list, limit: int = DEFAULT_OFFER_LIMIT) -> str:
+    """
+    Decide the best active offers for one or more customers
+
+    Args:
+        customer_ids: Customer ids (e.g., ["cust-001", "cust-002"])
+        limit: Maximum offers per customer (default 3)
+
+    Returns:
+        JSON with offers per customer, ordered best first
+    """
+    try:
+        start = time.perf_counter()
+        index = get_offer_index()
+        decisions = index.best_offers_batch(customer_ids, limit)
+
+        return json.dumps({
+            "success": True,
+            "offers": decisions,
+            "index_version": index.version,
+            "active_promotions": index.promotion_count,
+            "decision_ms": round((time.perf_counter() - start) * 1000, 3)
+        }, cls=DecimalEncoder)
+
+    except Exception as e:
+        return json.dumps({"success": False, "error": str(e)})
+
+def benchmark(num_promotions=200, num_customers=10000, decisions=100000, segments=10):
+    """Microbenchmark per-decision latency against a synthetic, fully warmed index"""
+    segment_ids = [f"SEGMENT_{i}" for i in range(segments)]
+    promotions = [{
+        'id': f"promo-{i:05d}",
+        'target_segment': random.choice(segment_ids + [ALL_SEGMENTS]),
+        'discount_percent': random.randint(5, 40),
+        'created_date': f"2024-01-{i % 28 + 1:02d}"
+    } for i in range(num_promotions)]
+
+    index = ActivePromotionIndex(loader=lambda: promotions, segment_loader=lambda ids: {})
+    index.refresh(force=True)
+    index.prime_segments({f"cust-{i}": (random.choice(segment_ids),) for i in range(num_customers)})
+
+    customer_ids = [f"cust-{random.randrange(num_customers)}" for _ in range(decisions)]
+    latencies = []
+    for customer_id in customer_ids:
+        start = time.perf_counter_ns()
+        index.best_offers(customer_id)
+        latencies.append(time.perf_counter_ns() - start)
+    latencies.sort()
+
+    start = time.perf_counter()
+    index.best_offers_batch(customer_ids[:1000])
+    batch_ms = (time.perf_counter() - start) * 1000
+
+    return {
+        "promotions": num_promotions,
+        "decisions": decisions,
+        "p50_us": latencies[len(latencies) // 2] / 1000,
+        "p99_us": latencies[int(len(latencies) * 0.99)] / 1000,
+        "max_us": latencies[-1] / 1000,
+        "batch_1000_ms": round(batch_ms, 3)
+    }
+
+if __name__ == "__main__":
+    print(json.dumps(benchmark(), indent=2))
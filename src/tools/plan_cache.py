@@ -0,0 +1,151 @@
+"""Plan cache - replays the Data Agent's validated tool-call sequence for recurring requests"""
+
+import re
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+PLAN_TTL_SECONDS = 3600           # Plans expire this long after they were last validated
+PLAN_MIN_OBSERVATIONS = 2         # Agent runs needed before a plan is replayed
+PLAN_MIN_CONFIDENCE = 0.66        # Share of observations that must agree on the same sequence
+MAX_PLANS = 256
+MAX_REPLAY_WORKERS = 8
+
+_recording = None
+_recording_lock = threading.Lock()
+
+def normalize_request(user_request):
+    """Plan key - case, punctuation and whitespace differences map to the same plan"""
+    return " ".join(re.sub(r"[^\w\s]", " ", user_request.lower()).split())
+
+class PlanRecording:
+    """Tool calls made during one Data Agent run"""
+
+    def __init__(self):
+        self.calls = []
+        self.valid = True
+
+    def add(self, tool_name, args, success):
+        self.calls.append((tool_name, args))
+        if not success:
+            self.valid = False
+
+def record_tool_call(tool_name, args, success=True):
+    """Called by data tools; a no-op unless a Data Agent run is being recorded"""
+    with _recording_lock:
+        if _recording is not None:
+            _recording.add(tool_name, args, success)
+
+class recording:
+    """Context manager capturing the tool calls of a Data Agent run"""
+
+    def __enter__(self):
+        global _recording
+        with _recording_lock:
+            _recording = PlanRecording()
+            return _recording
+
+    def __exit__(self, *exc_info):
+        global _recording
+        with _recording_lock:
+            _recording = None
+        return False
+
+class PlanCache:
+    """Normalized request -> observed tool-call sequences, with replay metrics"""
+
+    def __init__(self, ttl=PLAN_TTL_SECONDS, min_observations=PLAN_MIN_OBSERVATIONS, min_confidence=PLAN_MIN_CONFIDENCE):
+        self.ttl = ttl
+        self.min_observations = min_observations
+        self.min_confidence = min_confidence
+        self._plans = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "recorded": 0, "replay_failures": 0, "saved_ms": 0.0}
+
+    def record(self, user_request, plan_recording, agent_ms):
+        """Add an agent run's tool calls as an observation for the request"""
+        if not plan_recording.valid or not plan_recording.calls:
+            return
+        key = normalize_request(user_request)
+        sequence = json.dumps(plan_recording.calls, sort_keys=True, default=str)
+        with self._lock:
+            entry = self._plans.get(key)
+            if entry is None or time.time() - entry["validated_at"] > self.ttl:
+                entry = {"sequences": {}, "agent_ms": [], "validated_at": 0.0}
+            entry["sequences"][sequence] = entry["sequences"].get(sequence, 0) + 1
+            entry["agent_ms"] = (entry["agent_ms"] + [agent_ms])[-10:]
+            entry["validated_at"] = time.time()
+            self._plans[key] = entry
+            self.stats["recorded"] += 1
+            if len(self._plans) > MAX_PLANS:
+                oldest = min(self._plans, key=lambda k: self._plans[k]["validated_at"])
+                del self._plans[oldest]
+
+    def lookup(self, user_request):
+        """Tool calls to replay, or None when no plan is fresh and confident enough"""
+        key = normalize_request(user_request)
+        with self._lock:
+            entry = self._plans.get(key)
+            plan = None
+            if entry and time.time() - entry["validated_at"] <= self.ttl:
+                observations = sum(entry["sequences"].values())
+                sequence, count = max(entry["sequences"].items(), key=lambda item: item[1])
+                if observations >= self.min_observations and count / observations >= self.min_confidence:
+                    plan = json.loads(sequence)
+            self.stats["hits" if plan else "misses"] += 1
+            return plan
+
+    def invalidate(self, user_request):
+        with self._lock:
+            self._plans.pop(normalize_request(user_request), None)
+            self.stats["replay_failures"] += 1
+
+    def record_saving(self, user_request, replay_ms):
+        """Credit the replay with the agent's average latency for this request"""
+        with self._lock:
+            entry = self._plans.get(normalize_request(user_request))
+            if not entry or not entry["agent_ms"]:
+                return 0.0
+            saved = max(0.0, sum(entry["agent_ms"]) / len(entry["agent_ms"]) - replay_ms)
+            self.stats["saved_ms"] += saved
+            return saved
+
+    def get_stats(self):
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                **self.stats,
+                "saved_ms": round(self.stats["saved_ms"], 1),
+                "plans": len(self._plans),
+                "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0
+            }
+
+def replay_plan(plan, tools_by_name):
+    """Run a plan's tool calls in parallel; returns parsed results in plan order
+
+    Raises if a tool is unknown or any call does not succeed, so the caller
+    can fall back to the agent.
+    """
+    def run(call):
+        tool_name, args = call
+        result = json.loads(tools_by_name[tool_name](**args))
+        if not result.get("success"):
+            raise RuntimeError(f"{tool_name} failed during replay: {result.get('error')}")
+        return result
+
+    with ThreadPoolExecutor(max_workers=min(MAX_REPLAY_WORKERS, len(plan))) as executor:
+        return list(executor.map(run, plan))
+
+_plan_cache = None
+
+def get_plan_cache():
+    """Get or create the process-wide plan cache"""
+    global _plan_cache
+    if _plan_cache is None:
+        _plan_cache = PlanCache()
+    return _plan_cache
+
+def get_plan_cache_stats():
+    """Plan hit rate and latency saved by replays"""
+    return get_plan_cache().get_stats()
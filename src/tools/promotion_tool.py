@@ -1,10 +1,30 @@
 import json
-import boto3
 import os
+import time
+import random
+import threading
 from decimal import Decimal
 from datetime import datetime
-from functools import lru_cache
 from strands.tools import tool
+from utils.aws_clients import get_resource
+from tools.offer_decisioning_tool import invalidate_offer_index
+
+# DynamoDB BatchWriteItem / BatchGetItem request limits
+BATCH_WRITE_SIZE = 25
+BATCH_GET_SIZE = 100
+MAX_BATCH_RETRIES = 8
+TRANSACT_MAX_ITEMS = 100  # TransactWriteItems limit - two actions per keyed promotion
+
+# Idempotency keys only need to outlive client retries of one submission
+IDEMPOTENCY_TTL_SECONDS = int(os.environ.get('PROMOTION_IDEMPOTENCY_TTL_SECONDS', str(24 * 3600)))
+UNENFORCED_KEY_WARNING = ("PROMOTION_IDEMPOTENCY_TABLE is not configured - the idempotency key was stored "
+                          "but not enforced, so a retry may create a duplicate promotion")
+
+# Crockford base32 alphabet used for ULID-style ids
+_ULID_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_id_lock = threading.Lock()
+_last_id_timestamp = 0
+_last_id_randomness = 0
 
 class DecimalEncoder(json.JSONEncoder):
     def default(self, obj):
@@ -12,53 +32,298 @@ class DecimalEncoder(json.JSONEncoder):
             return float(obj)
         return super(DecimalEncoder, self).default(obj)
 
-@lru_cache(maxsize=1)
 def get_dynamodb_resource():
-    """Cached DynamoDB resource"""
-    return boto3.resource('dynamodb')
+    """Shared DynamoDB resource"""
+    return get_resource('dynamodb')
+
+def _encode_base32(value: int, length: int) -> str:
+    """Encode an integer as fixed-width Crockford base32"""
+    chars = []
+    for _ in range(length):
+        chars.append(_ULID_ALPHABET[value & 0x1F])
+        value >>= 5
+    return ''.join(reversed(chars))
+
+def generate_promotion_id() -> str:
+    """Generate a time-ordered, collision-free promotion id (ULID-style)
+
+    48 bits of millisecond timestamp followed by 80 random bits, so ids
+    sort by creation time and never collide within the same second.
+    Ids generated in the same millisecond are made monotonic.
+    """
+    global _last_id_timestamp, _last_id_randomness
+    with _id_lock:
+        timestamp_ms = int(time.time() * 1000)
+        if timestamp_ms <= _last_id_timestamp:
+            # Same millisecond - increment randomness so ids stay strictly ordered
+            timestamp_ms = _last_id_timestamp
+            randomness = (_last_id_randomness + 1) & ((1 << 80) - 1)
+        else:
+            randomness = int.from_bytes(os.urandom(10), 'big')
+        _last_id_timestamp, _last_id_randomness = timestamp_ms, randomness
+    return f"promo-{_encode_base32(timestamp_ms, 10)}{_encode_base32(randomness, 16)}"
+
+def _build_promotion_item(name, description, discount_percent, target_segment="all", idempotency_key=None):
+    """Build a promotion item with the standard attribute set"""
+    # Determine promotion type based on segment
+    promo_type = "batch" if target_segment != "all" else "realtime"
+    if isinstance(discount_percent, float):
+        discount_percent = Decimal(str(discount_percent))  # boto3 rejects floats
+
+    item = {
+        'id': generate_promotion_id(),
+        'name': name,
+        'description': description,
+        'discount_percent': discount_percent,
+        'target_segment': target_segment,
+        'type': promo_type,
+        'status': 'active',
+        'created_date': datetime.now().isoformat()
+    }
+    if idempotency_key:
+        item['idempotency_key'] = idempotency_key
+    return item
+
+def _backoff(attempt: int):
+    """Exponential backoff with full jitter for DynamoDB batch retries"""
+    time.sleep(random.uniform(0, min(2.0, 0.05 * (2 ** attempt))))
+
+def _batch_write_items(table_name: str, items: list) -> list:
+    """Write items in BatchWriteItem chunks of 25, retrying UnprocessedItems
+
+    Returns the ids of items that could not be written after all retries.
+    """
+    dynamodb = get_dynamodb_resource()
+    failed_ids = []
+
+    for start in range(0, len(items), BATCH_WRITE_SIZE):
+        request = {table_name: [{'PutRequest': {'Item': item}} for item in items[start:start + BATCH_WRITE_SIZE]]}
+        attempt = 0
+        while request:
+            response = dynamodb.batch_write_item(RequestItems=request)
+            request = response.get('UnprocessedItems') or {}
+            if request:
+                attempt += 1
+                if attempt > MAX_BATCH_RETRIES:
+                    failed_ids.extend(r['PutRequest']['Item']['id'] for r in request.get(table_name, []))
+                    break
+                _backoff(attempt)
+
+    return failed_ids
+
+def _idempotency_table_name():
+    """Table holding idempotency key -> promotion id records (None disables deduplication)"""
+    return os.environ.get('PROMOTION_IDEMPOTENCY_TABLE')
+
+def _idempotency_record(idempotency_key: str, promotion_id: str) -> dict:
+    return {
+        'idempotency_key': idempotency_key,
+        'promotion_id': promotion_id,
+        'expires_at': int(time.time()) + IDEMPOTENCY_TTL_SECONDS
+    }
+
+def _keyed_write_actions(promotions_table: str, idempotency_table: str, item: dict) -> list:
+    """Claim the idempotency key and write the promotion in one transaction
+
+    The key record is conditional, so a retried submission fails the whole
+    transaction instead of creating a second promotion with a new id.
+    """
+    return [
+        {'Put': {
+            'TableName': idempotency_table,
+            'Item': _idempotency_record(item['idempotency_key'], item['id']),
+            'ConditionExpression': 'attribute_not_exists(idempotency_key)'
+        }},
+        {'Put': {'TableName': promotions_table, 'Item': item}}
+    ]
+
+def _get_idempotency_records(idempotency_table: str, keys: list) -> dict:
+    """Promotion ids already recorded for idempotency keys"""
+    dynamodb = get_dynamodb_resource()
+    recorded = {}
+
+    for start in range(0, len(keys), BATCH_GET_SIZE):
+        request = {idempotency_table: {'Keys': [{'idempotency_key': key} for key in keys[start:start + BATCH_GET_SIZE]]}}
+        attempt = 0
+        while request:
+            response = dynamodb.batch_get_item(RequestItems=request)
+            for record in response.get('Responses', {}).get(idempotency_table, []):
+                recorded[record['idempotency_key']] = record['promotion_id']
+            request = response.get('UnprocessedKeys') or {}
+            if request:
+                attempt += 1
+                if attempt > MAX_BATCH_RETRIES:
+                    raise RuntimeError("BatchGetItem retries exhausted")
+                _backoff(attempt)
+
+    return recorded
+
+def _is_key_conflict(error) -> bool:
+    """True when a transaction was cancelled only because an idempotency key already exists"""
+    reasons = error.response.get('CancellationReasons', [])
+    codes = {reason.get('Code') for reason in reasons if reason.get('Code') not in (None, 'None')}
+    return codes == {'ConditionalCheckFailed'}
+
+def _transact_keyed_items(table_name: str, idempotency_table: str, items: list) -> tuple:
+    """Write keyed promotions in transactions of 50 (key record + promotion each)
+
+    Returns (created ids, original ids of keys claimed concurrently, failed ids).
+    """
+    client = get_dynamodb_resource().meta.client
+    per_transaction = TRANSACT_MAX_ITEMS // 2
+    created_ids, conflicting_keys, failed_ids = [], [], []
+
+    for start in range(0, len(items), per_transaction):
+        chunk = items[start:start + per_transaction]
+        actions = [action for item in chunk for action in _keyed_write_actions(table_name, idempotency_table, item)]
+        try:
+            client.transact_write_items(TransactItems=actions)
+            created_ids.extend(item['id'] for item in chunk)
+            continue
+        except client.exceptions.TransactionCanceledException as e:
+            if not _is_key_conflict(e):
+                failed_ids.extend(item['id'] for item in chunk)
+                continue
+
+        # A concurrent retry claimed some of these keys - write the rest one at a time
+        for item in chunk:
+            try:
+                client.transact_write_items(TransactItems=_keyed_write_actions(table_name, idempotency_table, item))
+                created_ids.append(item['id'])
+            except client.exceptions.TransactionCanceledException as e:
+                if _is_key_conflict(e):
+                    conflicting_keys.append(item['idempotency_key'])
+                else:
+                    failed_ids.append(item['id'])
+
+    raced = _get_idempotency_records(idempotency_table, conflicting_keys) if conflicting_keys else {}
+    return created_ids, list(raced.values()), failed_ids
 
 @tool
-def create_promotion(name: str, description: str, discount_percent: int, target_segment: str = "all") -> str:
+def create_promotion(name: str, description: str, discount_percent: int, target_segment: str = "all", idempotency_key: str = None) -> str:
     """
     Create a new promotion in the database
-    
+
     Args:
         name: Promotion name (e.g., "VIP Summer Sale")
         description: Promotion description (e.g., "20% off for VIP customers")
         discount_percent: Discount percentage (e.g., 20)
         target_segment: Customer segment (e.g., "VIP", "Premium", "all")
-        
+        idempotency_key: Optional key; retries with the same key return the original promotion
+
     Returns:
         JSON string with creation result
     """
     try:
         dynamodb = get_dynamodb_resource()
-        table = dynamodb.Table(os.environ['PROMOTIONS_TABLE'])
-        
-        promotion_id = f"promo-{datetime.now().strftime('%Y%m%d%H%M%S')}"
-        
-        # Determine promotion type based on segment
-        promo_type = "batch" if target_segment != "all" else "realtime"
-        
-        item = {
-            'id': promotion_id,
-            'name': name,
-            'description': description,
-            'discount_percent': discount_percent,
-            'target_segment': target_segment,
-            'type': promo_type,
-            'status': 'active',
-            'created_date': datetime.now().isoformat()
-        }
-        
-        table.put_item(Item=item)
-        
+        table_name = os.environ['PROMOTIONS_TABLE']
+        idempotency_table = _idempotency_table_name() if idempotency_key else None
+        item = _build_promotion_item(name, description, discount_percent, target_segment, idempotency_key)
+
+        if not idempotency_table:
+            dynamodb.Table(table_name).put_item(Item=item)
+            invalidate_offer_index()
+            result = {
+                "success": True,
+                "promotion_id": item['id'],
+                "created": item
+            }
+            if idempotency_key:
+                result["warning"] = UNENFORCED_KEY_WARNING
+            return json.dumps(result, cls=DecimalEncoder)
+
+        client = dynamodb.meta.client
+        try:
+            client.transact_write_items(TransactItems=_keyed_write_actions(table_name, idempotency_table, item))
+        except client.exceptions.TransactionCanceledException as e:
+            if not _is_key_conflict(e):
+                raise
+            # Same submission already created a promotion - return the original
+            promotion_id = _get_idempotency_records(idempotency_table, [idempotency_key])[idempotency_key]
+            existing = dynamodb.Table(table_name).get_item(Key={'id': promotion_id}).get('Item')
+            return json.dumps({
+                "success": True,
+                "promotion_id": promotion_id,
+                "duplicate": True,
+                "created": existing
+            }, cls=DecimalEncoder)
+
+        invalidate_offer_index()
         return json.dumps({
             "success": True,
-            "promotion_id": promotion_id,
+            "promotion_id": item['id'],
             "created": item
         }, cls=DecimalEncoder)
-        
+
+    except Exception as e:
+        return json.dumps({
+            "success": False,
+            "error": str(e)
+        })
+
+@tool
+def create_promotions_bulk(promotions: list, idempotency_key: str = None) -> str:
+    """
+    Create many promotions at once (e.g., one per target segment)
+
+    Args:
+        promotions: List of dicts with name, description, discount_percent, target_segment
+                    and an optional per-promotion idempotency_key
+        idempotency_key: Optional batch key; promotion i gets the key "<key>:<i>"
+
+    Returns:
+        JSON string with created, duplicate and failed promotion ids
+    """
+    try:
+        table_name = os.environ['PROMOTIONS_TABLE']
+        idempotency_table = _idempotency_table_name()
+
+        items = []
+        for index, promo in enumerate(promotions):
+            item_key = promo.get('idempotency_key') or (f"{idempotency_key}:{index}" if idempotency_key else None)
+            items.append(_build_promotion_item(
+                promo['name'],
+                promo.get('description', ''),
+                promo['discount_percent'],
+                promo.get('target_segment', 'all'),
+                item_key
+            ))
+
+        # Without an idempotency table keys are stored on the item but not enforced
+        is_keyed = lambda item: bool(idempotency_table) and 'idempotency_key' in item
+        keyed = [item for item in items if is_keyed(item)]
+        unkeyed = [item for item in items if not is_keyed(item)]
+
+        # Skip keys an earlier submission already claimed; collapse repeated keys within one request
+        recorded = _get_idempotency_records(idempotency_table, list({item['idempotency_key'] for item in keyed})) if keyed else {}
+        duplicate_ids = list(dict.fromkeys(recorded.values()))
+        to_transact = {}
+        for item in keyed:
+            if item['idempotency_key'] not in recorded:
+                to_transact.setdefault(item['idempotency_key'], item)
+
+        created_ids, raced_ids, failed_ids = _transact_keyed_items(table_name, idempotency_table, list(to_transact.values()))
+        duplicate_ids.extend(pid for pid in raced_ids if pid not in duplicate_ids)
+
+        unkeyed_failed = _batch_write_items(table_name, unkeyed)
+        failed = set(unkeyed_failed)
+        created_ids.extend(item['id'] for item in unkeyed if item['id'] not in failed)
+        failed_ids.extend(unkeyed_failed)
+        if created_ids:
+            invalidate_offer_index()
+
+        result = {
+            "success": not failed_ids,
+            "requested": len(items),
+            "created_count": len(created_ids),
+            "created_ids": created_ids,
+            "duplicate_ids": duplicate_ids,
+            "failed_ids": failed_ids
+        }
+        if not idempotency_table and any('idempotency_key' in item for item in items):
+            result["warning"] = UNENFORCED_KEY_WARNING
+        return json.dumps(result, cls=DecimalEncoder)
+
     except Exception as e:
         return json.dumps({
             "success": False,
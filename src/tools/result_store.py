@@ -0,0 +1,203 @@
+"""Session-scoped result store - data tools register full datasets and pass compact handles between agents
+
+Handles outlive the request that created them so follow-up questions can
+reuse earlier results: entries stay in memory while the container is warm
+and are persisted to the datasets bucket under results/<session>/ (expired
+by a bucket lifecycle rule), so another container serving the same
+connection can load them. The S3 puts run on worker threads while the
+agents keep working, and end_request waits for them before the
+invocation returns (Lambda freezes threads once the handler returns).
+"""
+
+import os
+import re
+import uuid
+import json
+import threading
+from decimal import Decimal
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from botocore.exceptions import ClientError
+from utils.tabular_encoder import encode_table
+from utils.aws_clients import get_client
+
+SAMPLE_ROWS = 3                   # Rows included in a handle summary
+MAX_CACHED_RESULTS = 64           # Results kept in memory across sessions (LRU); older ones reload from S3
+HANDLE_PATTERN = re.compile(r"^res-[0-9a-f]{12}$")
+RESULT_PREFIX = "results/"
+PERSIST_WORKERS = 4               # Concurrent S3 puts of registered results
+PERSIST_FLUSH_SECONDS = 10        # How long the end of a request waits for outstanding puts
+
+class DecimalEncoder(json.JSONEncoder):
+    def default(self, obj):
+        if isinstance(obj, Decimal):
+            return float(obj)
+        return super(DecimalEncoder, self).default(obj)
+
+def get_s3_client():
+    """Shared S3 client"""
+    return get_client('s3')
+
+class ResultStore:
+    """Datasets produced for a session (WebSocket connection), addressed by handle"""
+
+    def __init__(self, bucket=None):
+        self.bucket = bucket if bucket is not None else os.environ.get('DATASETS_BUCKET')
+        self.session_id = None
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+        self._persisting = set()
+        self._executor = None
+
+    def _key(self, session_id, handle):
+        return f"{RESULT_PREFIX}{session_id}/{handle}.json"
+
+    def _cache(self, handle, entry):
+        with self._lock:
+            self._results[handle] = entry
+            self._results.move_to_end(handle)
+            while len(self._results) > MAX_CACHED_RESULTS:
+                self._results.popitem(last=False)
+
+    def begin_session(self, session_id):
+        """Scope new and resolvable handles to a session"""
+        self.session_id = session_id
+
+    def register(self, data, source, **metadata):
+        """Store a dataset and return its handle summary"""
+        handle = f"res-{uuid.uuid4().hex[:12]}"
+        entry = {"data": data, "source": source, "metadata": metadata, "session_id": self.session_id}
+        self._cache(handle, entry)
+        if self.bucket and self.session_id:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=PERSIST_WORKERS, thread_name_prefix="result-persist")
+                future = self._executor.submit(self._persist, handle, entry)
+                self._persisting.add(future)
+            future.add_done_callback(self._persisted)
+        return self.summary(handle)
+
+    def _persist(self, handle, entry):
+        try:
+            body = json.dumps({k: v for k, v in entry.items() if k != "session_id"}, cls=DecimalEncoder)
+            get_s3_client().put_object(Bucket=self.bucket, Key=self._key(entry["session_id"], handle),
+                                       Body=body.encode('utf-8'), ContentType='application/json')
+        except Exception as e:
+            print(f"[RESULTS] Could not persist {handle}, it resolves in this container only: {e}")
+
+    def _persisted(self, future):
+        with self._lock:
+            self._persisting.discard(future)
+
+    def flush(self, timeout=PERSIST_FLUSH_SECONDS):
+        """Wait for outstanding S3 puts; returns how many are still running after timeout"""
+        with self._lock:
+            pending = list(self._persisting)
+        if not pending:
+            return 0
+        not_done = wait(pending, timeout=timeout).not_done
+        if not_done:
+            print(f"[RESULTS] {len(not_done)} results still persisting after {timeout}s")
+        return len(not_done)
+
+    def _entry(self, handle):
+        with self._lock:
+            entry = self._results.get(handle)
+            if entry is not None and entry["session_id"] == self.session_id:
+                self._results.move_to_end(handle)
+                return entry
+        if not (self.bucket and self.session_id):
+            return None
+        try:
+            body = get_s3_client().get_object(Bucket=self.bucket, Key=self._key(self.session_id, handle))['Body'].read()
+        except ClientError:
+            return None
+        entry = {**json.loads(body), "session_id": self.session_id}
+        self._cache(handle, entry)
+        return entry
+
+    def get(self, handle):
+        entry = self._entry(handle)
+        if entry is None:
+            raise KeyError(f"Unknown or expired result handle: {handle} - re-run the data request")
+        return entry["data"]
+
+    def discard(self, handles):
+        """Forget handles that were never surfaced (persisted copies expire with the bucket lifecycle)"""
+        with self._lock:
+            for handle in handles:
+                self._results.pop(handle, None)
+
+    def handles(self):
+        """Handles of the current session held in memory, oldest first"""
+        with self._lock:
+            return [h for h, entry in self._results.items() if entry["session_id"] == self.session_id]
+
+    def summary(self, handle):
+        """Row count, columns and a few sample rows (tabular-encoded) - what an LLM needs to reason about the data"""
+        entry = self._entry(handle)
+        data = entry["data"]
+        rows = data if isinstance(data, list) else [data]
+        columns = []
+        for row in rows[:50]:
+            if isinstance(row, dict):
+                columns.extend(k for k in row if k not in columns)
+        return {
+            "handle": handle,
+            "source": entry["source"],
+            "row_count": len(rows),
+            "columns": columns,
+            "sample": encode_table([r for r in rows[:SAMPLE_ROWS] if isinstance(r, dict)], dictionary=False),
+            **entry["metadata"]
+        }
+
+    def clear(self):
+        with self._lock:
+            self._results.clear()
+
+_result_store = ResultStore()
+
+def get_result_store():
+    """Result store for the session being served"""
+    return _result_store
+
+def begin_request(session_id):
+    """Scope handles to the session (connection) of this invocation; earlier handles stay resolvable"""
+    _result_store.begin_session(session_id)
+
+def end_request():
+    """Finish persisting the results registered during this invocation"""
+    _result_store.flush()
+
+def is_handle(value):
+    return isinstance(value, str) and bool(HANDLE_PATTERN.match(value.strip()))
+
+def _resolve(value, store):
+    if is_handle(value):
+        return store.get(value.strip())
+    if isinstance(value, dict):
+        # A handle summary passed back verbatim stands for its dataset
+        if is_handle(value.get("handle")):
+            return store.get(value["handle"].strip())
+        return {k: _resolve(v, store) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_resolve(v, store) for v in value]
+    return value
+
+def resolve_handles(raw_data):
+    """Replace result handles in tool input with their datasets
+
+    Accepts a bare handle, a handle summary, or JSON (string or object)
+    with handles anywhere inside. Input without handles is returned as is.
+    """
+    store = get_result_store()
+    if isinstance(raw_data, str):
+        if is_handle(raw_data):
+            return store.get(raw_data.strip())
+        if "res-" not in raw_data:
+            return raw_data
+        try:
+            raw_data = json.loads(raw_data)
+        except ValueError:
+            return raw_data
+    return _resolve(raw_data, store)
@@ -1,9 +1,8 @@
 import json
-import boto3
 from decimal import Decimal
-from functools import lru_cache
 from strands.tools import tool
 from config.data_sources import get_aurora_config, get_data_sources
+from utils.aws_clients import get_resource
 
 class DecimalEncoder(json.JSONEncoder):
     def default(self, obj):
@@ -11,10 +10,9 @@ class DecimalEncoder(json.JSONEncoder):
             return float(obj)
         return super(DecimalEncoder, self).default(obj)
 
-@lru_cache(maxsize=1)
 def get_dynamodb_resource():
-    """Cached DynamoDB resource for operational data"""
-    return boto3.resource('dynamodb')
+    """Shared DynamoDB resource for operational data"""
+    return get_resource('dynamodb')
 
 @tool
 def analyze_customer_segments(criteria: str = "all", segment_type: str = "overview") -> str:
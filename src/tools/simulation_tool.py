@@ -0,0 +1,281 @@
+"""Vectorized promotion what-if simulator"""
+
+import json
+import numpy as np
+from decimal import Decimal
+from strands.tools import tool
+from config.data_sources import get_data_agent_metadata
+from tools.result_store import resolve_handles
+from tools.columnar_snapshot import load_snapshot
+from tools.analytical_cache import parallel_aurora_fetch
+from utils.aws_clients import get_client
+
+# MODEL PARAMETERS - heuristic response model, tune against campaign results
+BASE_LOGIT = -2.0               # Purchase propensity intercept (~12% with no history)
+FREQUENCY_WEIGHT = 0.6          # Weight on log(1 + order count)
+CHURN_WEIGHT = 2.5              # Churn probability suppresses propensity
+DISCOUNT_WEIGHT = 0.9           # Logit lift per 10 discount points
+DEFAULT_GROSS_MARGIN = 0.40     # Gross margin before discount
+DEFAULT_DISCOUNT_LEVELS = [5, 10, 15, 20, 25]
+
+# Discount sensitivity by segment (multiplies DISCOUNT_WEIGHT)
+SEGMENT_ELASTICITY = {
+    "PRICE_SENSITIVE": 1.6,
+    "AT_RISK": 1.3,
+    "DORMANT": 1.2,
+    "NEW_CUSTOMER": 1.1,
+    "VIP": 0.6,
+    "VIP_HIGH_VALUE": 0.6,
+    "BUSINESS_PROFESSIONAL": 0.7
+}
+
+class DecimalEncoder(json.JSONEncoder):
+    def default(self, obj):
+        if isinstance(obj, Decimal):
+            return float(obj)
+        if isinstance(obj, np.generic):
+            return obj.item()
+        return super(DecimalEncoder, self).default(obj)
+
+def get_rds_data_client():
+    """Shared RDS Data API client"""
+    return get_client('rds-data')
+
+class CustomerFeatures:
+    """Column arrays describing the customer base, one entry per customer"""
+
+    def __init__(self, customer_ids, spend, frequency, churn_probability, segment_codes, segment_labels):
+        self.customer_ids = customer_ids
+        self.spend = np.asarray(spend, dtype=np.float64)
+        self.frequency = np.asarray(frequency, dtype=np.float64)
+        self.churn_probability = np.asarray(churn_probability, dtype=np.float64)
+        self.segment_codes = np.asarray(segment_codes, dtype=np.int32)
+        self.segment_labels = list(segment_labels)
+
+    def __len__(self):
+        return len(self.spend)
+
+    @classmethod
+    def from_records(cls, records):
+        """Vectorize customer dicts (DynamoDB items, merged Aurora rows, Data Agent output)"""
+        labels = {}
+        ids, spend, frequency, churn, codes = [], [], [], [], []
+        for record in records:
+            segment = record.get('segment_id') or record.get('segment') or 'Unknown'
+            ids.append(record.get('id') or record.get('customer_id'))
+            spend.append(_to_float(record.get('total_spent')))
+            frequency.append(_to_float(record.get('total_orders', record.get('order_count')), 1.0))
+            churn.append(_to_float(record.get('churn_probability', record.get('churn_risk')), 0.0))
+            codes.append(labels.setdefault(segment, len(labels)))
+        return cls(ids, spend, frequency, churn, codes, labels.keys())
+
+    def subset(self, mask):
+        ids = [cid for cid, keep in zip(self.customer_ids, mask) if keep]
+        return CustomerFeatures(ids, self.spend[mask], self.frequency[mask], self.churn_probability[mask],
+                                self.segment_codes[mask], self.segment_labels)
+
+def _to_float(value, default=0.0):
+    if value is None or value == "":
+        return default
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return default
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+def simulate(features, discount_levels, gross_margin=DEFAULT_GROSS_MARGIN, segment_elasticity=None):
+    """Estimate per-customer redemption, revenue and margin for every discount level
+
+    All customers x all discount levels are evaluated as one (D, N) array
+    operation; nothing loops per customer.
+    """
+    elasticity_map = {**SEGMENT_ELASTICITY, **(segment_elasticity or {})}
+    elasticity = np.array([elasticity_map.get(label, 1.0) for label in features.segment_labels])[features.segment_codes]
+
+    discounts = np.asarray(discount_levels, dtype=np.float64)[:, None] / 100.0           # (D, 1)
+    order_value = features.spend / np.maximum(features.frequency, 1.0)                     # (N,)
+    base_logit = BASE_LOGIT + FREQUENCY_WEIGHT * np.log1p(features.frequency) - CHURN_WEIGHT * features.churn_probability
+
+    baseline = _sigmoid(base_logit)                                                       # (N,)
+    redemption = _sigmoid(base_logit + DISCOUNT_WEIGHT * elasticity * discounts * 10.0)   # (D, N)
+
+    revenue = redemption * order_value * (1.0 - discounts)
+    incremental_revenue = revenue - baseline * order_value
+    discount_cost = redemption * order_value * discounts
+    margin_impact = redemption * order_value * (gross_margin - discounts) - baseline * order_value * gross_margin
+
+    return {
+        "discounts": discounts[:, 0] * 100.0,
+        "baseline": baseline,
+        "redemption": redemption,
+        "incremental_revenue": incremental_revenue,
+        "discount_cost": discount_cost,
+        "margin_impact": margin_impact
+    }
+
+def aggregate_by_segment(features, results):
+    """Sum per-customer results into (discount level, segment) totals with one bincount per metric"""
+    num_levels = len(results["discounts"])
+    num_segments = len(features.segment_labels)
+    bins = (features.segment_codes[None, :] + np.arange(num_levels)[:, None] * num_segments).ravel()
+    size = num_levels * num_segments
+
+    def totals(metric):
+        return np.bincount(bins, weights=results[metric].ravel(), minlength=size).reshape(num_levels, num_segments)
+
+    counts = np.bincount(features.segment_codes, minlength=num_segments)
+    redemptions = totals("redemption")
+    revenue = totals("incremental_revenue")
+    cost = totals("discount_cost")
+    margin = totals("margin_impact")
+
+    scenarios = []
+    for d, discount in enumerate(results["discounts"]):
+        segments = {
+            label: {
+                "customers": int(counts[s]),
+                "expected_redemptions": round(float(redemptions[d, s]), 2),
+                "redemption_rate": round(float(redemptions[d, s] / counts[s]), 4) if counts[s] else 0.0,
+                "incremental_revenue": round(float(revenue[d, s]), 2),
+                "discount_cost": round(float(cost[d, s]), 2),
+                "margin_impact": round(float(margin[d, s]), 2)
+            }
+            for s, label in enumerate(features.segment_labels) if counts[s]
+        }
+        scenarios.append({
+            "discount_percent": float(discount),
+            "expected_redemptions": round(float(redemptions[d].sum()), 2),
+            "incremental_revenue": round(float(revenue[d].sum()), 2),
+            "discount_cost": round(float(cost[d].sum()), 2),
+            "margin_impact": round(float(margin[d].sum()), 2),
+            "segments": segments
+        })
+    return scenarios
+
+def _load_aurora_metrics():
+    """(customer_ids, total_orders, churn_probability) arrays from Aurora customer_metrics
+
+    Read in keyset pages so the result never hits the Data API's 1 MB limit;
+    missing values come back as NaN.
+    """
+    aurora = get_data_agent_metadata()["connection_info"]["aurora"]
+    rows = parallel_aurora_fetch(get_rds_data_client(), aurora, "customer_metrics",
+                                 ["customer_id", "total_orders", "churn_probability"])
+    customer_ids = np.array([row["customer_id"] for row in rows], dtype=str)
+    orders = np.array([_to_float(row["total_orders"], np.nan) for row in rows], dtype=np.float64)
+    churn = np.array([_to_float(row["churn_probability"], np.nan) for row in rows], dtype=np.float64)
+    return customer_ids, orders, churn
+
+def _match_ids(vocabulary, customer_ids):
+    """Position of each customer_id in the (unsorted) id vocabulary, -1 when absent"""
+    if not len(vocabulary) or not len(customer_ids):
+        return np.full(len(customer_ids), -1, dtype=np.int64)
+    order = np.argsort(vocabulary)
+    slots = np.minimum(np.searchsorted(vocabulary, customer_ids, sorter=order), len(vocabulary) - 1)
+    positions = order[slots]
+    return np.where(vocabulary[positions] == customer_ids, positions, -1)
+
+def _load_customer_features():
+    """Customer features from the memory-mapped customers snapshot merged with Aurora customer_metrics
+
+    Returns the features, each customer's display segment and a warning when
+    the Aurora metrics could not be loaded (the simulation then uses default
+    frequency and churn).
+    """
+    snapshot = load_snapshot("customers")
+    id_codes = snapshot.column("id")
+    ids = snapshot.strings("id")
+
+    # segment_id dictionary codes are used as-is; missing segments get a trailing "Unknown" code
+    labels = snapshot.vocabulary("segment_id") + ["Unknown"]
+    codes = np.where(snapshot.column("segment_id") < 0, len(labels) - 1, snapshot.column("segment_id"))
+
+    frequency = np.ones(len(ids))
+    churn = np.zeros(len(ids))
+    warning = None
+    try:
+        metric_ids, orders, churn_probability = _load_aurora_metrics()
+        # Metrics are scattered onto the id vocabulary, then gathered per customer by dictionary code
+        vocabulary = np.array(snapshot.vocabulary("id"), dtype=str)
+        positions = _match_ids(vocabulary, metric_ids)
+        found = positions >= 0
+        vocab_orders = np.full(len(vocabulary) + 1, np.nan)
+        vocab_churn = np.full(len(vocabulary) + 1, np.nan)
+        vocab_orders[positions[found]] = orders[found]
+        vocab_churn[positions[found]] = churn_probability[found]
+        # -1 (missing id) indexes the trailing NaN
+        frequency = np.nan_to_num(vocab_orders[id_codes], nan=1.0)
+        churn = np.nan_to_num(vocab_churn[id_codes], nan=0.0)
+    except Exception as e:
+        warning = f"Aurora customer_metrics unavailable, simulated with default order frequency and churn: {e}"
+        print(f"[SIMULATION] {warning}")
+
+    spend = np.nan_to_num(snapshot.column("total_spent"), nan=0.0)
+    display = snapshot.strings("segment") if "segment" in snapshot.columns else np.full(len(ids), None, dtype=object)
+    return CustomerFeatures(list(ids), spend, frequency, churn, codes, labels), display, warning
+
+def _extract_records(raw_data):
+    """Pull customer records out of a Data Agent style JSON payload"""
+    data = resolve_handles(raw_data)
+    data = json.loads(data) if isinstance(data, str) else data
+    if isinstance(data, list):
+        return data
+    for key in ('data', 'customers', 'operational_customers'):
+        if isinstance(data.get(key), list):
+            return data[key]
+    raise ValueError("raw_data does not contain a list of customer records")
+
+@tool
+def simulate_promotion(target_segment: str = "all", discount_percent: float = None, discount_levels: list = None,
+                       gross_margin: float = DEFAULT_GROSS_MARGIN, raw_data: str = None) -> str:
+    """
+    What-if simulation of a candidate promotion across discount levels
+
+    Args:
+        target_segment: Segment to target (e.g., "VIP", "AT_RISK", "all")
+        discount_percent: Single discount to evaluate (e.g., 20)
+        discount_levels: Several discounts to sweep in one call (e.g., [15, 20])
+        gross_margin: Gross margin before discount (default 0.40)
+        raw_data: Optional result handle or JSON customer records; loaded from the customer tables when omitted
+
+    Returns:
+        JSON with expected redemptions, incremental revenue and margin impact per discount level and segment
+    """
+    try:
+        levels = discount_levels or ([discount_percent] if discount_percent is not None else DEFAULT_DISCOUNT_LEVELS)
+        warning = None
+        if raw_data:
+            records = _extract_records(raw_data)
+            features = CustomerFeatures.from_records(records)
+            display = np.array([r.get('segment') for r in records], dtype=object)
+        else:
+            features, display, warning = _load_customer_features()
+
+        if target_segment and target_segment != "all":
+            labels = np.array(features.segment_labels, dtype=object)
+            segment_of = labels[features.segment_codes]
+            features = features.subset((segment_of == target_segment) | (display == target_segment))
+
+        if not len(features):
+            return json.dumps({"success": False, "error": f"No customers found for segment: {target_segment}"})
+
+        scenarios = aggregate_by_segment(features, simulate(features, levels, gross_margin))
+        best = max(scenarios, key=lambda s: s["margin_impact"])
+
+        result = {
+            "success": True,
+            "analysis_type": "promotion_simulation",
+            "target_segment": target_segment,
+            "customer_count": len(features),
+            "gross_margin": gross_margin,
+            "scenarios": scenarios,
+            "recommended_discount": best["discount_percent"]
+        }
+        if warning:
+            result["warnings"] = [warning]
+        return json.dumps(result, cls=DecimalEncoder)
+
+    except Exception as e:
+        return json.dumps({"success": False, "error": str(e)})
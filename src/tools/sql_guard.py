@@ -0,0 +1,165 @@
+"""EXPLAIN-based cost guard for LLM-generated Aurora SQL - row limits, statement timeout, plan summaries"""
+
+import re
+import json
+import time
+import threading
+from collections import OrderedDict
+
+MAX_QUERY_COST = 50000            # Planner cost units; guarded queries above this are rejected
+GUARD_ROW_LIMIT = 1000            # LIMIT injected into queries that have none
+STATEMENT_TIMEOUT_MS = 5000       # Server-side cap so a runaway query cannot stall the response
+TIMEOUT_COST_THRESHOLD = 5000     # Cheaper plans run as one statement, without the timeout transaction
+VERDICT_CACHE_SECONDS = 300       # EXPLAIN verdicts are re-checked once table statistics may have moved
+VERDICT_CACHE_SIZE = 256
+
+_verdicts = OrderedDict()
+_verdicts_lock = threading.Lock()
+
+class QueryRejected(Exception):
+    """Query refused by the guard; carries the plan summary so the agent can rewrite it"""
+
+    def __init__(self, message, plan=None):
+        super().__init__(message)
+        self.plan = plan
+
+def strip_sql(sql):
+    """SQL without comments or the trailing semicolon"""
+    sql = re.sub(r"--[^\n]*", " ", sql)
+    sql = re.sub(r"/\*.*?\*/", " ", sql, flags=re.DOTALL)
+    return sql.strip().rstrip(";").strip()
+
+def _has_top_level_limit(sql):
+    """LIMIT outside any parentheses (subquery limits do not bound the result)"""
+    depth = 0
+    for token in re.findall(r"\(|\)|'(?:[^']|'')*'|\w+", sql):
+        if token == "(":
+            depth += 1
+        elif token == ")":
+            depth -= 1
+        elif depth == 0 and token.lower() in ("limit", "fetch"):
+            return True
+    return False
+
+def _walk(node, nodes):
+    nodes.append(node)
+    for child in node.get("Plans", []):
+        _walk(child, nodes)
+    return nodes
+
+def summarize_plan(explain_json):
+    """Cost, row estimate and full scans from EXPLAIN (FORMAT JSON) output"""
+    root = json.loads(explain_json)[0]["Plan"]
+    nodes = _walk(root, [])
+    return {
+        "total_cost": root.get("Total Cost"),
+        "estimated_rows": root.get("Plan Rows"),
+        "node": root.get("Node Type"),
+        "seq_scans": sorted({n["Relation Name"] for n in nodes if n.get("Node Type") == "Seq Scan" and n.get("Relation Name")}),
+        "writes": any(n.get("Node Type") == "ModifyTable" for n in nodes)
+    }
+
+def explain(rds_data, connection, sql):
+    """Plan summary for a query, planned (not executed) through the Data API"""
+    response = rds_data.execute_statement(
+        resourceArn=connection["cluster_arn"],
+        secretArn=connection["secret_arn"],
+        database=connection["database"],
+        sql=f"EXPLAIN (FORMAT JSON) {sql}"
+    )
+    return summarize_plan(response["records"][0][0]["stringValue"])
+
+def _verdict(plan, max_cost):
+    """Rejection message for a plan summary, or None when it may run"""
+    if plan["writes"]:
+        return "Only read-only SELECT queries are allowed"
+    if plan["total_cost"] and plan["total_cost"] > max_cost:
+        scans = f" (full scans: {', '.join(plan['seq_scans'])})" if plan["seq_scans"] else ""
+        return (f"Estimated cost {plan['total_cost']:.0f} exceeds {max_cost}{scans} - "
+                f"add selective filters, aggregate in SQL or use a query template")
+    return None
+
+def _checked_plan(rds_data, connection, statement, max_cost):
+    """(plan, rejection) for a bounded statement, from the verdict cache or a fresh EXPLAIN"""
+    key = (re.sub(r"\s+", " ", statement), max_cost)
+    now = time.time()
+    with _verdicts_lock:
+        cached = _verdicts.get(key)
+        if cached and cached[0] > now:
+            _verdicts.move_to_end(key)
+            return {**cached[1], "verdict_cached": True}, cached[2]
+
+    plan = explain(rds_data, connection, statement)
+    rejection = _verdict(plan, max_cost)
+    with _verdicts_lock:
+        _verdicts[key] = (now + VERDICT_CACHE_SECONDS, plan, rejection)
+        _verdicts.move_to_end(key)
+        while len(_verdicts) > VERDICT_CACHE_SIZE:
+            _verdicts.popitem(last=False)
+    return {**plan, "verdict_cached": False}, rejection
+
+def guard_query(rds_data, connection, sql, max_cost=MAX_QUERY_COST, row_limit=GUARD_ROW_LIMIT):
+    """Rewrite a query to be bounded, or reject it
+
+    Returns the SQL to run and its plan summary. Raises QueryRejected for
+    anything but a single read-only statement, or when the bounded query
+    is still estimated above max_cost. Verdicts are cached per normalized
+    statement, so a repeated query skips its EXPLAIN round trip.
+    """
+    statement = strip_sql(sql)
+    if ";" in statement:
+        raise QueryRejected("Only a single SQL statement is allowed")
+    if not re.match(r"(?is)^(select|with)\b", statement):
+        raise QueryRejected("Only read-only SELECT queries are allowed")
+
+    limit_injected = not _has_top_level_limit(statement)
+    if limit_injected:
+        statement = f"SELECT * FROM ({statement}) AS guarded LIMIT {row_limit}"
+
+    plan, rejection = _checked_plan(rds_data, connection, statement, max_cost)
+    plan["limit_injected"] = limit_injected
+    if rejection:
+        raise QueryRejected(rejection, plan)
+    return statement, plan
+
+def run_statement(rds_data, connection, timeout_ms=None, **statement):
+    """Run one statement, inside a SET LOCAL statement_timeout transaction only when timeout_ms is given
+
+    With a timeout Aurora cancels the query itself when it passes, instead of
+    the client giving up while the query keeps running server-side. That
+    costs three extra Data API round trips (begin, SET LOCAL, commit), so
+    callers only ask for it on queries that can actually run long.
+    """
+    target = {"resourceArn": connection["cluster_arn"], "secretArn": connection["secret_arn"], "database": connection["database"]}
+    if not timeout_ms:
+        return rds_data.execute_statement(**target, **statement)
+
+    transaction_id = rds_data.begin_transaction(**target)["transactionId"]
+    try:
+        rds_data.execute_statement(sql=f"SET LOCAL statement_timeout = {int(timeout_ms)}",
+                                   transactionId=transaction_id, **target)
+        response = rds_data.execute_statement(transactionId=transaction_id, **target, **statement)
+        rds_data.commit_transaction(resourceArn=connection["cluster_arn"], secretArn=connection["secret_arn"],
+                                    transactionId=transaction_id)
+    except Exception:
+        try:
+            rds_data.rollback_transaction(resourceArn=connection["cluster_arn"], secretArn=connection["secret_arn"],
+                                          transactionId=transaction_id)
+        except Exception as rollback_error:
+            print(f"[SQL GUARD] Rollback failed: {str(rollback_error)}")
+        raise
+    return response
+
+def execute_guarded(rds_data, connection, sql):
+    """Guard a query, then run it - under a statement timeout only when its plan is expensive
+
+    A repeated cheap query is one round trip (cached verdict, plain execute).
+    Returns (Data API response, plan summary).
+    """
+    statement, plan = guard_query(rds_data, connection, sql)
+    timeout_ms = STATEMENT_TIMEOUT_MS if (plan["total_cost"] or 0) >= TIMEOUT_COST_THRESHOLD else None
+    response = run_statement(rds_data, connection, timeout_ms=timeout_ms, sql=statement)
+
+    print(f"[SQL GUARD] cost={plan['total_cost']} rows~{plan['estimated_rows']} limit_injected={plan['limit_injected']} "
+          f"verdict_cached={plan['verdict_cached']} timeout={bool(timeout_ms)}")
+    return response, plan
@@ -0,0 +1,211 @@
+"""Parameterized Aurora query library - stable SQL text, Data API parameters, row limits and per-template latency stats"""
+
+import time
+import threading
+from botocore.config import Config
+from utils.aws_clients import get_client
+from tools.sql_guard import run_statement
+
+DEFAULT_ROW_LIMIT = 100
+MAX_ROW_LIMIT = 1000              # Hard cap regardless of the requested limit
+DEFAULT_TIMEOUT_SECONDS = 10      # Server-side statement_timeout for templates marked slow
+CLIENT_TIMEOUT_MARGIN_SECONDS = 5 # Client read timeout only backs up the server-side cancel
+
+# SQL text never changes between calls - only parameters do - so Aurora can reuse plans.
+# "slow" templates aggregate whole tables and run under a server-side statement_timeout
+# (three extra round trips); the rest are a single execute_statement.
+SQL_TEMPLATES = {
+    "customer_360": {
+        "description": "Metrics, engagement and current segment for one customer",
+        "params": {"customer_id": {"type": "string", "required": True}},
+        "max_rows": 1,
+        "sql": """
+            SELECT m.customer_id, m.total_orders, m.total_spent::float AS total_spent,
+                   m.avg_order_value::float AS avg_order_value, m.days_since_last_order,
+                   m.rfm_segment, m.lifecycle_stage, m.churn_probability::float AS churn_probability,
+                   b.email_open_rate::float AS email_open_rate, b.website_sessions_30d,
+                   b.engagement_score::float AS engagement_score,
+                   s.segment_id, s.previous_segment, s.assigned_date::text AS segment_assigned_date
+            FROM customer_metrics m
+            LEFT JOIN behavioral_analytics b ON b.customer_id = m.customer_id
+            LEFT JOIN LATERAL (
+                SELECT segment_id, previous_segment, assigned_date
+                FROM segment_assignments
+                WHERE customer_id = m.customer_id
+                ORDER BY assigned_date DESC
+                LIMIT 1
+            ) s ON TRUE
+            WHERE m.customer_id = :customer_id
+            LIMIT :limit"""
+    },
+    "rfm_distribution": {
+        "description": "Customer count, revenue and churn risk per RFM segment",
+        "params": {},
+        "max_rows": 125,
+        "slow": True,
+        "sql": """
+            SELECT rfm_segment, COUNT(*) AS customers, SUM(total_spent)::float AS revenue,
+                   AVG(avg_order_value)::float AS avg_order_value,
+                   AVG(churn_probability)::float AS avg_churn_probability
+            FROM customer_metrics
+            GROUP BY rfm_segment
+            ORDER BY customers DESC, rfm_segment
+            LIMIT :limit"""
+    },
+    "churn_by_stage": {
+        "description": "Churn risk per lifecycle stage, with customers and revenue above a risk threshold",
+        "params": {"threshold": {"type": "double", "default": 0.5}},
+        "max_rows": 20,
+        "slow": True,
+        "sql": """
+            SELECT lifecycle_stage, COUNT(*) AS customers,
+                   AVG(churn_probability)::float AS avg_churn_probability,
+                   COUNT(*) FILTER (WHERE churn_probability >= :threshold) AS at_risk_customers,
+                   COALESCE(SUM(total_spent) FILTER (WHERE churn_probability >= :threshold), 0)::float AS revenue_at_risk
+            FROM customer_metrics
+            GROUP BY lifecycle_stage
+            ORDER BY avg_churn_probability DESC
+            LIMIT :limit"""
+    },
+    "at_risk_customers": {
+        "description": "Highest-value customers above a churn risk threshold",
+        "params": {"threshold": {"type": "double", "default": 0.5}},
+        "max_rows": MAX_ROW_LIMIT,
+        "sql": """
+            SELECT customer_id, lifecycle_stage, rfm_segment, total_spent::float AS total_spent,
+                   days_since_last_order, churn_probability::float AS churn_probability
+            FROM customer_metrics
+            WHERE churn_probability >= :threshold
+            ORDER BY total_spent DESC, churn_probability DESC
+            LIMIT :limit"""
+    },
+    "segment_migrations": {
+        "description": "Customers moving between segments in the last N days, by reason",
+        "params": {"days": {"type": "long", "default": 30}},
+        "max_rows": 200,
+        "slow": True,
+        "sql": """
+            SELECT previous_segment, segment_id, migration_reason, COUNT(*) AS customers,
+                   AVG(confidence_score)::float AS avg_confidence
+            FROM segment_assignments
+            WHERE previous_segment IS NOT NULL
+              AND assigned_date >= CURRENT_DATE - CAST(:days AS INTEGER)
+            GROUP BY previous_segment, segment_id, migration_reason
+            ORDER BY customers DESC
+            LIMIT :limit"""
+    }
+}
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+def get_template_rds_client():
+    """RDS Data API client for template queries - no retries; read timeout backs up the server-side statement_timeout"""
+    return get_client('rds-data', config=Config(read_timeout=DEFAULT_TIMEOUT_SECONDS + CLIENT_TIMEOUT_MARGIN_SECONDS,
+                                                retries={"max_attempts": 1}))
+
+def _typed_value(spec, value):
+    """Data API parameter value for a declared parameter type"""
+    if spec["type"] == "long":
+        return {"longValue": int(value)}
+    if spec["type"] == "double":
+        return {"doubleValue": float(value)}
+    return {"stringValue": str(value)}
+
+def build_parameters(template_name, params=None, limit=None):
+    """Validated Data API `parameters` for a template (raises ValueError on bad input)"""
+    template = SQL_TEMPLATES.get(template_name)
+    if template is None:
+        raise ValueError(f"Unknown SQL template: {template_name} (available: {', '.join(SQL_TEMPLATES)})")
+
+    params = dict(params or {})
+    unknown = set(params) - set(template["params"])
+    if unknown:
+        raise ValueError(f"Unknown parameters for {template_name}: {', '.join(sorted(unknown))}")
+
+    parameters = []
+    for name, spec in template["params"].items():
+        if name in params and params[name] is not None:
+            value = params[name]
+        elif spec.get("required"):
+            raise ValueError(f"Missing required parameter for {template_name}: {name}")
+        else:
+            value = spec["default"]
+        try:
+            parameters.append({"name": name, "value": _typed_value(spec, value)})
+        except (TypeError, ValueError):
+            raise ValueError(f"Parameter {name} of {template_name} must be a {spec['type']}, got {value!r}")
+
+    row_limit = min(int(limit or DEFAULT_ROW_LIMIT), template["max_rows"], MAX_ROW_LIMIT)
+    parameters.append({"name": "limit", "value": {"longValue": max(1, row_limit)}})
+    return parameters
+
+def _field_value(field):
+    if field.get("isNull"):
+        return None
+    for key in ("stringValue", "longValue", "doubleValue", "booleanValue"):
+        if key in field:
+            return field[key]
+    return None
+
+def _record_latency(template_name, elapsed_ms, rows=0, error=False):
+    with _stats_lock:
+        stats = _stats.setdefault(template_name, {"calls": 0, "errors": 0, "rows": 0, "total_ms": 0.0, "max_ms": 0.0})
+        stats["calls"] += 1
+        stats["errors"] += int(error)
+        stats["rows"] += rows
+        stats["total_ms"] += elapsed_ms
+        stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+
+def run_template(template_name, params=None, limit=None, connection=None):
+    """Execute a template through the Data API and return rows keyed by column name
+
+    Args:
+        template_name: Key of SQL_TEMPLATES
+        params: Template parameters (defaults fill in the rest)
+        limit: Requested row limit, capped by the template's max_rows
+        connection: Aurora connection info (cluster_arn, secret_arn, database)
+    """
+    parameters = build_parameters(template_name, params, limit)
+    slow = SQL_TEMPLATES[template_name].get("slow", False)
+    started = time.time()
+    try:
+        response = run_statement(
+            get_template_rds_client(),
+            connection,
+            timeout_ms=DEFAULT_TIMEOUT_SECONDS * 1000 if slow else None,
+            sql=SQL_TEMPLATES[template_name]["sql"],
+            parameters=parameters,
+            includeResultMetadata=True
+        )
+    except Exception:
+        _record_latency(template_name, (time.time() - started) * 1000, error=True)
+        raise
+
+    columns = [c.get("label") or c.get("name") for c in response.get("columnMetadata", [])]
+    rows = [{columns[i]: _field_value(field) for i, field in enumerate(record)}
+            for record in response.get("records", [])]
+    elapsed_ms = (time.time() - started) * 1000
+    _record_latency(template_name, elapsed_ms, rows=len(rows))
+    print(f"[SQL TEMPLATE] {template_name}: {len(rows)} rows in {elapsed_ms:.0f}ms")
+    return rows
+
+def get_template_stats():
+    """Per-template call counts, errors and latency"""
+    with _stats_lock:
+        return {
+            name: {**stats, "total_ms": round(stats["total_ms"], 1), "max_ms": round(stats["max_ms"], 1),
+                   "avg_ms": round(stats["total_ms"] / stats["calls"], 1) if stats["calls"] else 0.0}
+            for name, stats in _stats.items()
+        }
+
+def describe_templates():
+    """Template catalogue for the Data Agent prompt"""
+    lines = []
+    for name, template in SQL_TEMPLATES.items():
+        params = ", ".join(
+            f"{p}: {spec['type']}" + (" (required)" if spec.get("required") else f" = {spec['default']}")
+            for p, spec in template["params"].items()
+        ) or "none"
+        lines.append(f"- {name}: {template['description']} [params: {params}; max rows: {template['max_rows']}]")
+    return "\n".join(lines)
@@ -1,14 +1,44 @@
 import json
+import time
+from decimal import Decimal
 from strands.agent import Agent
 from strands.tools import tool
+from tools.ui_renderer import render_component, record_render_latency, get_render_stats, parse_raw_data, infer_columns
+from tools.ui_template_cache import get_template_cache, get_template_cache_stats, fingerprint, split_rows
+from tools.data_channel import publish_dataset, INLINE_ROW_LIMIT
+from tools.result_store import resolve_handles
+from utils.tabular_encoder import encode_table
+from utils.model_factory import create_model, NOVA_PREMIER
+
+UI_METRICS_EVERY = 20             # Components between render/template cache log lines (plus the first one)
 
 _global_callback = None
+_components = 0
+
+class DecimalEncoder(json.JSONEncoder):
+    def default(self, obj):
+        if isinstance(obj, Decimal):
+            return float(obj)
+        return super(DecimalEncoder, self).default(obj)
 
 def set_global_callback(callback):
     """Set global callback handler for UI agent"""
     global _global_callback
     _global_callback = callback
 
+def _record_component(source, elapsed_ms):
+    """Record a component's render latency and periodically log every path's latency and template cache hits"""
+    global _components
+    record_render_latency(source, elapsed_ms)
+    _components += 1
+    if _components == 1 or _components % UI_METRICS_EVERY == 0:
+        stats = get_render_stats()
+        cache = get_template_cache_stats()
+        print("[UI METRICS] " + " | ".join(
+            f"{path}: n={s['count']} avg={s['avg_ms']}ms max={s['max_ms']}ms" for path, s in stats.items()
+        ) + f" | template cache: hits={cache['hits']} misses={cache['misses']} hit_rate={cache['hit_rate']} "
+            f"size={cache['size']} rejected={cache['rejected']}")
+
 @tool
 def generate_ui_component(data_type: str, raw_data: str, user_intent: str, output_format: str = "html", callback_handler=None) -> str:
     """
@@ -16,7 +46,7 @@ def generate_ui_component(data_type: str, raw_data: str, user_intent: str, outpu
     
     Args:
         data_type: Type of data (customers, promotions, orders, notification)
-        raw_data: JSON string of the actual data
+        raw_data: Result handle from process_data_request, or JSON string of the actual data
         user_intent: What user wants to do (list, create, edit, confirm)
         output_format: "html" for ready-to-use HTML
         
@@ -24,9 +54,37 @@ def generate_ui_component(data_type: str, raw_data: str, user_intent: str, outpu
         HTML string
     """
     try:
+        started = time.perf_counter()
+        data = parse_raw_data(resolve_handles(raw_data))
+
+        # Large lists go to the client as a paged dataset - rows never enter a prompt or the HTML
+        rows = split_rows(data) if data is not None else None
+        if rows and len(rows) > INLINE_ROW_LIMIT:
+            component = publish_dataset(rows, infer_columns(rows), (data_type or "results").replace("_", " ").title())
+            print(f"[UI] Published {len(rows)} {data_type} rows as dataset {component['dataset']['id']}")
+            return json.dumps(component)
+
+        # Known shapes render deterministically - no model call (tables asking for a custom layout fall through)
+        rendered = render_component(data_type, data if data is not None else raw_data, user_intent, output_format)
+        if rendered is not None:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            _record_component("renderer", elapsed_ms)
+            print(f"[UI] Rendered {data_type} deterministically in {elapsed_ms:.2f}ms")
+            return rendered
+
+        # Same shape and intent as an earlier agent response - fill its template
+        cache_key = fingerprint(data_type, data, user_intent, output_format) if data is not None else None
+        template = get_template_cache().get(cache_key) if cache_key else None
+        if template is not None:
+            rendered = template.render(data)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            _record_component("template", elapsed_ms)
+            print(f"[UI] Filled cached {data_type} template in {elapsed_ms:.2f}ms")
+            return rendered
+
         # Create specialized UI agent with callback
         ui_agent = Agent(
-            model="us.amazon.nova-premier-v1:0",
+            model=create_model(NOVA_PREMIER, "ui_agent"),
             system_prompt = f"""
             You are a specialized UI/UX Agent - the visualization expert of the system.
 
@@ -93,13 +151,22 @@ def generate_ui_component(data_type: str, raw_data: str, user_intent: str, outpu
             callback_handler=_global_callback
         )
         
+        # Record lists go to the model as a compact table (header + delimited rows) instead of JSON
+        if rows:
+            prompt_data = f"(tabular: #dict/#const lines are legends, then header and '|' rows)\n{encode_table(rows, name=data_type)}"
+            if isinstance(data, dict):
+                fields = {k: v for k, v in data.items() if not isinstance(v, list)}
+                prompt_data = f"{json.dumps(fields, cls=DecimalEncoder)}\n{prompt_data}"
+        else:
+            prompt_data = json.dumps(data, cls=DecimalEncoder) if data is not None else raw_data
+        
         # Generate UI configuration or HTML
         prompt = f"""
         Generate UI component for:
         
         Data Type: {data_type}
         User Intent: {user_intent}
-        Raw Data: {raw_data}
+        Raw Data: {prompt_data}
         Output Format: {output_format.upper()}
         
         {"Create the best UI component configuration for this scenario." if output_format == "json" else "Generate clean, responsive HTML with Tailwind CSS for this scenario."}
@@ -110,6 +177,11 @@ def generate_ui_component(data_type: str, raw_data: str, user_intent: str, outpu
             stream=True
         )
         
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        _record_component("llm", elapsed_ms)
+        print(f"[UI] Generated {data_type} with UI agent in {elapsed_ms:.2f}ms")
+        if cache_key:
+            get_template_cache().put(cache_key, str(response), data, output_format)
         return str(response)
         
     except Exception as e:
@@ -0,0 +1,296 @@
+"""Deterministic UI component renderer - tables, forms, notifications and cards without an LLM"""
+
+import json
+import re
+import threading
+from html import escape
+from decimal import Decimal
+
+MAX_SAMPLE_ROWS = 50              # Rows inspected when inferring column types
+BADGE_MAX_CARDINALITY = 8
+BADGE_KEYS = {"segment", "segment_id", "status", "lifecycle_stage", "type", "target_segment", "rfm_segment", "priority"}
+CURRENCY_KEYS = ("spent", "amount", "revenue", "value", "price", "clv", "aov")
+PERCENT_KEYS = ("churn", "probability", "rate", "confidence")
+CREATE_INTENTS = ("create", "new", "add", "edit", "update")
+_CREATE_INTENT_RE = re.compile(r"\b(" + "|".join(CREATE_INTENTS) + r")\b")  # Whole words - "renewal" and "address" are not forms
+# Tables with a requested presentation go to the UI agent (and its template cache) instead of the plain renderer
+CUSTOM_LAYOUT_INTENTS = ("highlight", "colou?r", "chart", "visuali[sz]e", "dashboard", "compare", "group", "rank", "style", "emphasi[sz]e")
+_CUSTOM_LAYOUT_RE = re.compile(r"\b(" + "|".join(CUSTOM_LAYOUT_INTENTS) + r")")
+
+_EMAIL_RE = re.compile(r"^[^\s@]+@[^\s@]+\.[^\s@]+$")
+_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}([T ]\d{2}:\d{2}(:\d{2}(\.\d+)?)?)?")
+
+# Default form fields when the create intent has no record to start from
+DEFAULT_FORM_FIELDS = {
+    "promotions": [
+        {"name": "name", "label": "Name", "type": "text", "required": True},
+        {"name": "description", "label": "Description", "type": "textarea", "required": True},
+        {"name": "discount_percent", "label": "Discount Percent", "type": "number", "required": True, "min": 1, "max": 90},
+        {"name": "target_segment", "label": "Target Segment", "type": "text", "default": "all"}
+    ]
+}
+
+_stats_lock = threading.Lock()
+RENDER_STATS = {
+    "renderer": {"count": 0, "total_ms": 0.0, "max_ms": 0.0},
+    "template": {"count": 0, "total_ms": 0.0, "max_ms": 0.0},
+    "llm": {"count": 0, "total_ms": 0.0, "max_ms": 0.0}
+}
+
+def record_render_latency(source, elapsed_ms):
+    """Record latency for the deterministic renderer ('renderer'), a cached template ('template') or the UI agent ('llm')"""
+    with _stats_lock:
+        stats = RENDER_STATS[source]
+        stats["count"] += 1
+        stats["total_ms"] += elapsed_ms
+        stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+
+def get_render_stats():
+    """Average/max latency per rendering path, side by side"""
+    with _stats_lock:
+        return {
+            source: {
+                "count": s["count"],
+                "avg_ms": round(s["total_ms"] / s["count"], 3) if s["count"] else 0.0,
+                "max_ms": round(s["max_ms"], 3)
+            }
+            for source, s in RENDER_STATS.items()
+        }
+
+def _humanize(key):
+    return key.replace("_", " ").title()
+
+def _is_number(value):
+    return isinstance(value, (int, float, Decimal)) and not isinstance(value, bool)
+
+def infer_columns(records):
+    """Infer column keys, labels and types (text, email, badge, number, date) from the data"""
+    sample = records[:MAX_SAMPLE_ROWS]
+    keys = []
+    for record in sample:
+        for key in record:
+            if key not in keys:
+                keys.append(key)
+
+    columns = []
+    for key in keys:
+        values = [r.get(key) for r in sample if r.get(key) not in (None, "")]
+        if values and all(isinstance(v, (dict, list, set, tuple)) for v in values):
+            continue  # Nested structures don't fit a table cell
+
+        strings = [v for v in values if isinstance(v, str)]
+        if values and all(_is_number(v) for v in values):
+            col_type = "number"
+        elif strings and ("email" in key.lower() or all(_EMAIL_RE.match(v) for v in strings)):
+            col_type = "email"
+        elif strings and all(_DATE_RE.match(v) for v in strings):
+            col_type = "date"
+        elif strings and (key in BADGE_KEYS or (len(sample) > 3 and len(set(strings)) <= min(BADGE_MAX_CARDINALITY, len(sample) // 2)
+                                                and all(len(v) <= 24 for v in strings))):
+            col_type = "badge"
+        else:
+            col_type = "text"
+
+        columns.append({"key": key, "label": _humanize(key), "type": col_type, "sortable": True})
+    return columns
+
+def _format_value(column, value):
+    """Display string for a cell"""
+    if value is None or value == "":
+        return ""
+    key = column["key"].lower()
+    if column["type"] == "number":
+        number = float(value)
+        if any(k in key for k in PERCENT_KEYS) and 0 <= number <= 1:
+            return f"{number * 100:.0f}%"
+        if any(k in key for k in CURRENCY_KEYS):
+            return f"${number:,.2f}"
+        return f"{number:,.0f}" if number == int(number) else f"{number:,.2f}"
+    if column["type"] == "date":
+        return str(value)[:10]
+    if isinstance(value, (list, set, tuple)):
+        return ", ".join(str(v) for v in value)
+    return str(value)
+
+def _cell_html(column, value):
+    text = escape(_format_value(column, value))
+    if column["type"] == "email" and text:
+        return f'<a href="mailto:{text}" class="text-blue-600 hover:underline">{text}</a>'
+    if column["type"] == "badge" and text:
+        return f'<span class="inline-flex px-2 py-1 text-xs font-medium rounded-full bg-gray-100 text-gray-800">{text}</span>'
+    if column["type"] == "number":
+        return f'<span class="font-mono tabular-nums">{text}</span>'
+    return text
+
+def render_table_html(records, columns, title=None):
+    header = "".join(
+        f'<th scope="col" class="px-6 py-3 text-left text-sm font-medium text-gray-900">{escape(c["label"])}</th>'
+        for c in columns
+    )
+    rows = "".join(
+        "<tr>" + "".join(
+            f'<td class="px-6 py-4 whitespace-nowrap text-sm text-gray-900">{_cell_html(c, r.get(c["key"]))}</td>'
+            for c in columns
+        ) + "</tr>"
+        for r in records
+    )
+    caption = f'<caption class="px-6 py-3 text-left text-lg font-semibold text-gray-900">{escape(title)}</caption>' if title else ""
+    return (
+        '<div class="overflow-x-auto">'
+        f'<table class="min-w-full divide-y divide-gray-200" aria-label="{escape(title or "Data table")}">{caption}'
+        f'<thead class="bg-gray-50"><tr>{header}</tr></thead>'
+        f'<tbody class="bg-white divide-y divide-gray-200">{rows}</tbody>'
+        '</table></div>'
+    )
+
+def _form_fields(data_type, record):
+    if not record:
+        return DEFAULT_FORM_FIELDS.get(data_type, [{"name": "name", "label": "Name", "type": "text", "required": True}])
+    fields = []
+    for key, value in record.items():
+        if key in ("id", "created_date", "status") or isinstance(value, (dict, list, set, tuple)):
+            continue
+        if _is_number(value):
+            field_type = "number"
+        elif "email" in key.lower():
+            field_type = "email"
+        elif isinstance(value, str) and _DATE_RE.match(value):
+            field_type = "date"
+        elif isinstance(value, str) and len(value) > 80:
+            field_type = "textarea"
+        else:
+            field_type = "text"
+        fields.append({"name": key, "label": _humanize(key), "type": field_type, "default": value})
+    return fields
+
+def render_form_html(fields, title):
+    inputs = []
+    for f in fields:
+        default = escape(str(f.get("default", "") if f.get("default") is not None else ""))
+        required = " required" if f.get("required") else ""
+        common = f'id="{escape(f["name"])}" name="{escape(f["name"])}" class="mt-1 block w-full rounded-md border-gray-300 shadow-sm focus:border-blue-500 focus:ring-blue-500 sm:text-sm"{required}'
+        if f["type"] == "textarea":
+            control = f'<textarea {common} rows="3">{default}</textarea>'
+        else:
+            bounds = "".join(f' {b}="{f[b]}"' for b in ("min", "max") if b in f)
+            control = f'<input type="{f["type"]}" {common} value="{default}"{bounds}>'
+        inputs.append(
+            f'<div><label for="{escape(f["name"])}" class="block text-sm font-medium text-gray-700">{escape(f["label"])}</label>{control}</div>'
+        )
+    return (
+        f'<form class="space-y-4 p-4 bg-white rounded-lg shadow" aria-label="{escape(title)}">'
+        f'<h2 class="text-lg font-semibold text-gray-900">{escape(title)}</h2>'
+        + "".join(inputs) +
+        '<button type="submit" class="inline-flex justify-center rounded-md bg-blue-600 px-4 py-2 text-sm font-medium text-white hover:bg-blue-700">Submit</button>'
+        '</form>'
+    )
+
+_VARIANT_CLASSES = {
+    "success": "bg-green-100 text-green-800",
+    "error": "bg-red-100 text-red-700",
+    "warning": "bg-yellow-100 text-yellow-800",
+    "info": "bg-blue-100 text-blue-800"
+}
+
+def render_notification_html(message, variant):
+    role = "alert" if variant == "error" else "status"
+    return f'<div class="p-4 rounded {_VARIANT_CLASSES[variant]}" role="{role}">{escape(message)}</div>'
+
+def render_card_html(record, title):
+    items = "".join(
+        f'<div><dt class="text-sm font-medium text-gray-500">{escape(c["label"])}</dt>'
+        f'<dd class="mt-1 text-sm text-gray-900">{_cell_html(c, record.get(c["key"]))}</dd></div>'
+        for c in infer_columns([record])
+    )
+    return (
+        '<div class="bg-white shadow rounded-lg p-6">'
+        f'<h2 class="text-lg font-semibold text-gray-900 mb-4">{escape(title)}</h2>'
+        f'<dl class="grid grid-cols-1 gap-4 sm:grid-cols-2">{items}</dl>'
+        '</div>'
+    )
+
+def parse_raw_data(raw_data):
+    if isinstance(raw_data, (list, dict)):
+        return raw_data
+    try:
+        return json.loads(raw_data)
+    except (TypeError, ValueError):
+        return None
+
+def classify_shape(data_type, data, user_intent):
+    """Map parsed data onto a component; returns (component_type, payload) or None if unrecognised"""
+    intent = (user_intent or "").lower()
+    wants_form = bool(_CREATE_INTENT_RE.search(intent))
+
+    if isinstance(data, dict):
+        if data.get("success") is False or "error" in data:
+            return "notification", {"message": str(data.get("error", "Operation failed")), "variant": "error"}
+        if "outbox_id" in data or "message_id" in data:
+            target = data.get("sent_to") or data.get("target_segment") or "recipients"
+            return "notification", {"message": f"Email queued for {target}", "variant": "success"}
+        if "created" in data and isinstance(data["created"], dict):
+            return "card", data["created"]
+        for key in ("data", "records", "items", "customers", "promotions", "orders"):
+            if isinstance(data.get(key), list):
+                data = data[key]
+                break
+        else:
+            if data and all(not isinstance(v, (dict, list)) for v in data.values()):
+                return ("form" if wants_form else "card"), data
+            return None
+
+    if isinstance(data, list):
+        if not data:
+            return ("form", {}) if wants_form else ("notification", {"message": f"No {data_type} found", "variant": "info"})
+        if all(isinstance(r, dict) for r in data):
+            if wants_form and len(data) == 1:
+                return "form", data[0]
+            if _CUSTOM_LAYOUT_RE.search(intent):
+                return None
+            return "table", data
+    return None
+
+def render_component(data_type, raw_data, user_intent, output_format="html"):
+    """Render a component in one pass, or return None so the caller can fall back to the UI agent"""
+    data = parse_raw_data(raw_data)
+    if data is None:
+        return None
+    shape = classify_shape(data_type, data, user_intent)
+    if shape is None:
+        return None
+
+    component, payload = shape
+    title = _humanize(data_type or "Results")
+
+    if component == "table":
+        columns = infer_columns(payload)
+        if not columns:
+            return None
+        if output_format == "html":
+            return render_table_html(payload, columns, title)
+        return json.dumps({"type": "table", "title": title, "data": payload, "columns": columns,
+                           "config": {"pagination": {"enabled": len(payload) > 25, "pageSize": 25, "total": len(payload)}}},
+                          default=_json_default)
+
+    if component == "form":
+        fields = _form_fields(data_type, payload)
+        form_title = f"{'Edit' if payload else 'Create'} {title}"
+        if output_format == "html":
+            return render_form_html(fields, form_title)
+        return json.dumps({"type": "form", "title": form_title, "fields": fields}, default=_json_default)
+
+    if component == "notification":
+        if output_format == "html":
+            return render_notification_html(payload["message"], payload["variant"])
+        return json.dumps({"type": "notification", "title": title, "config": payload})
+
+    if output_format == "html":
+        return render_card_html(payload, title)
+    return json.dumps({"type": "card", "title": title, "data": [payload]}, default=_json_default)
+
+def _json_default(obj):
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, set):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
@@ -0,0 +1,292 @@
+"""Shape-fingerprinted cache of UI agent output
+
+The UI agent's markup for a data shape is turned into a parameterized
+template (cell values replaced by slots) so later requests with the same
+shape and intent are filled in directly instead of calling the model.
+"""
+
+import json
+import re
+import hashlib
+import threading
+from html import escape
+from decimal import Decimal
+from collections import OrderedDict
+
+UI_TEMPLATE_CACHE_SIZE = 128      # Max cached templates (LRU eviction)
+MAX_SCHEMA_ROWS = 50              # Rows merged when fingerprinting a record list
+MIN_VERIFIED_ROWS = 2             # Rendered rows needed to confirm the row markup does not depend on values
+ROW_KEYS = ("data", "records", "items", "customers", "promotions", "orders")
+
+_TAG_RE = re.compile(r"(<[^>]*>)")
+_SLOT = "\x00{}\x00"
+_SLOT_RE = re.compile(r"\x00(\d+)\x00")
+
+# Display formats tried when locating a value in the agent's markup
+_FORMATS = {
+    "raw": lambda v: str(v),
+    "number": lambda v: f"{float(v):,.0f}" if float(v) == int(float(v)) else f"{float(v):,.2f}",
+    "fixed2": lambda v: f"{float(v):,.2f}",
+    "currency": lambda v: f"${float(v):,.2f}",
+    "percent": lambda v: f"{float(v) * 100:.0f}%",
+    "percent1": lambda v: f"{float(v) * 100:.1f}%"
+}
+_STRING_FORMATS = ("raw",)
+_NUMBER_FORMATS = ("raw", "currency", "percent1", "percent", "fixed2", "number")
+
+def _normalize(value):
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    return value
+
+def _schema(value, top_level=False):
+    """Structural fingerprint - keys and value kinds, list lengths only below the top level"""
+    value = _normalize(value)
+    if isinstance(value, dict):
+        return {k: _schema(v) for k, v in sorted(value.items())}
+    if isinstance(value, list):
+        if value and all(isinstance(v, dict) for v in value):
+            merged = {}
+            for row in value[:MAX_SCHEMA_ROWS]:
+                for k, v in row.items():
+                    merged.setdefault(k, _schema(v))
+            rows_schema = dict(sorted(merged.items()))
+            return ["rows", rows_schema] if top_level else ["rows", len(value), rows_schema]
+        return ["list", len(value)]
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, (int, float)):
+        return "number"
+    return "null" if value is None else "str"
+
+def split_rows(data):
+    """Return the record list for row-shaped data, or None for single-record shapes"""
+    if isinstance(data, list) and data and all(isinstance(r, dict) for r in data):
+        return data
+    if isinstance(data, dict):
+        for key in ROW_KEYS:
+            rows = data.get(key)
+            if isinstance(rows, list) and rows and all(isinstance(r, dict) for r in rows):
+                if all(not isinstance(v, (dict, list)) for k, v in data.items() if k != key):
+                    return rows
+    return None
+
+def fingerprint(data_type, data, user_intent, output_format):
+    """Cache key for a data shape plus the normalized user intent"""
+    rows = split_rows(data)
+    shape = _schema(rows, top_level=True) if rows is not None else _schema(data)
+    intent = " ".join((user_intent or "").lower().split())
+    payload = json.dumps([data_type, intent, output_format, shape], sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def _leaves(value, path=""):
+    """Flatten scalar values to (path, value), skipping empties"""
+    value = _normalize(value)
+    if isinstance(value, dict):
+        for k, v in value.items():
+            yield from _leaves(v, f"{path}.{k}" if path else str(k))
+    elif isinstance(value, list):
+        for i, v in enumerate(value):
+            yield from _leaves(v, f"{path}[{i}]")
+    elif value is not None and value != "" and not isinstance(value, bool):
+        yield path, value
+
+def _lookup(data, path):
+    value = data
+    for part in re.findall(r"[^.\[\]]+|\[\d+\]", path):
+        if part.startswith("["):
+            index = int(part[1:-1])
+            value = value[index] if isinstance(value, list) and index < len(value) else None
+        else:
+            value = value.get(part) if isinstance(value, dict) else None
+        if value is None:
+            return None
+    return _normalize(value)
+
+def _text_pattern(text):
+    # \x00 excluded so slot markers already inserted are never matched
+    return re.compile(r"(?<![\w.,$\x00])" + re.escape(text) + r"(?![\w%\x00]|[.,]\d)")
+
+def _parameterize(markup, leaves):
+    """Replace each leaf's rendering in text nodes with a slot
+
+    Returns (template, slots, unmatched leaves); values equal to another
+    leaf's rendering are ambiguous and abort with None.
+    """
+    segments = _TAG_RE.split(markup)
+    slots = []
+    unmatched = []
+    rendered = {}
+    for path, value in leaves:
+        formats = _NUMBER_FORMATS if isinstance(value, (int, float)) else _STRING_FORMATS
+        for fmt in formats:
+            text = escape(_FORMATS[fmt](value))
+            if rendered.get(text, path) != path:
+                return None
+            pattern = _text_pattern(text)
+            for i in range(0, len(segments), 2):  # Text nodes sit at even indexes
+                if pattern.search(segments[i]):
+                    segments[i] = pattern.sub(_SLOT.format(len(slots)), segments[i], count=1)
+                    slots.append((path, fmt))
+                    rendered[text] = path
+                    break
+            else:
+                continue
+            break
+        else:
+            unmatched.append((path, value))
+    return "".join(segments), slots, unmatched
+
+def _has_stale_values(template, unmatched):
+    """True if the template still shows data we could not slot
+
+    Any leftover number is treated as stale (counts, totals or a value in a
+    format we don't recognise), as is an unslotted string value.
+    """
+    text = _SLOT_RE.sub(" ", " ".join(_TAG_RE.split(template)[::2]))
+    if re.search(r"\d", text):
+        return True
+    words = re.sub(r"[^a-z0-9]+", " ", text.lower())
+    for _, value in unmatched:
+        normalized = re.sub(r"[^a-z0-9]+", " ", str(value).lower()).strip()
+        if normalized and f" {normalized} " in f" {words} ":
+            return True
+    return False
+
+def _fill(template, slots, record):
+    def replace(match):
+        path, fmt = slots[int(match.group(1))]
+        value = _lookup(record, path)
+        if value is None or value == "":
+            return ""
+        try:
+            return escape(_FORMATS[fmt](value))
+        except (TypeError, ValueError):
+            return escape(str(value))
+    return _SLOT_RE.sub(replace, template)
+
+class UITemplate:
+    """A parameterized UI agent response for one data shape"""
+
+    def __init__(self, kind, parts, slots=None):
+        self.kind = kind      # "rows", "record" or "json"
+        self.parts = parts
+        self.slots = slots or []
+
+    @classmethod
+    def from_response(cls, response, data, output_format):
+        """Parameterize agent output against the data it was generated from; None if it can't be done safely"""
+        rows = split_rows(data)
+        if output_format != "html":
+            try:
+                config = json.loads(response)
+            except ValueError:
+                return None
+            if rows is None or not isinstance(config, dict) or not isinstance(config.get("data"), list):
+                return None
+            return cls("json", {k: v for k, v in config.items() if k != "data"})
+
+        if rows is None:
+            result = _parameterize(response, list(_leaves(data)))
+            if not result or not result[1] or _has_stale_values(result[0], result[2]):
+                return None
+            return cls("record", result[0], result[1])
+
+        match = re.search(r"(<tbody[^>]*>)(.*?)(</tbody>)", response, re.IGNORECASE | re.DOTALL)
+        rendered_rows = re.findall(r"<tr[^>]*>.*?</tr>", match.group(2), re.IGNORECASE | re.DOTALL) if match else []
+        if len(rendered_rows) < MIN_VERIFIED_ROWS or len(rendered_rows) > len(rows):
+            return None
+        prefix, suffix = response[:match.end(1)], response[match.start(3):]
+        if _has_stale_values(prefix + suffix, []):
+            return None  # Counts or totals outside the rows would go stale
+
+        # Every rendered row must reduce to the same skeleton - value-dependent markup
+        # (badge colours, highlighted rows) would otherwise be cloned onto every row
+        skeleton = None
+        for rendered, record in zip(rendered_rows, rows):
+            result = _parameterize(rendered, list(_leaves(record)))
+            if not result or not result[1] or _has_stale_values(result[0], result[2]):
+                return None
+            if skeleton is None:
+                skeleton = result
+            elif (result[0], result[1]) != (skeleton[0], skeleton[1]):
+                return None
+        return cls("rows", (prefix, skeleton[0], suffix), skeleton[1])
+
+    def render(self, data):
+        if self.kind == "json":
+            return json.dumps({**self.parts, "data": split_rows(data)}, default=_json_default)
+        if self.kind == "record":
+            return _fill(self.parts, self.slots, data)
+        prefix, row, suffix = self.parts
+        return prefix + "".join(_fill(row, self.slots, record) for record in split_rows(data)) + suffix
+
+class UITemplateCache:
+    """LRU cache of UITemplates keyed by shape fingerprint"""
+
+    def __init__(self, max_size=UI_TEMPLATE_CACHE_SIZE):
+        self.max_size = max_size
+        self._templates = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "rejected": 0, "evictions": 0}
+
+    def get(self, key):
+        with self._lock:
+            template = self._templates.get(key)
+            if template is None:
+                self.stats["misses"] += 1
+                return None
+            self._templates.move_to_end(key)
+            self.stats["hits"] += 1
+            return template
+
+    def put(self, key, response, data, output_format):
+        """Parameterize and store an agent response; returns False if it was not cacheable"""
+        try:
+            template = UITemplate.from_response(response, data, output_format)
+        except Exception as e:
+            print(f"[UI] Could not parameterize agent output: {e}")
+            template = None
+        with self._lock:
+            if template is None:
+                self.stats["rejected"] += 1
+                return False
+            self._templates[key] = template
+            self._templates.move_to_end(key)
+            self.stats["stores"] += 1
+            while len(self._templates) > self.max_size:
+                self._templates.popitem(last=False)
+                self.stats["evictions"] += 1
+            return True
+
+    def clear(self):
+        with self._lock:
+            self._templates.clear()
+
+    def get_stats(self):
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                **self.stats,
+                "size": len(self._templates),
+                "max_size": self.max_size,
+                "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0
+            }
+
+def _json_default(obj):
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+_template_cache = None
+
+def get_template_cache():
+    """Get or create the process-wide template cache"""
+    global _template_cache
+    if _template_cache is None:
+        _template_cache = UITemplateCache()
+    return _template_cache
+
+def get_template_cache_stats():
+    """Hit/miss metrics for the UI template cache"""
+    return get_template_cache().get_stats()
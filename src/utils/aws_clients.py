@@ -0,0 +1,101 @@
+"""Shared AWS clients - one session, pooled keep-alive connections, adaptive retries, per-call latency metrics"""
+
+import os
+import time
+import threading
+import boto3
+from botocore.config import Config
+
+AWS_MAX_POOL_CONNECTIONS = int(os.environ.get('AWS_MAX_POOL_CONNECTIONS', '25'))  # Parallel scans/fetches use up to this many
+AWS_MAX_ATTEMPTS = int(os.environ.get('AWS_MAX_ATTEMPTS', '5'))
+WARM_SERVICES = ("dynamodb", "rds-data", "s3", "ses")  # Created during Lambda init, before the first request
+
+DEFAULT_CONFIG = Config(
+    max_pool_connections=AWS_MAX_POOL_CONNECTIONS,
+    tcp_keepalive=True,
+    retries={"mode": "adaptive", "max_attempts": AWS_MAX_ATTEMPTS},
+    connect_timeout=5
+)
+
+_session = boto3.session.Session()
+_clients = {}
+_clients_lock = threading.Lock()
+_metrics = {}
+_metrics_lock = threading.Lock()
+
+def _config_key(config):
+    return tuple(sorted((k, repr(v)) for k, v in getattr(config, "_user_provided_options", {}).items())) if config else ()
+
+def _record(service, operation, elapsed_ms, error):
+    with _metrics_lock:
+        stats = _metrics.setdefault(f"{service}.{operation}", {
+            "calls": 0, "errors": 0, "first_ms": round(elapsed_ms, 1), "total_ms": 0.0, "max_ms": 0.0
+        })
+        stats["calls"] += 1
+        stats["errors"] += int(error)
+        stats["total_ms"] += elapsed_ms
+        stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+
+def _instrument(client, service):
+    """Time every API call (including retries) through botocore's event hooks"""
+    def before_call(context, model, **kwargs):
+        context["_started"] = time.perf_counter()
+        context["_operation"] = model.name
+
+    def after_call(context, model, parsed, **kwargs):
+        started = context.pop("_started", None)
+        if started is not None:
+            _record(service, model.name, (time.perf_counter() - started) * 1000, error="Error" in parsed)
+
+    def after_call_error(context, **kwargs):
+        # Raised before a response (connection errors, retries exhausted)
+        started = context.pop("_started", None)
+        if started is not None:
+            _record(service, context.get("_operation", "unknown"), (time.perf_counter() - started) * 1000, error=True)
+
+    events = client.meta.events
+    events.register("before-call", before_call)
+    events.register("after-call", after_call)
+    events.register("after-call-error", after_call_error)
+    return client
+
+def _get(kind, service, endpoint_url=None, config=None):
+    key = (kind, service, endpoint_url, _config_key(config))
+    with _clients_lock:
+        cached = _clients.get(key)
+        if cached is None:
+            merged = DEFAULT_CONFIG.merge(config) if config else DEFAULT_CONFIG
+            if kind == "client":
+                cached = _instrument(_session.client(service, endpoint_url=endpoint_url, config=merged), service)
+            else:
+                cached = _session.resource(service, endpoint_url=endpoint_url, config=merged)
+                _instrument(cached.meta.client, service)
+            _clients[key] = cached
+        return cached
+
+def get_client(service, endpoint_url=None, config=None):
+    """Shared low-level client; config overrides the pooled/adaptive defaults"""
+    return _get("client", service, endpoint_url, config)
+
+def get_resource(service, endpoint_url=None, config=None):
+    """Shared resource (e.g. dynamodb) on the same session"""
+    return _get("resource", service, endpoint_url, config)
+
+def warm_clients(services=WARM_SERVICES):
+    """Create clients up front so Lambda init, not the first request, pays for them"""
+    started = time.perf_counter()
+    for service in services:
+        if service == "dynamodb":
+            get_resource(service)
+        else:
+            get_client(service)
+    print(f"[AWS] Initialized {len(services)} clients in {(time.perf_counter() - started) * 1000:.0f}ms")
+
+def get_client_metrics():
+    """Per service.operation call counts, errors and latency (first call shows cold overhead)"""
+    with _metrics_lock:
+        return {
+            name: {**stats, "total_ms": round(stats["total_ms"], 1), "max_ms": round(stats["max_ms"], 1),
+                   "avg_ms": round(stats["total_ms"] / stats["calls"], 1)}
+            for name, stats in _metrics.items()
+        }
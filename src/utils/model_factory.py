@@ -0,0 +1,144 @@
+"""Bedrock model factory - prompt caching on tool specs, static system prompts and the conversation, cache usage metrics
+
+MODEL_CACHE_MODE=record|replay|passthrough wraps every model in a record/replay
+response cache (MODEL_CACHE_TABLE for DynamoDB, else files in MODEL_CACHE_DIR)
+for offline benchmarks and repeated deterministic prompts.
+"""
+
+import os
+import json
+import time
+import threading
+from functools import lru_cache
+from strands.models.bedrock import BedrockModel
+from strands.models.caching import CachingModel, DynamoDBModelCacheStore, FileModelCacheStore
+
+NOVA_PREMIER = "us.amazon.nova-premier-v1:0"
+CLAUDE_SONNET_4 = "us.anthropic.claude-sonnet-4-20250514-v1:0"
+CACHE_POINT_TYPE = "default"
+
+MODEL_CACHE_MODE = os.environ.get('MODEL_CACHE_MODE', 'off')         # off | record | replay | passthrough
+MODEL_CACHE_DIR = os.environ.get('MODEL_CACHE_DIR', '/tmp/model_cache')
+MODEL_CACHE_TABLE = os.environ.get('MODEL_CACHE_TABLE')
+MODEL_CACHE_TTL_SECONDS = int(os.environ.get('MODEL_CACHE_TTL_SECONDS', '86400'))
+MODEL_CACHE_REALTIME = os.environ.get('MODEL_CACHE_REALTIME', 'false').lower() == 'true'  # Replay with recorded chunk timing
+ASYNC_STREAMING = os.environ.get('BEDROCK_ASYNC_STREAMING', 'true').lower() == 'true'  # Await Bedrock streams on the agent's event loop
+
+PROMPT_CACHE_LOG_EVERY = 25       # Model calls between per-agent cache summary log lines
+
+# Where each model family accepts cache points (Nova caches system and messages, not tool specs)
+PROMPT_CACHE_SUPPORT = {
+    "anthropic.claude": {"system": True, "tools": True, "messages": True},
+    "amazon.nova": {"system": True, "tools": False, "messages": True}
+}
+
+_usage = {}
+_usage_lock = threading.Lock()
+
+def _cache_support(model_id):
+    for family, support in PROMPT_CACHE_SUPPORT.items():
+        if family in model_id:
+            return support
+    return {"system": False, "tools": False, "messages": False}
+
+def _record_usage(agent_name, usage, ttft_ms):
+    with _usage_lock:
+        stats = _usage.setdefault(agent_name, {
+            "calls": 0, "input_tokens": 0, "output_tokens": 0,
+            "cache_read_tokens": 0, "cache_write_tokens": 0, "ttft_ms_total": 0.0, "ttft_samples": 0
+        })
+        stats["calls"] += 1
+        stats["input_tokens"] += usage.get("inputTokens", 0)
+        stats["output_tokens"] += usage.get("outputTokens", 0)
+        stats["cache_read_tokens"] += usage.get("cacheReadInputTokens", 0)
+        stats["cache_write_tokens"] += usage.get("cacheWriteInputTokens", 0)
+        if ttft_ms is not None:
+            stats["ttft_ms_total"] += ttft_ms
+            stats["ttft_samples"] += 1
+        calls = sum(s["calls"] for s in _usage.values())
+    print(f"[PROMPT CACHE] {agent_name}: read={usage.get('cacheReadInputTokens', 0)} "
+          f"write={usage.get('cacheWriteInputTokens', 0)} input={usage.get('inputTokens', 0)}"
+          + (f" ttft={ttft_ms:.0f}ms" if ttft_ms is not None else ""))
+    if calls % PROMPT_CACHE_LOG_EVERY == 0:
+        print(f"[PROMPT CACHE] Stats after {calls} calls: {json.dumps(get_prompt_cache_stats())}")
+
+class CachingBedrockModel(BedrockModel):
+    """BedrockModel that records cache token usage and time to first token per agent
+
+    With cache_messages, a cache point after the latest message lets each
+    turn of the agent's tool loop read the whole previous prefix (tools,
+    system prompt, conversation) from the cache - the only tool-spec caching
+    Nova gets, since it takes no cache point in the tool config.
+    """
+
+    def __init__(self, agent_name, cache_messages=None, **kwargs):
+        super().__init__(**kwargs)
+        self.agent_name = agent_name
+        self.cache_messages = cache_messages
+
+    def format_request(self, *args, **kwargs):
+        request = super().format_request(*args, **kwargs)
+        messages = request["messages"]
+        if self.cache_messages and messages:
+            # Copied - formatted messages are memoized by the base model and must not change
+            last = messages[-1]
+            request["messages"] = [*messages[:-1], {**last, "content": [*last["content"], {"cachePoint": {"type": self.cache_messages}}]}]
+        return request
+
+    async def stream(self, *args, **kwargs):
+        started = time.perf_counter()
+        ttft_ms = None
+        async for event in super().stream(*args, **kwargs):
+            if ttft_ms is None and "contentBlockDelta" in event:
+                ttft_ms = (time.perf_counter() - started) * 1000
+            if "metadata" in event and "usage" in event["metadata"]:
+                _record_usage(self.agent_name, event["metadata"]["usage"], ttft_ms)
+            yield event
+
+@lru_cache(maxsize=1)
+def get_model_cache_store():
+    """Shared response store for MODEL_CACHE_MODE"""
+    if MODEL_CACHE_TABLE:
+        return DynamoDBModelCacheStore(MODEL_CACHE_TABLE, ttl_seconds=MODEL_CACHE_TTL_SECONDS)
+    return FileModelCacheStore(MODEL_CACHE_DIR)
+
+@lru_cache(maxsize=16)
+def _model_config(model_id):
+    """Immutable model config (as items) with cache points where the model supports them"""
+    support = _cache_support(model_id)
+    config = {"model_id": model_id, "async_streaming": ASYNC_STREAMING}
+    if support["system"]:
+        config["cache_prompt"] = CACHE_POINT_TYPE
+    if support["tools"]:
+        config["cache_tools"] = CACHE_POINT_TYPE
+    if support["messages"]:
+        config["cache_messages"] = CACHE_POINT_TYPE
+    return tuple(config.items())
+
+def create_model(model_id, agent_name):
+    """New Bedrock model for an agent, with cache points where the model supports them
+
+    Models hold per-instance request state (formatted messages), so every
+    agent gets its own; only the config is cached, and the boto client comes
+    from the Bedrock client pool. Keep system prompts static (request data
+    belongs in the user message) so the cached prefix - tool specs, then
+    system prompt - is reused every turn.
+    """
+    model = CachingBedrockModel(agent_name, **dict(_model_config(model_id)))
+    if MODEL_CACHE_MODE != "off":
+        print(f"[MODEL CACHE] {agent_name}: {MODEL_CACHE_MODE} mode")
+        return CachingModel(model, get_model_cache_store(), mode=MODEL_CACHE_MODE, realtime=MODEL_CACHE_REALTIME)
+    return model
+
+def get_prompt_cache_stats():
+    """Per-agent token usage, cache hit share of input tokens and average time to first token"""
+    with _usage_lock:
+        report = {}
+        for agent_name, stats in _usage.items():
+            prompt_tokens = stats["input_tokens"] + stats["cache_read_tokens"] + stats["cache_write_tokens"]
+            report[agent_name] = {
+                **{k: v for k, v in stats.items() if not k.startswith("ttft_")},
+                "cache_read_share": round(stats["cache_read_tokens"] / prompt_tokens, 4) if prompt_tokens else 0.0,
+                "avg_ttft_ms": round(stats["ttft_ms_total"] / stats["ttft_samples"], 1) if stats["ttft_samples"] else None
+            }
+        return report
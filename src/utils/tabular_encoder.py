@@ -0,0 +1,231 @@
+"""Compact tabular encoding for record lists that have to reach a model
+
+JSON arrays of dicts repeat every key on every row. This encoder emits one
+header line and one delimited line per row, after pruning empty and constant
+columns, rounding numbers and dictionary-encoding low-cardinality strings:
+
+    #table customers rows=3
+    #const status=active
+    #dict segment_id: 0=VIP_HIGH_VALUE 1=PRICE_SENSITIVE
+    id|name|segment_id|total_spent
+    cust-001|Sarah Chen|0|8500
+    cust-002|Mike Johnson|1|1200
+    cust-003|Emma Rodriguez|0|3400.5
+"""
+
+import re
+import json
+from decimal import Decimal
+
+DEFAULT_PRECISION = 2
+DICT_MAX_DISTINCT = 16            # Columns with more distinct values are never dictionary-encoded
+DICT_MAX_RATIO = 0.5              # ...nor columns where most values are distinct
+DELIMITER = "|"
+
+def _flatten(row, prefix=""):
+    """One level of dotted keys for nested maps (preferences.channel)"""
+    flat = {}
+    for key, value in row.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict) and not prefix:
+            flat.update(_flatten(value, f"{name}."))
+        else:
+            flat[name] = value
+    return flat
+
+def _format_number(value, precision):
+    if isinstance(value, Decimal):
+        value = float(value)
+    if isinstance(value, int) or value == int(value):
+        return str(int(value))
+    return f"{round(value, precision):.{precision}f}".rstrip("0").rstrip(".")
+
+def _format_value(value, precision, delimiter):
+    if value is None or value == "":
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float, Decimal)):
+        return _format_number(value, precision)
+    if isinstance(value, (list, set, tuple)):
+        text = ";".join(sorted(str(v) for v in value)) if isinstance(value, set) else ";".join(str(v) for v in value)
+    elif isinstance(value, dict):
+        text = json.dumps(value, separators=(",", ":"), default=str)
+    else:
+        text = str(value)
+    return text.replace("\\", "\\\\").replace(delimiter, "\\" + delimiter).replace("\n", "\\n")
+
+def encode_table(rows, name=None, columns=None, exclude=None, precision=DEFAULT_PRECISION,
+                 dictionary=True, delimiter=DELIMITER):
+    """Encode a list of dicts as a compact header + delimited rows block
+
+    Args:
+        rows: Records (DynamoDB items, Aurora rows, Data Agent output)
+        name: Optional table name for the header line
+        columns: Keep only these columns (in this order)
+        exclude: Columns to drop
+        precision: Decimal places kept for non-integer numbers
+        dictionary: Dictionary-encode low-cardinality string columns when it saves bytes
+        delimiter: Field separator (escaped inside values)
+    """
+    flat_rows = [_flatten(r) for r in rows if isinstance(r, dict)]
+    keys = list(columns) if columns else list(dict.fromkeys(k for r in flat_rows for k in r))
+    if exclude:
+        keys = [k for k in keys if k not in set(exclude)]
+
+    cells = {k: [_format_value(r.get(k), precision, delimiter) for r in flat_rows] for k in keys}
+
+    header = [f"#table {name} rows={len(flat_rows)}" if name else f"#table rows={len(flat_rows)}"]
+    kept = []
+    for key in keys:
+        values = cells[key]
+        distinct = set(values)
+        if distinct <= {""}:
+            continue  # Empty everywhere
+        if len(flat_rows) > 1 and len(distinct) == 1 and not columns:
+            header.append(f"#const {key}={values[0]}")
+            continue
+        if dictionary and len(flat_rows) > 1 and len(distinct) <= min(DICT_MAX_DISTINCT, len(flat_rows) * DICT_MAX_RATIO):
+            codes = {v: str(i) for i, v in enumerate(sorted(distinct))}
+            dict_line = f"#dict {key}: " + " ".join(f"{c}={v}" for v, c in codes.items())
+            saved = sum(len(v) - len(codes[v]) for v in values) - len(dict_line) - 1
+            if saved > 0 and not any(" " in v or "=" in v for v in distinct):
+                header.append(dict_line)
+                cells[key] = [codes[v] for v in values]
+        kept.append(key)
+
+    lines = header + [delimiter.join(kept)]
+    lines.extend(delimiter.join(cells[k][i] for k in kept) for i in range(len(flat_rows)))
+    return "\n".join(lines)
+
+def _split_fields(line, delimiter):
+    fields, current, escaped = [], [], False
+    for char in line:
+        if escaped:
+            current.append("\n" if char == "n" else char)
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif char == delimiter:
+            fields.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+    fields.append("".join(current))
+    return fields
+
+def _parse_scalar(text):
+    if text == "":
+        return None
+    if re.fullmatch(r"-?\d+", text):
+        return int(text)
+    if re.fullmatch(r"-?\d+\.\d+", text):
+        return float(text)
+    return text
+
+def decode_table(text, delimiter=DELIMITER):
+    """Decode encode_table output back to records (values as str/int/float; nested keys stay dotted)"""
+    constants, dictionaries = {}, {}
+    lines = text.split("\n")
+    index = 0
+    while index < len(lines) and lines[index].startswith("#"):
+        line = lines[index]
+        if line.startswith("#const "):
+            key, _, value = line[7:].partition("=")
+            constants[key] = _parse_scalar(value)
+        elif line.startswith("#dict "):
+            key, _, entries = line[6:].partition(": ")
+            dictionaries[key] = dict(entry.split("=", 1) for entry in entries.split(" "))
+        index += 1
+
+    header = _split_fields(lines[index], delimiter) if index < len(lines) and lines[index] else []
+    records = []
+    for line in lines[index + 1:]:
+        values = _split_fields(line, delimiter)
+        record = dict(constants)
+        for key, value in zip(header, values):
+            if key in dictionaries:
+                value = dictionaries[key].get(value, value)
+            record[key] = _parse_scalar(value)
+        records.append(record)
+    return records
+
+def estimate_tokens(text):
+    """Token estimate - tiktoken when installed, otherwise word/number/punctuation pieces"""
+    try:
+        import tiktoken
+        return len(tiktoken.get_encoding("cl100k_base").encode(text))
+    except ImportError:
+        return len(re.findall(r"[A-Za-z]+|\d{1,3}|[^\sA-Za-z\d]", text))
+
+def _seed_datasets(script_path):
+    """Datasets written by scripts/seed-comprehensive-data.sh, in the shape the query tools return them"""
+    import random
+    from boto3.dynamodb.types import TypeDeserializer
+
+    with open(script_path) as f:
+        script = f.read()
+
+    deserializer = TypeDeserializer()
+    items = {}
+    for table, body in re.findall(r'--table-name "\$STACK_NAME-([\w-]+)" --item \'(\{.*?\})\'', script, re.DOTALL):
+        raw = json.loads(body)
+        items.setdefault(table, []).append({k: deserializer.deserialize(v) for k, v in raw.items()})
+
+    # Order loops use $RANDOM - reproduce them with a fixed seed
+    rng = random.Random(7)
+    orders = []
+    for customer, count, base, spread, basket in (("001", 45, 150, 500, {"laptop", "mouse", "keyboard"}),
+                                                  ("002", 12, 25, 150, {"basics", "home-goods"})):
+        for i in range(1, count + 1):
+            orders.append({
+                "id": f"order-{customer}-{i}", "customer_id": f"cust-{customer}",
+                "amount": Decimal(base + rng.randrange(spread)), "items": basket,
+                "date": f"2023-{1 + rng.randrange(12):02d}-{1 + rng.randrange(28):02d}", "status": "completed",
+                "behavioral_flags": {"seasonal": "tech_enthusiast" if customer == "001" else "budget_conscious",
+                                     "channel": "website"}
+            })
+
+    # Aurora rows come back from execute_aurora_query as col_i dicts
+    metrics = []
+    block = re.search(r"INSERT INTO customer_metrics VALUES(.*?)ON CONFLICT", script, re.DOTALL).group(1)
+    for values in re.findall(r"\(([^)]*)\)", block):
+        fields = [v.strip().strip("'") for v in values.split(",")]
+        metrics.append({f"col_{i}": (float(v) if re.fullmatch(r"-?\d+\.\d+", v) else int(v) if v.isdigit() else v)
+                        for i, v in enumerate(fields)})
+
+    return {
+        "customers": items.get("customers-v2", []),
+        "promotions": items.get("promotions", []),
+        "orders": orders,
+        "customer_metrics": metrics
+    }
+
+def benchmark(script_path=None, scale=100):
+    """Bytes and tokens of the current JSON vs the tabular encoding on the seeded datasets"""
+    import os
+
+    class DecimalEncoder(json.JSONEncoder):
+        def default(self, obj):
+            if isinstance(obj, Decimal):
+                return float(obj)
+            elif isinstance(obj, set):
+                return list(obj)
+            return super(DecimalEncoder, self).default(obj)
+
+    script_path = script_path or os.path.join(os.path.dirname(__file__), "..", "..", "scripts", "seed-comprehensive-data.sh")
+    datasets = _seed_datasets(script_path)
+    # Same value distributions at production-like row counts
+    datasets[f"customers x{scale}"] = [{**c, "id": f"{c['id']}-{i}"} for i in range(scale) for c in datasets["customers"]]
+
+    print(f"{'dataset':<18}{'rows':>6}{'json B':>10}{'table B':>10}{'bytes':>8}{'json tok':>10}{'table tok':>10}{'tokens':>8}")
+    for name, rows in datasets.items():
+        current = json.dumps(rows, cls=DecimalEncoder)
+        compact = encode_table(rows, name=name.split(" ")[0])
+        assert len(decode_table(compact)) == len(rows)
+        json_tokens, table_tokens = estimate_tokens(current), estimate_tokens(compact)
+        print(f"{name:<18}{len(rows):>6}{len(current):>10}{len(compact):>10}{1 - len(compact) / len(current):>8.0%}"
+              f"{json_tokens:>10}{table_tokens:>10}{1 - table_tokens / json_tokens:>8.0%}")
+
+if __name__ == "__main__":
+    benchmark()
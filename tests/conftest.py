@@ -0,0 +1,9 @@
+"""Put src (flattened like the Lambda zip) and the Strands layer on the import path"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (os.path.join(ROOT, 'layer', 'python'), os.path.join(ROOT, 'src')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
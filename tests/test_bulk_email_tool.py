@@ -0,0 +1,66 @@
+"""Bulk sender against the LocalTransport stand-in - rate limiting and batch failure handling"""
+
+import time
+from tools.bulk_email_tool import BulkEmailSender, LocalTransport, TokenBucket
+from tools.email_outbox import OutboxWorker, SQLiteOutboxStore, dedup_key, FAILED, PENDING, SENT
+
+def _audience(n, bad=()):
+    return [{"id": f"c{i}", "name": f"Customer {i}", "email": None if i in bad else f"c{i}@example.com"}
+            for i in range(n)]
+
+def test_token_bucket_holds_the_rate():
+    bucket = TokenBucket(rate=50, capacity=5)
+    started = time.monotonic()
+    for _ in range(15):
+        bucket.acquire()
+    # 5 tokens up front, the other 10 refill at 50/s
+    assert time.monotonic() - started >= 0.18
+
+def test_sender_is_limited_by_the_transport_send_rate():
+    transport = LocalTransport(send_rate=40)
+    sender = BulkEmailSender(transport, workers=8, batch_size=10)
+    started = time.monotonic()
+    report = sender.send(_audience(60), "Hi {first_name}", "Body", "noreply@example.com")
+    assert report["sent"] == 60
+    assert report["send_rate_limit"] == 40
+    assert time.monotonic() - started >= 0.45
+
+def test_batch_failures_are_reported_per_batch():
+    transport = LocalTransport(send_rate=1000, fail_addresses={"c3@example.com", "c7@example.com"})
+    reported = []
+    sender = BulkEmailSender(transport, workers=4, batch_size=4, on_batch=reported.append)
+    report = sender.send(_audience(10, bad={9}), "Hi {first_name}", "Body", "noreply@example.com")
+
+    assert (report["sent"], report["failed"]) == (7, 3)
+    assert sorted(f["customer_id"] for f in report["failures"]) == ["c3", "c7", "c9"]
+    assert [b["sent"] + b["failed"] for b in report["batches"]] == [4, 4, 2]
+    assert reported == report["batches"]
+    assert len(transport.sent) == 7
+
+def test_throttles_are_retried_then_reported():
+    transport = LocalTransport(send_rate=1000, throttle_every=2)
+    report = BulkEmailSender(transport, workers=1, max_retries=3).send(_audience(6), "Hi", "Body", "noreply@example.com")
+    assert report["sent"] == 6 and report["retries"] > 0
+
+    exhausted = BulkEmailSender(LocalTransport(send_rate=1000, throttle_every=1), workers=2, max_retries=1)
+    report = exhausted.send(_audience(3), "Hi", "Body", "noreply@example.com")
+    assert report["failed"] == 3
+    assert all(f["error"].startswith("throttled") for f in report["failures"])
+
+def test_outbox_worker_marks_each_outcome(tmp_path):
+    store = SQLiteOutboxStore(str(tmp_path / "outbox.db"))
+    store.enqueue([{
+        "dedup_key": dedup_key("campaign", f"c{i}@example.com"), "outbox_id": "outbox-test",
+        "to_email": f"c{i}@example.com", "from_email": "noreply@example.com",
+        "subject": "Hi", "body": "Body", "customer_id": f"c{i}"
+    } for i in range(5)])
+
+    # An unverified address fails permanently; the rest of its batch still goes out
+    transport = LocalTransport(send_rate=1000, fail_addresses={"c1@example.com"})
+    totals = OutboxWorker(store=store, transport=transport, workers=2, batch_size=2).drain()
+
+    assert (totals[SENT], totals[FAILED], totals[PENDING]) == (4, 1, 0)
+    assert totals["batches"] == 3
+    counts, errors = store.status("outbox-test")
+    assert counts == {SENT: 4, FAILED: 1}
+    assert errors[0]["to_email"] == "c1@example.com"